@@ -0,0 +1,68 @@
+import threading
+import types
+
+from test_startup import FakeRoot, FakeWidget, load_gui_with_fake_tkinter
+from timetable_engine import SearchStats, count_preliminary_timetables
+
+# 입력칸 대신 쓰는 가짜 Entry
+class FakeEntry(FakeWidget):
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+# 가짜 tkinter 로 TimetableApp 을 만들고 카탈로그까지 읽어 두는 함수 (띄운 안내, 오류 창은 messages 에 모음)
+def open_app(monkeypatch):
+    gui = load_gui_with_fake_tkinter(monkeypatch)
+    messages = []
+    monkeypatch.setattr(gui, "messagebox", types.SimpleNamespace(
+        showinfo=lambda *args: messages.append(("info",) + args),
+        showerror=lambda *args: messages.append(("error",) + args)))
+    monkeypatch.setattr(gui, "ttk", types.SimpleNamespace(Progressbar=FakeWidget))
+    root = FakeRoot()
+    app = gui.TimetableApp(root)
+    app.open_with_catalog(lambda: None)
+    while root.pending:
+        root.pending.pop(0)()
+    return gui, app, messages
+
+# 예비 시간표 화면의 작업은 추정치를 먼저 보내고, 그다음 정확한 개수를 보내야 함
+def test_preliminary_task_sends_estimate_before_count(monkeypatch):
+    gui, app, _ = open_app(monkeypatch)
+    tasks = []
+    app.run_in_background = lambda task, handle_message, show_progress=None: tasks.append(task) or SearchStats()
+    app.create_preliminary_timetable()
+    sent = []
+    tasks[0](SearchStats(), sent.append)
+    kinds = [message[0] for message in sent]
+    assert kinds[:2] == ["estimate", "count"]
+    assert sent[0][1] >= sent[1][1] == count_preliminary_timetables(app.mandatory_subjects, app.conflict_index)
+
+# 작업 스레드가 계산 중(잠금을 잡은 채)이면 강의를 고치지 않고 오류를 보여주고, 끝나면 고칠 수 있어야 함
+def test_lecture_edits_wait_for_background_task(monkeypatch):
+    gui, app, messages = open_app(monkeypatch)
+    monkeypatch.setattr(gui, "EDIT_WAIT_SECONDS", 0.01)
+    app.entries = {"과목명": FakeEntry("새 교양"), "교수명": FakeEntry("새 교수"), "분반": FakeEntry("")}
+    app.schedule = {"Sat": (9, 0, 10, 0)}
+    electives = len(app.electives)
+
+    released = threading.Event()
+    holding = threading.Event()
+
+    def worker():
+        with app.catalog_lock:
+            holding.set()
+            released.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    holding.wait()
+    app.save_elective_subject()
+    released.set()
+    thread.join()
+    assert len(app.electives) == electives and messages[-1][0] == "error"
+
+    app.save_elective_subject()
+    assert len(app.electives) == electives + 1 and messages[-1][0] == "info"
+    assert app.electives[-1] in app.conflict_index
@@ -0,0 +1,77 @@
+import importlib.util
+import sys
+import time
+import types
+
+import pytest
+
+from timetable_benchmark import (
+    STARTUP_GUI_BUDGET, STARTUP_IMPORT_BUDGET, display_prefix, engine_loaded_modules, find_gui_script,
+    gui_import_loads_tkinter, measure_engine_import, measure_gui_startup)
+
+STARTUP_REPEAT = 3  # 시작 시간을 잴 때 반복할 횟수 (가장 빠른 시간을 씀)
+
+# 화면 없이 TimetableApp 을 만들 수 있는 가짜 tkinter 위젯 (어떤 메서드를 불러도 빈 리스트를 돌려줌)
+class FakeWidget:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: []
+
+# root.after / after_idle 로 예약된 함수를 모아 두는 가짜 Tk
+class FakeRoot(FakeWidget):
+    def __init__(self):
+        self.pending = []
+
+    def after_idle(self, function):
+        self.pending.append(function)
+
+    def after(self, milliseconds, function):
+        self.pending.append(function)
+
+# 가짜 tkinter 로 GUI 스크립트를 읽는 함수
+def load_gui_with_fake_tkinter(monkeypatch):
+    fake = types.ModuleType("tkinter")
+    for name in ("Frame", "Label", "Button", "Canvas", "Scrollbar", "Entry", "Text", "Checkbutton", "BooleanVar"):
+        setattr(fake, name, FakeWidget)
+    fake.BOTH = "both"
+    monkeypatch.setitem(sys.modules, "tkinter", fake)
+    spec = importlib.util.spec_from_file_location("timetable_gui", find_gui_script())
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_engine_import_within_budget():
+    elapsed = measure_engine_import(STARTUP_REPEAT)
+    assert elapsed is not None and elapsed <= STARTUP_IMPORT_BUDGET
+
+def test_engine_import_defers_heavy_modules():
+    assert engine_loaded_modules() == []
+
+def test_gui_import_does_not_load_tkinter():
+    assert find_gui_script() is not None
+    assert not gui_import_loads_tkinter(find_gui_script())
+
+# 메인 화면은 카탈로그를 읽기 전에 만들어지고, 카탈로그는 과목 화면을 열 때 다 읽혀 있어야 함
+def test_main_menu_before_catalog(monkeypatch):
+    gui = load_gui_with_fake_tkinter(monkeypatch)
+    root = FakeRoot()
+    started = time.perf_counter()
+    app = gui.TimetableApp(root)
+    assert time.perf_counter() - started <= STARTUP_GUI_BUDGET
+    assert app.catalog_thread is None and app.mandatory_subjects == [] and app.conflict_index is None
+
+    opened = []
+    app.open_with_catalog(lambda: opened.append(True))
+    while root.pending:
+        root.pending.pop(0)()
+    assert opened == [True]
+    assert app.mandatory_subjects and app.conflict_index is not None and app.incremental_timetables is not None
+
+# 실제 창은 화면이나 xvfb-run 이 있을 때만 띄울 수 있음 (없으면 통과가 아니라 건너뜀으로 보고함)
+@pytest.mark.skipif(display_prefix() is None, reason="화면(DISPLAY)도 xvfb-run 도 없어 GUI 시작 시간을 잴 수 없습니다")
+def test_gui_main_screen_within_budget():
+    elapsed, error = measure_gui_startup(find_gui_script(), STARTUP_REPEAT)
+    assert error is None
+    assert elapsed <= STARTUP_GUI_BUDGET
@@ -0,0 +1,39 @@
+import io
+import json
+
+import pytest
+
+from test_timetable_engine import reference_count, small_catalog
+from timetable_cli import run
+
+# 요청 줄들을 run 으로 풀어 응답 리스트를 돌려주는 함수
+def solve_lines(catalog, lines, **options):
+    output = io.StringIO()
+    run(catalog, lines, output, **options)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+# 개수는 기준 구현과 같아야 하고, 여러 프로세스로 나눠 찾아도 응답이 같아야 함
+@pytest.mark.parametrize("seed", range(3))
+def test_requests_match_reference(seed):
+    catalog, subjects = small_catalog(seed)
+    names = list(catalog.subjects)
+    lines = [json.dumps({"id": i, "subjects": names[:i + 2], "electives": [0, 2]}) for i in range(3)]
+    responses = solve_lines(catalog, lines)
+    assert [response["count"] for response in responses] == [reference_count(subjects[:i + 2]) for i in range(3)]
+    assert solve_lines(catalog, lines, workers=2) == responses
+
+# 잘못된 줄은 그 줄만 {"id", "error"} 로 알리고 나머지 요청은 계속 풀어야 함
+def test_bad_requests_get_error_lines():
+    catalog, _ = small_catalog(0)
+    name = next(iter(catalog.subjects))
+    lines = ["not json", "[1]", json.dumps({"id": 1, "subjects": ["없는 과목"]}),
+             json.dumps({"id": 2, "subjects": [name], "electives": [-1]}),
+             json.dumps({"id": 3, "subjects": [name], "electives": [len(catalog.electives)]}),
+             json.dumps({"id": 4, "subjects": [name], "electives": [True]}),
+             json.dumps({"id": 5, "subjects": name}),
+             json.dumps({"id": 6, "subjects": [name], "constraints": {"latest_end": [25, 0]}}),
+             json.dumps({"id": 7, "subjects": [name]})]
+    responses = solve_lines(catalog, lines)
+    assert [response["id"] for response in responses] == [None, None, 1, 2, 3, 4, 5, 6, 7]
+    assert all("error" in response for response in responses[:-1])
+    assert "error" not in responses[-1] and responses[-1]["count"] == len(catalog.subjects[name].lectures)
@@ -0,0 +1,455 @@
+import os
+import random
+from itertools import combinations, islice
+
+import pytest
+
+from timetable_benchmark import generate_catalog, reference_conflict, reference_timetables, timetable_set
+from timetable_engine import (
+    CONSECUTIVE_BREAK_MINUTES, ConflictIndex, IncrementalTimetables, Lecture, ResultCache, SearchStats, Subject,
+    TimetableConstraints, TimetableExport, WEEKDAYS, allocate_cohort, count_preliminary_timetables,
+    create_preliminary_timetables, create_timetable_groups, create_timetable_groups_parallel,
+    decode_timetable_groups, encode_timetable_groups, estimate_preliminary_timetables, expand_timetable_groups,
+    export_timetables, iter_meetings, load_catalog, load_compiled_catalog, pack_electives,
+    rank_preliminary_timetables, recommend_minimum_removals, save_compiled_catalog, score_timetable,
+    selection_fingerprint, timetable_variant)
+
+SEEDS = range(8)  # 작은 무작위 카탈로그를 만들 시드
+SMALL_CATALOG = {"subjects": 4, "sections": 3, "professors": 2, "meetings": 2, "shared": 0.3, "electives": 6}  # 모든 조합을 기준 구현으로 확인할 수 있는 크기
+
+# 시드마다 작은 무작위 카탈로그를 만드는 함수 (with_shared_name 이면 첫 과목과 이름이 같은 과목을 하나 더 넣어 분반 일치 검사도 확인함)
+def small_catalog(seed, with_shared_name=False, **settings):
+    catalog = generate_catalog(seed=seed, **{**SMALL_CATALOG, **settings})
+    subjects = list(catalog.subjects.values())
+    if with_shared_name:
+        first = subjects[0]
+        lab = Subject(first.name + " 실습")
+        for i, lecture in enumerate(generate_catalog(seed=seed + 1000, subjects=1, sections=3).subjects["과목1"].lectures):
+            lab.add_lecture(Lecture(first.name, lecture.professor, lecture.schedule, first.lectures[i % len(first.lectures)].section))
+        subjects.append(lab)
+    return catalog, subjects
+
+# 서로, 그리고 timetable 과 겹치지 않게 넣을 수 있는 선택 과목 조합의 최대 가중치를 모든 부분집합을 보고 구하는 함수
+def reference_best_electives(timetable, electives, weights=None):
+    candidates = [elective for elective in electives if not any(reference_conflict(elective, lecture) for lecture in timetable)]
+    best = 0
+    for size in range(len(candidates) + 1):
+        for chosen in combinations(candidates, size):
+            if not any(reference_conflict(a, b) for a, b in combinations(chosen, 2)):
+                best = max(best, sum(1 if weights is None else weights[elective] for elective in chosen))
+    return best
+
+# 강의마다 하루에 한 시간짜리 수업이 두 번 있는 과목들을 만드는 함수 (수업이 붙어 있으면 연속 수업이 됨)
+def multiple_meeting_subjects(seed):
+    rnd = random.Random(seed)
+    subjects = []
+    for i in range(4):
+        subject = Subject(f"과목{i + 1}")
+        for k in range(3):
+            day = rnd.choice(["Mon", "Tue", "Wed"])
+            first, second = sorted(rnd.sample(range(9, 18), 2))
+            subject.add_lecture(Lecture(subject.name, f"교수{k + 1}", {day: [(first, 0, first + 1, 0), (second, 0, second + 1, 0)]}))
+        subjects.append(subject)
+    return subjects
+
+# 기준 구현으로 찾은 예비 시간표 수
+def reference_count(subjects):
+    return len(reference_timetables(subjects))
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_conflict_index_matches_reference(seed):
+    catalog, _ = small_catalog(seed)
+    index = ConflictIndex(catalog.lectures)
+    for lecture1 in catalog.lectures:
+        for lecture2 in catalog.lectures:
+            if lecture1 is not lecture2:
+                assert index.conflicts(lecture1, lecture2) == reference_conflict(lecture1, lecture2)
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("with_shared_name", [False, True])
+def test_preliminary_timetables_match_reference(seed, with_shared_name):
+    catalog, subjects = small_catalog(seed, with_shared_name)
+    reference = reference_timetables(subjects)
+    for index in (None, catalog.index):
+        timetables = list(create_preliminary_timetables(subjects, index))
+        assert len(timetables) == len(reference)
+        assert timetable_set(timetables) == timetable_set(reference)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_time_groups_expand_to_reference(seed):
+    catalog, subjects = small_catalog(seed, with_shared_name=True)
+    rows = list(create_timetable_groups(subjects, catalog.index))
+    expanded = [timetable for groups in rows for timetable in expand_timetable_groups(groups)]
+    # 묶음 안의 강의는 시간이 같아야 하고, 같은 시간 구성이 두 번 나오면 안 됨
+    assert all(len({lecture.mask for lecture in group.lectures}) == 1 for groups in rows for group in groups)
+    assert len({tuple(id(group) for group in groups) for groups in rows}) == len(rows)
+    assert timetable_set(expanded) == timetable_set(reference_timetables(subjects))
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_count_matches_reference(seed):
+    catalog, subjects = small_catalog(seed, with_shared_name=seed % 2 == 0)
+    stats = SearchStats()
+    expected = reference_count(subjects)
+    assert count_preliminary_timetables(subjects, catalog.index, stats=stats) == expected
+    assert count_preliminary_timetables(subjects, catalog.index, by_group=True) == len(
+        list(create_timetable_groups(subjects, catalog.index)))
+    assert stats.explored > 0
+    assert estimate_preliminary_timetables(subjects, catalog.index) >= expected
+
+# 하루에 수업이 여러 번인 강의도 기준 구현과 같아야 함
+@pytest.mark.parametrize("seed", SEEDS)
+def test_multiple_meetings_per_day(seed):
+    subjects = multiple_meeting_subjects(seed)
+    index = ConflictIndex([lecture for subject in subjects for lecture in subject.lectures])
+    assert timetable_set(create_preliminary_timetables(subjects, index)) == timetable_set(reference_timetables(subjects))
+
+def test_stats_cancel_stops_search():
+    _, subjects = small_catalog(0, subjects=6)
+    stats = SearchStats()
+    rows = create_timetable_groups(subjects, stats=stats)
+    first = list(islice(rows, 1))
+    stats.cancel()
+    assert len(first) == 1 and list(rows) == []
+
+# 상위 k 개의 점수는 모든 예비 시간표의 점수를 정렬한 앞쪽 k 개와 같아야 함
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_ranked_timetables_match_reference(seed, k):
+    catalog, subjects = small_catalog(seed, with_shared_name=seed % 2 == 1)
+    rnd = random.Random(seed)
+    professors = sorted({lecture.professor for subject in subjects for lecture in subject.lectures})
+    preferred = rnd.sample(professors, len(professors) // 3) if seed % 3 else ()
+    weights = {"gaps": 0.5} if seed % 4 == 0 else None
+    reference = reference_timetables(subjects)
+    expected = sorted(score_timetable(timetable, weights, preferred) for timetable in reference)[:k]
+
+    ranked = rank_preliminary_timetables(subjects, k, weights, preferred, catalog.index)
+    assert [score for score, _ in ranked] == expected
+    assert timetable_set(timetable for _, timetable in ranked) <= timetable_set(reference)
+    assert all(score == score_timetable(timetable, weights, preferred) for score, timetable in ranked)
+
+# 여러 프로세스로 나눠 찾아도 순서, 결과, 측정값이 한 프로세스와 같아야 함
+@pytest.mark.parametrize("seed", SEEDS[:3])
+def test_sharded_search_matches_sequential(seed):
+    catalog, subjects = small_catalog(seed, with_shared_name=True)
+    sequential_stats, sharded_stats = SearchStats(), SearchStats()
+    sequential = list(create_preliminary_timetables(subjects, catalog.index, stats=sequential_stats))
+    sharded = list(create_preliminary_timetables(subjects, catalog.index, workers=2, stats=sharded_stats))
+    assert [list(map(id, timetable)) for timetable in sharded] == [list(map(id, timetable)) for timetable in sequential]
+    assert sharded_stats.as_dict() == sequential_stats.as_dict()
+    unordered = create_preliminary_timetables(subjects, catalog.index, workers=2, ordered=False)
+    assert timetable_set(unordered) == timetable_set(reference_timetables(subjects))
+
+def test_sharded_search_stops_when_cancelled():
+    _, subjects = small_catalog(0, subjects=6)
+    stats = SearchStats()
+    chunks = create_timetable_groups_parallel(subjects, workers=2, stats=stats)
+    next(chunks)
+    stats.cancel()
+    assert list(chunks) == []
+    cancelled = SearchStats()
+    cancelled.cancel()
+    assert list(create_timetable_groups_parallel(subjects, workers=2, stats=cancelled)) == []
+
+# 넣은 선택 과목은 서로, 그리고 예비 시간표와 겹치지 않아야 하고 가중치 합은 모든 부분집합 중 최대여야 함
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("weighted", [False, True])
+def test_pack_electives_matches_reference(seed, weighted):
+    catalog, subjects = small_catalog(seed, electives=9)
+    electives = catalog.electives
+    rnd = random.Random(seed)
+    weights = {elective: rnd.randint(1, 4) for elective in electives} if weighted else None
+    for timetable in islice(reference_timetables(subjects), 0, None, 97):
+        chosen, dropped, optimal = pack_electives(timetable, electives, weights, catalog.index, time_limit=10)
+        assert optimal
+        assert sorted(map(id, chosen + dropped)) == sorted(map(id, electives))
+        placed = timetable + chosen
+        assert not any(reference_conflict(a, b) for a, b in combinations(placed, 2))
+        assert sum(1 if weights is None else weights[elective] for elective in chosen) == reference_best_electives(
+            timetable, electives, weights)
+
+# 뺄 선택 과목 수는 모든 예비 시간표마다 최대로 넣을 수 있는 선택 과목을 구해 본 최솟값과 같아야 함
+@pytest.mark.parametrize("seed", SEEDS)
+def test_minimum_removals_match_reference(seed):
+    catalog, subjects = small_catalog(seed, with_shared_name=seed % 2 == 0)
+    electives = catalog.electives
+    expected = min(len(electives) - reference_best_electives(timetable, electives)
+                   for timetable in reference_timetables(subjects))
+    stats = SearchStats()
+    removals, groups = recommend_minimum_removals(subjects, electives, catalog.index, stats)
+    assert len(removals) == expected
+    base = timetable_variant(groups, 0)
+    assert timetable_set([base]) <= timetable_set(reference_timetables(subjects))
+    kept = [elective for elective in electives if elective not in removals]
+    assert not any(reference_conflict(a, b) for a, b in combinations(base + kept, 2))
+
+def test_minimum_removals_without_timetables():
+    subjects = [Subject("과목1"), Subject("과목2")]
+    for subject in subjects:
+        subject.add_lecture(Lecture(subject.name, "교수", {"Mon": (9, 0, 10, 0)}))
+    elective = Lecture("교양", "교수", {"Tue": (9, 0, 10, 0)})
+    assert recommend_minimum_removals(subjects, [elective]) == (None, None)
+
+# 강의 내용을 비교할 수 있는 튜플 리스트로 만드는 함수
+def lecture_rows(lectures):
+    return [(lecture.subject, lecture.professor, lecture.section, lecture.schedule, lecture.mask, lecture.capacity)
+            for lecture in lectures]
+
+# 컴파일한 카탈로그를 다시 읽으면 강의, 정원, 충돌 인덱스, 예비 시간표가 원래 카탈로그와 같아야 함
+@pytest.mark.parametrize("seed", SEEDS[:4])
+@pytest.mark.parametrize("with_capacity", [False, True])
+def test_compiled_catalog_round_trip(tmp_path, seed, with_capacity):
+    catalog, _ = small_catalog(seed)
+    if with_capacity:
+        for number, lecture in enumerate(catalog.lectures):
+            lecture.capacity = number % 5 * 10 or None
+    path = str(tmp_path / "catalog.ttc")
+    save_compiled_catalog(path, catalog)
+    loaded = load_catalog(path)
+
+    assert list(loaded.subjects) == list(catalog.subjects)
+    assert lecture_rows(loaded.lectures) == lecture_rows(catalog.lectures)
+    assert lecture_rows(loaded.electives) == lecture_rows(catalog.electives)
+    for lecture1 in loaded.lectures:
+        for lecture2 in loaded.lectures:
+            if lecture1 is not lecture2:
+                assert loaded.index.conflicts(lecture1, lecture2) == reference_conflict(lecture1, lecture2)
+    subjects = list(loaded.subjects.values())
+    expected = [lecture_rows(timetable) for timetable in reference_timetables(list(catalog.subjects.values()))]
+    assert sorted(lecture_rows(timetable) for timetable in create_preliminary_timetables(subjects, loaded.index)) == sorted(expected)
+
+def test_compiled_catalog_rejects_other_files(tmp_path):
+    path = tmp_path / "catalog.ttc"
+    path.write_bytes(b"TTCX" + bytes(200))
+    with pytest.raises(ValueError):
+        load_compiled_catalog(str(path))
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == (None, 1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+# 디스크에 넣은 값은 새 캐시에서도 읽히고, 깨진 파일은 지우며, 크기를 넘으면 가장 오래 안 쓴 파일부터 지움
+def test_result_cache_disk_tier(tmp_path):
+    directory = str(tmp_path)
+    ResultCache(1, directory).put("a", {"count": 1})
+    assert ResultCache(1, directory).get("a") == {"count": 1}
+
+    cache = ResultCache(1, directory)
+    with open(cache.path_of("broken"), "wb") as file:
+        file.write(b"not a pickle")
+    assert cache.get("broken") is None and not os.path.exists(cache.path_of("broken"))
+
+    small = ResultCache(1, directory, max_disk_bytes=os.path.getsize(cache.path_of("a")) * 2)
+    small.put("b", {"count": 2})
+    os.utime(small.path_of("a"), (1, 1))
+    small.put("c", {"count": 3})
+    assert not os.path.exists(small.path_of("a"))
+    assert os.path.exists(small.path_of("b")) and os.path.exists(small.path_of("c"))
+
+# 강의를 고치면 캐시 키가 바뀌고, 캐시에 넣을 수 있게 바꾼 묶음 조합은 되돌려도 같은 시간표로 펼쳐져야 함
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_cached_timetable_groups_round_trip(seed):
+    catalog, subjects = small_catalog(seed, with_shared_name=True)
+    key = selection_fingerprint(subjects, catalog.electives, ("request",))
+    assert selection_fingerprint(subjects, catalog.electives, ("request",)) == key
+    assert selection_fingerprint(subjects, catalog.electives, ("other",)) != key
+    lecture = subjects[1].lectures[0]
+    subjects[1].lectures[0] = Lecture(lecture.subject, lecture.professor + " 대리", lecture.schedule, lecture.section)
+    assert selection_fingerprint(subjects, catalog.electives, ("request",)) != key
+
+    rows = list(create_timetable_groups(subjects, catalog.index))
+    decoded = decode_timetable_groups(subjects, encode_timetable_groups(subjects, rows))
+    expanded = [timetable for groups in decoded for timetable in expand_timetable_groups(groups)]
+    assert timetable_set(expanded) == timetable_set(reference_timetables(subjects))
+
+# 강의를 추가, 삭제할 때마다 바뀐 부분만 다시 계산한 결과가 처음부터 모두 확인한 결과와 같아야 함
+# (같은 시간의 강의 추가, 새 시간의 강의 추가, 묶음의 마지막 강의 삭제를 모두 섞음)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_incremental_updates_match_reference(seed):
+    catalog, subjects = small_catalog(seed, with_shared_name=seed % 2 == 0, sections=2)
+    spare = generate_catalog(seed=seed + 2000, **SMALL_CATALOG).lectures
+    rnd = random.Random(seed)
+    incremental = IncrementalTimetables(ConflictIndex(catalog.lectures))
+    list(incremental.rebuild(subjects))
+    for step in range(12):
+        subject = rnd.choice(subjects)
+        if rnd.random() < 0.5 and len(subject.lectures) > 1:
+            subject.remove_lecture(rnd.choice(subject.lectures))
+        else:
+            template = rnd.choice(subject.lectures if rnd.random() < 0.5 else spare)
+            section = rnd.choice(subject.lectures).section
+            subject.add_lecture(Lecture(subject.lectures[0].subject, f"새교수{step}", template.schedule, section))
+        assert incremental.can_update(subjects)
+        incremental.update()
+        expanded = [timetable for groups in incremental.timetable_groups() for timetable in expand_timetable_groups(groups)]
+        reference = reference_timetables(subjects)
+        assert timetable_set(expanded) == timetable_set(reference)
+        assert incremental.total == len(reference)
+
+# 기준 구현: 시간표가 조건을 지키는지 수업 시간을 하나씩 보며 확인하는 함수
+def reference_satisfies(timetable, constraints):
+    meetings = [(day, times[0] * 60 + times[1], times[2] * 60 + times[3])
+                for lecture in timetable for day, times in iter_meetings(lecture.schedule)]
+    for lecture in timetable:
+        if constraints.allowed_professors is not None and lecture.professor not in constraints.allowed_professors:
+            return False
+        if lecture.professor in constraints.forbidden_professors:
+            return False
+    for day, start, end in meetings:
+        if day in constraints.free_days:
+            return False
+        if constraints.latest_end is not None and end > constraints.latest_end[0] * 60 + constraints.latest_end[1]:
+            return False
+        for window in constraints.blocked_times.get(day, []):
+            if start < window[2] * 60 + window[3] and window[0] * 60 + window[1] < end:
+                return False
+    busy_days = {day for day, _, _ in meetings}
+    if sum(1 for day in WEEKDAYS if day not in busy_days) < constraints.min_free_days:
+        return False
+    if constraints.max_consecutive_minutes is not None:
+        for day in busy_days:
+            run_start = run_end = None
+            for _, start, end in sorted(meeting for meeting in meetings if meeting[0] == day):
+                if run_end is not None and start - run_end < CONSECUTIVE_BREAK_MINUTES:
+                    run_end = max(run_end, end)
+                else:
+                    run_start, run_end = start, end
+                if run_end - run_start > constraints.max_consecutive_minutes:
+                    return False
+    return True
+
+# 시드마다 조건을 무작위로 고르는 함수
+def random_constraints(seed, subjects):
+    rnd = random.Random(seed)
+    professors = sorted({lecture.professor for subject in subjects for lecture in subject.lectures})
+    return TimetableConstraints(
+        blocked_times={"Mon": [(12, 0, 13, 0)]} if seed % 3 == 0 else None, free_days=["Fri"] if seed % 5 == 0 else (),
+        min_free_days=rnd.choice([0, 0, 1]), max_consecutive_minutes=rnd.choice([None, 120, 180]),
+        latest_end=rnd.choice([None, None, (16, 15)]),
+        allowed_professors=None if seed % 4 else rnd.sample(professors, len(professors) * 2 // 3),
+        forbidden_professors=professors[-2:] if seed % 7 == 0 else ())
+
+# 조건을 넣어 탐색한 결과는 모든 예비 시간표 중 조건을 지키는 것만 고른 결과와 같아야 함
+@pytest.mark.parametrize("seed", range(16))
+def test_constraints_match_reference(seed):
+    catalog, subjects = small_catalog(seed % 8, with_shared_name=seed % 2 == 0)
+    if seed % 4 == 1:
+        subjects = multiple_meeting_subjects(seed)
+    constraints = random_constraints(seed, subjects)
+    reference = [timetable for timetable in reference_timetables(subjects) if reference_satisfies(timetable, constraints)]
+    timetables = list(create_preliminary_timetables(subjects, catalog.index, constraints=constraints))
+    assert timetable_set(timetables) == timetable_set(reference)
+    assert count_preliminary_timetables(subjects, catalog.index, constraints=constraints) == len(reference)
+    ranked = rank_preliminary_timetables(subjects, 5, index=catalog.index, constraints=constraints)
+    assert [score for score, _ in ranked] == sorted(score_timetable(timetable) for timetable in reference)[:5]
+
+def test_latest_end_is_validated_and_checked_on_new_days():
+    for latest_end in [(24, 30), (25, 0), (-1, 0), (10, 60)]:
+        with pytest.raises(ValueError):
+            TimetableConstraints(latest_end=latest_end)
+    constraints = TimetableConstraints(latest_end=(18, 0))
+    assert constraints.allows(Lecture("과목", "교수", {"처음 보는 요일": (17, 0, 18, 0)}))
+    assert not constraints.allows(Lecture("과목", "교수", {"또 다른 요일": (17, 0, 18, 30)}))
+    assert TimetableConstraints(latest_end=(24, 0)).allows(Lecture("과목", "교수", {"Mon": (22, 0, 23, 59)}))
+
+# 내보낸 파일의 시간표는 기준 구현의 예비 시간표와 같아야 하고, 묶음으로 읽어도 한 줄씩 읽은 것과 같아야 함
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_export_matches_reference(tmp_path, seed):
+    catalog, subjects = small_catalog(seed)
+    constraints = random_constraints(seed, subjects) if seed % 2 else None
+    reference = reference_timetables(subjects)
+    if constraints is not None:
+        reference = [timetable for timetable in reference if reference_satisfies(timetable, constraints)]
+    path = str(tmp_path / "timetables.ttr")
+    assert export_timetables(path, catalog, subjects, constraints, chunk_rows=7) == len(reference)
+
+    with TimetableExport(path, catalog) as export:
+        assert len(export) == len(reference) and export.subject_names == list(catalog.subjects)
+        assert timetable_set(export.timetable(i) for i in range(len(export))) == timetable_set(reference)
+        rows = []
+        for start, chunk in export.chunks(rows=5):
+            assert start == len(rows)
+            rows.extend(tuple(chunk[i:i + export.width]) for i in range(0, len(chunk), export.width))
+        assert rows == [export[i] for i in range(len(export))]
+
+# 빈 파일, 잘린 파일, 다른 과목 구성의 카탈로그는 ValueError 로 알려야 함
+def test_export_rejects_bad_files(tmp_path):
+    catalog, subjects = small_catalog(0)
+    path = str(tmp_path / "timetables.ttr")
+    export_timetables(path, catalog, subjects)
+    with open(path, "rb") as file:
+        data = file.read()
+    for name, blob in [("empty", b""), ("short", data[:10]), ("truncated", data[:-4]), ("other", b"X" * len(data))]:
+        bad_path = str(tmp_path / f"{name}.ttr")
+        with open(bad_path, "wb") as file:
+            file.write(blob)
+        with pytest.raises(ValueError):
+            TimetableExport(bad_path)
+    other_catalog, _ = small_catalog(1)
+    with pytest.raises(ValueError):
+        TimetableExport(path, other_catalog)
+
+# 배정은 학생의 과목마다 강의 하나씩인 예비 시간표여야 하고, 넣은 선택 과목은 원하는 것이며 서로 겹치지 않아야 함
+def check_assignment(assignment, subjects, preferences):
+    timetable, chosen = assignment
+    assert timetable_set([timetable]) <= timetable_set(reference_timetables(subjects))
+    assert all(elective in preferences for elective in chosen)
+    assert not any(reference_conflict(a, b) for a, b in combinations(timetable + chosen, 2))
+
+# 정원이 없으면 예비 시간표가 하나라도 있는 학생은 모두 배정되어야 함
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_cohort_without_capacity_matches_reference(seed):
+    catalog, subjects = small_catalog(seed)
+    rnd = random.Random(seed)
+    students = [(rnd.sample(subjects, rnd.randint(1, len(subjects))), rnd.sample(catalog.electives, 3)) for _ in range(12)]
+    allocator = allocate_cohort(students, catalog.index)
+    for key, (student_subjects, preferences) in enumerate(students):
+        assignment = allocator.assignments[key]
+        assert (assignment is not None) == bool(reference_timetables(student_subjects))
+        if assignment is not None:
+            check_assignment(assignment, student_subjects, preferences)
+
+# 정원이 빠듯해도 배정은 정원을 넘지 않아야 하고, 학생을 빼면 자리가 돌아와야 함
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_cohort_respects_capacity(seed):
+    catalog, subjects = small_catalog(seed, professors=1)
+    rnd = random.Random(seed)
+    students = [(subjects, rnd.sample(catalog.electives, 3)) for _ in range(30)]
+    for subject in subjects:
+        for lecture in subject.lectures:
+            lecture.capacity = rnd.randint(8, 14)
+    for elective in catalog.electives:
+        elective.capacity = rnd.randint(3, 8)
+    allocator = allocate_cohort(students, catalog.index)
+
+    used = {}
+    for key, (student_subjects, preferences) in enumerate(students):
+        assignment = allocator.assignments[key]
+        if assignment is not None:
+            check_assignment(assignment, student_subjects, preferences)
+            for lecture in assignment[0] + assignment[1]:
+                used[lecture] = used.get(lecture, 0) + 1
+    assert all(count <= lecture.capacity for lecture, count in used.items())
+    assert all(allocator.free_seats(lecture) == lecture.capacity - used.get(lecture, 0) for lecture in catalog.lectures)
+
+    for key in range(len(students)):
+        allocator.remove_student(key)
+    assert all(allocator.free_seats(lecture) == lecture.capacity for lecture in catalog.lectures)
+    with pytest.raises(KeyError):
+        allocator.remove_student(0)
+    assert allocator.assignments == {} and allocator.unassigned() == []
+
+# valid_groups 는 찾은 시간 구성 수이고, 교수 조합까지 펼친 시간표 수는 count 로 따로 구해야 함
+@pytest.mark.parametrize("seed", SEEDS[:4])
+def test_stats_count_time_groups(seed):
+    catalog, subjects = small_catalog(seed)
+    stats = SearchStats()
+    rows = list(create_timetable_groups(subjects, catalog.index, stats))
+    assert stats.valid_groups == len(rows) == count_preliminary_timetables(subjects, catalog.index, by_group=True)
+    assert stats.as_dict()["valid_groups"] == len(rows) < reference_count(subjects)
+    assert stats.explored >= len(rows) and stats.conflict_checks > 0
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+
+from test_timetable_engine import small_catalog
+from timetable_benchmark import reference_timetables
+from timetable_engine import load_catalog, save_compiled_catalog
+from timetable_server import RequestError, TimetableService
+
+# 작은 카탈로그를 컴파일해 두고 그 파일로 서비스를 만들어 coroutine(service) 을 실행하는 함수
+def run_service(tmp_path, seed, coroutine):
+    path = str(tmp_path / "catalog.ttc")
+    save_compiled_catalog(path, small_catalog(seed)[0])
+
+    async def main():
+        service = TimetableService(load_catalog(path), path, 1, cache_directory=str(tmp_path / "cache"))
+        try:
+            return await coroutine(service)
+        finally:
+            service.close()
+
+    return asyncio.run(main())
+
+# 요청을 JSON 으로 보내 응답을 돌려주는 코루틴
+async def post(service, path, request):
+    status, response = await service.dispatch("POST", path, json.dumps(request).encode("utf-8"))
+    assert status == 200
+    return response
+
+# 커서로 모든 페이지를 넘기면 기준 구현의 예비 시간표가 한 번씩 나와야 함
+@pytest.mark.parametrize("seed", range(2))
+def test_pages_match_reference(tmp_path, seed):
+    async def walk(service):
+        names = list(service.catalog.subjects)
+        request = {"subjects": names, "limit": 7}
+        page = await post(service, "/timetables", request)
+        rows = list(page["timetables"])
+        while page["next_cursor"] is not None:
+            page = await post(service, "/timetables", dict(request, cursor=page["next_cursor"]))
+            rows.extend(page["timetables"])
+        subjects = list(service.catalog.subjects.values())
+        expected = sorted(sorted(service.catalog.lecture_ids[lecture] for lecture in timetable)
+                          for timetable in reference_timetables(subjects))
+        return page["count"], sorted(map(sorted, rows)), expected
+
+    count, rows, expected = run_service(tmp_path, seed, walk)
+    assert count == len(expected) and rows == expected
+
+# 잘못된 deadline 은 결과가 캐시에 있어도 없어도 400 이어야 하고, 디스크 캐시의 결과는 새 메모리 캐시에서도 쓰여야 함
+def test_deadline_checked_before_cache(tmp_path):
+    async def check(service):
+        request = {"subjects": list(service.catalog.subjects)}
+        first = await post(service, "/timetables", request)
+        statuses = []
+        for deadline in (-1, 0, "soon"):
+            try:
+                await post(service, "/timetables", dict(request, deadline=deadline))
+            except RequestError as error:
+                statuses.append(error.status)
+        service.pages.entries.clear()
+        service.results.entries.clear()
+        again = await post(service, "/timetables", request)
+        return first, statuses, again, service.results.hits
+
+    first, statuses, again, hits = run_service(tmp_path, 0, check)
+    assert statuses == [400, 400, 400]
+    assert again == first and hits == 1
@@ -0,0 +1,364 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import islice, product
+
+from timetable_engine import (
+    DAYS, CatalogBuilder, allocate_cohort, count_preliminary_timetables, create_preliminary_timetables,
+    create_timetable_groups, iter_meetings, pack_electives, recommend_minimum_removals, recommend_removals)
+
+# 수업 시작 시각 (시, 분) - 대학 시간표처럼 75분 수업이 90분 간격으로 있음
+SLOT_STARTS = [(9, 0), (10, 30), (12, 0), (13, 30), (15, 0), (16, 30)]
+SLOT_MINUTES = 75  # 수업 한 번의 길이 (분)
+REFERENCE_LIMIT = 200000  # 기준 구현으로 확인할 최대 조합 수 (넘으면 확인을 건너뜀, ENUMERATION_LIMIT 보다 크면 안 됨)
+ENUMERATION_LIMIT = 200000  # 교수 조합까지 펼친 시간표를 측정할 최대 개수
+COHORT_SLACK = 1.3  # 분반 배정 측정에서 과목마다 전체 정원이 학생 수의 몇 배인지
+COHORT_ELECTIVES = 4  # 분반 배정 측정에서 학생마다 원하는 선택 과목 수
+COHORT_MOVES = 200  # 분반 배정 측정에서 빼고 다시 넣어 볼 학생 수
+STARTUP_IMPORT_BUDGET = 0.1  # 새 인터프리터에서 timetable_engine 을 import 하는 데 허용할 시간 (초, 인터프리터 시작 시간 제외)
+STARTUP_GUI_BUDGET = 1.0  # GUI 를 실행해 메인 화면이 뜰 때까지 허용할 시간 (초, 인터프리터 시작 시간 제외)
+# timetable_engine 을 import 할 때 읽지 않아야 하는 (처음 쓸 때 읽는) 모듈
+DEFERRED_MODULES = ("tkinter", "csv", "cProfile", "pstats", "concurrent.futures", "multiprocessing")
+STARTUP_CHECK_OPTION = "--startup-check"  # GUI 를 메인 화면을 그리자마자 끝내게 하는 옵션
+BASE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))  # 시작 시간을 잴 때 하위 프로세스를 실행할 폴더
+# GUI 스크립트 파일 패턴 (파일 이름의 한글은 파일 시스템마다 유니코드 정규화가 달라 학번으로 찾음)
+GUI_PATTERN = os.path.join(BASE_DIRECTORY, "*_20243298*.py")
+# GUI 스크립트를 import 만 하고 tkinter 를 읽었는지 출력하는 코드 ({path} 에 스크립트 경로)
+GUI_IMPORT_CODE = (
+    "import importlib.util, sys\n"
+    "spec = importlib.util.spec_from_file_location('timetable_gui', {path!r})\n"
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+    "print(any(name.startswith('tkinter') for name in sys.modules))")
+
+# 규모별 카탈로그 설정 (subjects: 과목 수, sections: 과목마다 서로 다른 시간 수, professors: 같은 시간의 교수 수,
+# meetings: 강의마다 주당 수업 수, shared: 다른 과목과 같은 시간을 쓸 확률, electives: 선택 과목 수)
+SCALES = {
+    "small": {"subjects": 4, "sections": 3, "professors": 2, "meetings": 2, "shared": 0.3, "electives": 4},
+    "medium": {"subjects": 5, "sections": 4, "professors": 2, "meetings": 2, "shared": 0.3, "electives": 8},
+    "large": {"subjects": 7, "sections": 5, "professors": 3, "meetings": 2, "shared": 0.4, "electives": 12},
+    "huge": {"subjects": 9, "sections": 6, "professors": 4, "meetings": 2, "shared": 0.4, "electives": 16},
+}
+
+# 수업 시간을 하나 고르는 함수 (shared 확률로 여러 과목이 함께 쓰는 시간에서 고름)
+def random_meeting(rnd, shared_slots, shared):
+    if shared_slots and rnd.random() < shared:
+        return rnd.choice(shared_slots)
+    return rnd.choice(DAYS[:5]), rnd.choice(SLOT_STARTS)
+
+# 강의 일정을 만드는 함수 (수업마다 다른 요일, 같은 요일이면 다른 시각)
+def random_schedule(rnd, meetings, shared_slots, shared):
+    schedule = {}
+    while sum(len(times) for times in schedule.values()) < meetings:
+        day, (hour, minute) = random_meeting(rnd, shared_slots, shared)
+        end = hour * 60 + minute + SLOT_MINUTES
+        interval = (hour, minute, end // 60, end % 60)
+        if interval not in schedule.get(day, ()):
+            schedule.setdefault(day, []).append(interval)
+    return schedule
+
+# initialize_subjects 와 비슷한 모양의 가상 카탈로그를 만드는 함수
+# (과목마다 시간이 다른 분반이 몇 개 있고, 같은 시간에 교수만 다른 강의가 여러 개 있음)
+def generate_catalog(subjects=6, sections=4, professors=3, meetings=2, shared=0.3, electives=8, seed=0):
+    rnd = random.Random(seed)
+    shared_slots = [(day, start) for day in DAYS[:5] for start in SLOT_STARTS]
+    rnd.shuffle(shared_slots)
+    shared_slots = shared_slots[:max(1, len(shared_slots) // 3)]
+
+    builder = CatalogBuilder()
+    for i in range(subjects):
+        name = f"과목{i + 1}"
+        for k in range(sections):
+            schedule = random_schedule(rnd, meetings, shared_slots, shared)
+            for p in range(professors):
+                builder.add_lecture(name, f"교수{i + 1}-{k + 1}-{p + 1}", schedule, f"{name}분반{k + 1}")
+    for i in range(electives):
+        schedule = random_schedule(rnd, meetings, shared_slots, shared)
+        builder.add_lecture(f"교양{i + 1}", f"교양교수{i + 1}", schedule, elective=True)
+    return builder.catalog()
+
+# 기준 구현: 처음 버전과 같이 모든 조합을 만들어 시간 충돌과 분반 일치를 하나씩 확인하는 함수
+def reference_conflict(lecture1, lecture2):
+    for day, times1 in iter_meetings(lecture1.schedule):
+        for other_day, times2 in iter_meetings(lecture2.schedule):
+            if day == other_day:
+                start1, end1 = times1[0] * 60 + times1[1], times1[2] * 60 + times1[3]
+                start2, end2 = times2[0] * 60 + times2[1], times2[2] * 60 + times2[3]
+                if not (end1 <= start2 or end2 <= start1):
+                    return True
+    return False
+
+def reference_timetables(subjects):
+    valid_timetables = []
+    for combination in product(*[subject.lectures for subject in subjects]):
+        timetable = []
+        subject_sections = {}
+        conflict = False
+        for lecture in combination:
+            if any(reference_conflict(lecture, existing) for existing in timetable):
+                conflict = True
+                break
+            if subject_sections.setdefault(lecture.subject, lecture.section) != lecture.section:
+                conflict = True
+                break
+            timetable.append(lecture)
+        if not conflict:
+            valid_timetables.append(timetable)
+    return valid_timetables
+
+def reference_removals(timetable, electives):
+    return [elective for elective in electives if any(reference_conflict(elective, lecture) for lecture in timetable)]
+
+# 시간표 목록을 순서와 상관없이 비교할 수 있는 집합으로 만드는 함수
+def timetable_set(timetables):
+    return {tuple(id(lecture) for lecture in timetable) for timetable in timetables}
+
+# 함수를 실행해 (결과, 걸린 시간(초), 최대 메모리(바이트)) 를 돌려주는 함수
+def measure(function, *args, **kwargs):
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+# 같은 작업을 repeat 번 실행해 가장 빠른 시간과 가장 큰 메모리를 기록하는 함수
+def timed(results, name, repeat, function, *args, **kwargs):
+    best = peak = None
+    for _ in range(repeat):
+        value, elapsed, memory = measure(function, *args, **kwargs)
+        best = elapsed if best is None else min(best, elapsed)
+        peak = memory if peak is None else max(peak, memory)
+    results[name] = {"seconds": round(best, 6), "peak_bytes": peak}
+    return value
+
+# 한 규모의 카탈로그로 엔진을 측정하고 기준 구현과 결과가 같은지 확인하는 함수
+def run_case(scale, settings, seed=0, repeat=1, check_reference=True):
+    catalog = generate_catalog(seed=seed, **settings)
+    subjects = list(catalog.subjects.values())
+    electives = catalog.electives
+    case = {"scale": scale, "seed": seed, "settings": settings, "lectures": len(catalog.lectures),
+            "combinations": 1, "timings": {}, "checks": {}}
+    for subject in subjects:
+        case["combinations"] *= len(subject.lectures)
+    timings, checks = case["timings"], case["checks"]
+
+    # 시간 구성(묶음 조합)은 모두 찾고, 교수 조합까지 펼친 시간표는 ENUMERATION_LIMIT 개까지만 만듦
+    group_rows = timed(timings, "create_timetable_groups", repeat,
+                       lambda: list(create_timetable_groups(subjects, catalog.index)))
+    timetables = timed(timings, "create_preliminary_timetables", repeat,
+                       lambda: list(islice(create_preliminary_timetables(subjects, catalog.index), ENUMERATION_LIMIT)))
+    count = timed(timings, "count_preliminary_timetables", repeat, count_preliminary_timetables, subjects, catalog.index)
+    case["timetables"] = count
+    case["timetable_groups"] = len(group_rows)
+    case["enumerated"] = len(timetables)
+    checks["count_matches_enumeration"] = (
+        count == len(timetables) if len(timetables) < ENUMERATION_LIMIT else count >= len(timetables))
+
+    if check_reference and case["combinations"] <= REFERENCE_LIMIT:
+        reference = timed(timings, "reference_timetables", 1, reference_timetables, subjects)
+        checks["same_timetables_as_reference"] = timetable_set(timetables) == timetable_set(reference)
+    else:
+        checks["same_timetables_as_reference"] = None
+
+    base = timetables[0] if timetables else []
+    del group_rows, timetables
+    chosen, dropped, optimal = timed(timings, "pack_electives", repeat, pack_electives, list(base), electives,
+                                     index=catalog.index)
+    case["electives_kept"] = len(chosen)
+    case["electives_optimal"] = optimal
+    # 넣은 선택 과목은 예비 시간표와도, 서로 간에도 겹치지 않아야 하고, 처음 버전의 앞에서부터 넣기보다 적으면 안 됨
+    greedy = []
+    for elective in electives:
+        if not any(reference_conflict(elective, lecture) for lecture in list(base) + greedy):
+            greedy.append(elective)
+    placed = list(base) + chosen
+    checks["pack_electives_valid"] = (
+        not any(reference_conflict(a, b) for i, a in enumerate(placed) for b in placed[i + 1:] if a in chosen or b in chosen)
+        and len(chosen) + len(dropped) == len(electives) and len(chosen) >= len(greedy))
+
+    removals = timed(timings, "recommend_removals", repeat, recommend_removals, base, electives, catalog.index)
+    checks["same_removals_as_reference"] = (
+        [id(lecture) for lecture in removals] == [id(lecture) for lecture in reference_removals(base, electives)])
+    timed(timings, "recommend_minimum_removals", repeat, recommend_minimum_removals, subjects, electives, catalog.index)
+    return case
+
+# 분반 배정 측정용 카탈로그 설정 (학생마다 과목 10 개)
+COHORT_SETTINGS = {"subjects": 10, "sections": 6, "professors": 2, "meetings": 2, "shared": 0.0, "electives": 12}
+
+# 학생 수만큼 정원을 붙인 카탈로그로 분반 배정을 재고 배정이 정원, 충돌, 선호를 지키는지 확인하는 함수
+def run_cohort_case(students, seed=0, slack=COHORT_SLACK):
+    rnd = random.Random(seed)
+    catalog = generate_catalog(seed=seed, **COHORT_SETTINGS)
+    subjects = list(catalog.subjects.values())
+    for subject in subjects:
+        for lecture in subject.lectures:
+            lecture.capacity = int(students * slack / len(subject.lectures)) + 1
+    for elective in catalog.electives:
+        elective.capacity = students // COHORT_ELECTIVES
+    cohort = [(subjects, rnd.sample(catalog.electives, COHORT_ELECTIVES)) for _ in range(students)]
+    case = {"scale": "cohort", "seed": seed, "settings": dict(COHORT_SETTINGS, students=students, slack=slack),
+            "lectures": len(catalog.lectures), "timings": {}, "checks": {}}
+    timings, checks = case["timings"], case["checks"]
+
+    # 메모리 추적은 배정을 몇 배 느리게 하므로 여기서는 시간만 잼
+    started = time.perf_counter()
+    allocator = allocate_cohort(cohort, catalog.index)
+    timings["allocate_cohort"] = {"seconds": round(time.perf_counter() - started, 6)}
+    moved = range(min(COHORT_MOVES, students))
+    started = time.perf_counter()
+    for key in moved:
+        allocator.remove_student(key)
+    for key in moved:
+        allocator.add_student(key, *cohort[key])
+    timings["remove_and_add_students"] = {"seconds": round(time.perf_counter() - started, 6)}
+
+    used = {}
+    valid = True
+    for key, (student_subjects, preferences) in enumerate(cohort):
+        assignment = allocator.assignments[key]
+        if assignment is None:
+            continue
+        timetable, chosen = assignment
+        placed = timetable + chosen
+        valid = valid and [lecture.subject for lecture in timetable] == [subject.name for subject in student_subjects]
+        valid = valid and all(elective in preferences for elective in chosen)
+        valid = valid and not any(reference_conflict(a, b) for i, a in enumerate(placed) for b in placed[i + 1:])
+        for lecture in placed:
+            used[lecture] = used.get(lecture, 0) + 1
+    case["unassigned"] = len(allocator.unassigned())
+    case["electives_placed"] = sum(len(assignment[1]) for assignment in allocator.assignments.values() if assignment)
+    checks["cohort_valid"] = valid
+    checks["cohort_within_capacity"] = all(count <= lecture.capacity for lecture, count in used.items())
+    return case
+
+# 새 파이썬 프로세스로 args 를 repeat 번 실행해 (가장 짧은 시간(초), 마지막 실행 결과) 를 돌려주는 함수
+# (prefix 는 파이썬 앞에 붙일 명령, 예: 가상 화면에서 띄우는 xvfb-run)
+def run_python(repeat, *args, prefix=()):
+    best = completed = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([*prefix, sys.executable, *args], cwd=BASE_DIRECTORY, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, completed
+
+# GUI 스크립트 경로 (없으면 None)
+def find_gui_script():
+    paths = glob.glob(GUI_PATTERN)
+    return paths[0] if paths else None
+
+# GUI 를 띄울 때 파이썬 앞에 붙일 명령 (화면이 있으면 빈 리스트, 없으면 xvfb-run 가상 화면, 둘 다 없으면 None)
+def display_prefix():
+    if sys.platform in ("win32", "darwin") or os.environ.get("DISPLAY"):
+        return []
+    xvfb = shutil.which("xvfb-run")
+    return [xvfb, "-a"] if xvfb else None
+
+# 새 인터프리터에서 timetable_engine 을 import 하는 데 걸린 시간 (초, 인터프리터 시작 시간 제외, 실패하면 None)
+def measure_engine_import(repeat=1):
+    baseline, _ = run_python(repeat, "-c", "pass")
+    elapsed, completed = run_python(repeat, "-c", "import timetable_engine")
+    return elapsed - baseline if completed.returncode == 0 else None
+
+# timetable_engine 을 import 했을 때 읽힌 DEFERRED_MODULES 리스트
+def engine_loaded_modules():
+    code = ("import json, sys, timetable_engine\n"
+            f"print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))")
+    _, completed = run_python(1, "-c", code)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr)
+    return json.loads(completed.stdout)
+
+# GUI 스크립트를 import 만 했을 때 tkinter 를 읽는지 여부
+def gui_import_loads_tkinter(path):
+    _, completed = run_python(1, "-c", GUI_IMPORT_CODE.format(path=path))
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr)
+    return completed.stdout.strip() != "False"
+
+# GUI 를 실행해 메인 화면이 뜰 때까지의 시간을 재는 함수 (돌려주는 값: (초, 오류 메시지))
+# (같은 방법으로 띄운 아무것도 하지 않는 인터프리터의 시간을 빼며, 화면도 xvfb-run 도 없으면 잴 수 없다는 오류를 돌려줌)
+def measure_gui_startup(path, repeat=1):
+    prefix = display_prefix()
+    if prefix is None:
+        return None, "화면(DISPLAY)도 xvfb-run 도 없어 GUI 시작 시간을 잴 수 없습니다"
+    baseline, _ = run_python(repeat, "-c", "pass", prefix=prefix)
+    elapsed, completed = run_python(repeat, path, STARTUP_CHECK_OPTION, prefix=prefix)
+    if completed.returncode != 0:
+        return None, completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "GUI 실행에 실패했습니다"
+    return elapsed - baseline, None
+
+# 엔진 import 와 GUI 메인 화면이 뜨기까지의 시간을 재고 시작 시간 예산 안인지 확인하는 함수
+# (GUI 시간을 잴 수 없는 환경이면 통과로 치지 않고 실패와 그 이유를 남김)
+def run_startup_case(repeat=1):
+    case = {"scale": "startup", "budgets": {"import": STARTUP_IMPORT_BUDGET, "gui": STARTUP_GUI_BUDGET},
+            "timings": {}, "checks": {}}
+    timings, checks = case["timings"], case["checks"]
+
+    elapsed = measure_engine_import(repeat)
+    timings["import_engine"] = {"seconds": None if elapsed is None else round(elapsed, 6)}
+    checks["import_within_budget"] = elapsed is not None and elapsed <= STARTUP_IMPORT_BUDGET
+    checks["import_defers_heavy_modules"] = engine_loaded_modules() == []
+
+    path = find_gui_script()
+    if path is None:
+        checks["gui_import_without_tkinter"] = checks["gui_within_budget"] = False
+        case["gui_error"] = "GUI 스크립트를 찾지 못했습니다"
+        return case
+    checks["gui_import_without_tkinter"] = not gui_import_loads_tkinter(path)
+    elapsed, error = measure_gui_startup(path, repeat)
+    if error is not None:
+        case["gui_error"] = error
+    else:
+        timings["gui_main_screen"] = {"seconds": round(elapsed, 6)}
+    checks["gui_within_budget"] = elapsed is not None and elapsed <= STARTUP_GUI_BUDGET
+    return case
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 카탈로그로 시간표 엔진의 속도와 메모리를 재고 기준 구현과 결과를 비교합니다.")
+    parser.add_argument("--scales", default="small,medium,large", help=f"측정할 규모 (쉼표로 구분, {', '.join(SCALES)})")
+    parser.add_argument("--seed", type=int, default=0, help="카탈로그를 만들 때 쓸 난수 시드")
+    parser.add_argument("--repeat", type=int, default=3, help="작업마다 반복할 횟수 (가장 빠른 시간을 기록)")
+    parser.add_argument("--no-reference", action="store_true", help="기준 구현과의 비교를 건너뜀")
+    parser.add_argument("--cohort", type=int, default=0, metavar="STUDENTS",
+                        help="학생 STUDENTS 명의 분반 배정도 측정함 (과목 10 개, 0 이면 건너뜀)")
+    parser.add_argument("--startup", action="store_true", help="엔진 import 와 GUI 메인 화면까지의 시작 시간도 측정함")
+    parser.add_argument("-o", "--output", default="-", help="결과 파일 (JSON, 기본값은 표준 출력)")
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"알 수 없는 규모입니다: {', '.join(unknown)}")
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": platform.python_version(),
+              "platform": platform.platform(), "seed": args.seed, "repeat": args.repeat, "cases": []}
+    for scale in scales:
+        report["cases"].append(run_case(scale, SCALES[scale], args.seed, args.repeat, not args.no_reference))
+    if args.cohort > 0:
+        report["cases"].append(run_cohort_case(args.cohort, args.seed))
+    if args.startup:
+        report["cases"].append(run_startup_case(args.repeat))
+    report["passed"] = all(check is not False for case in report["cases"] for check in case["checks"].values())
+
+    text = json.dumps(report, ensure_ascii=False, indent=1)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    return 0 if report["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
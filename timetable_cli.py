@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import sys
+from itertools import count, islice
+
+from timetable_engine import (
+    ResultCache, SearchStats, TimetableConstraints, count_preliminary_timetables, create_preliminary_timetables,
+    export_timetables, load_catalog, measure_phase, recommend_minimum_removals, run_profiled, save_compiled_catalog, selection_fingerprint,
+    selection_lectures, timetable_variant)
+
+DEFAULT_LIMIT = 10  # 요청마다 돌려줄 예비 시간표 수 기본값
+REQUEST_CACHE_SIZE = 4096  # 같은 선택을 한 요청의 결과를 메모리에 기억해 둘 개수
+
+# 학생 한 명의 요청을 계산하는 함수를 만드는 함수 (카탈로그와 충돌 인덱스는 모든 요청이 함께 씀)
+# 결과는 선택된 강의 안에서의 번호로 캐시에 넣고, 꺼낼 때 카탈로그 전체의 강의 번호로 바꿈
+# (with_stats 면 요청마다 탐색 측정값과 단계별 시간을 "stats" 로 붙이고, totals 에도 더함)
+# (export_directory 를 주면 요청마다 모든 예비 시간표를 그 디렉터리에 요청 순서 번호로 내보내고 "export" 로 알려 줌)
+# (workers 가 2 이상이거나 None 이면 예비 시간표를 여러 프로세스로 나눠 찾음, 순서는 한 프로세스일 때와 같음)
+def make_solver(catalog, limit, cache_directory=None, with_stats=False, totals=None, export_directory=None, workers=1):
+    cache = ResultCache(REQUEST_CACHE_SIZE, cache_directory)
+    export_numbers = count()
+    if export_directory is not None:
+        os.makedirs(export_directory, exist_ok=True)
+
+    def compute(subjects, electives, constraints, stats):
+        numbers = {id(lecture): i for i, lecture in enumerate(selection_lectures(subjects, electives))}
+        result = {"count": count_preliminary_timetables(subjects, catalog.index, stats=stats, constraints=constraints)}
+        timetables = create_preliminary_timetables(
+            subjects, catalog.index, workers=workers, constraints=constraints, stats=stats)
+        result["timetables"] = [[numbers[id(lecture)] for lecture in timetable] for timetable in islice(timetables, limit)]
+        if electives:
+            removals, groups = recommend_minimum_removals(subjects, electives, catalog.index, stats, constraints)
+            if groups is not None:
+                removed = {id(lecture) for lecture in removals}
+                result["removals"] = [i for i, lecture in enumerate(electives) if id(lecture) in removed]
+                result["base"] = [numbers[id(lecture)] for lecture in timetable_variant(groups, 0)]
+        return result
+
+    # 요청의 과목 이름과 선택 과목 번호를 카탈로그의 과목, 강의로 바꾸는 함수 (없는 과목, 범위 밖 번호는 ValueError)
+    def select(subject_names, elective_numbers):
+        if not isinstance(subject_names, list) or not isinstance(elective_numbers, list):
+            raise ValueError("subjects 와 electives 는 리스트여야 합니다")
+        unknown = [name for name in subject_names if not isinstance(name, str) or name not in catalog.subjects]
+        if unknown:
+            raise ValueError(f"카탈로그에 없는 과목입니다: {unknown!r}")
+        invalid = [number for number in elective_numbers
+                   if type(number) is not int or not 0 <= number < len(catalog.electives)]
+        if invalid:
+            raise ValueError(f"선택 과목 번호는 0 이상 {len(catalog.electives)} 미만의 정수여야 합니다: {invalid!r}")
+        return [catalog.subjects[name] for name in subject_names], [catalog.electives[number] for number in elective_numbers]
+
+    def solve(subject_names, elective_numbers, constraints, stats):
+        subjects, electives = select(subject_names, elective_numbers)
+        key = selection_fingerprint(subjects, electives, ("request", limit, constraints and constraints.key()))
+        with measure_phase(stats, "solve"):
+            result = cache.get(key)
+            cached = result is not None
+            if not cached:
+                result = compute(subjects, electives, constraints, stats)
+                cache.put(key, result)
+
+        with measure_phase(stats, "format"):
+            lecture_ids = [catalog.lecture_ids[lecture] for lecture in selection_lectures(subjects, electives)]
+            response = {"count": result["count"],
+                        "timetables": [[lecture_ids[i] for i in timetable] for timetable in result["timetables"]]}
+            if "removals" in result:
+                response["removals"] = [elective_numbers[i] for i in result["removals"]]
+                response["base"] = [lecture_ids[i] for i in result["base"]]
+        if export_directory is not None:
+            path = os.path.join(export_directory, f"{next(export_numbers):06d}.ttr")
+            with measure_phase(stats, "export"):
+                response["export"] = {"path": path, "count": export_timetables(path, catalog, subjects, constraints)}
+        if with_stats:
+            response["stats"] = dict(stats.as_dict(), cached=cached)
+        return response
+
+    # 요청: {"id": ..., "subjects": [과목명, ...], "electives": [선택 과목 번호, ...], "constraints": {조건 이름: 값, ...}}
+    # (조건 이름은 TimetableConstraints 의 인자 이름과 같음)
+    def solve_request(request):
+        response = {"id": request.get("id")}
+        stats = SearchStats() if with_stats or totals is not None else None
+        try:
+            constraints = TimetableConstraints(**request["constraints"]) if request.get("constraints") else None
+            response.update(solve(request.get("subjects", []), request.get("electives", []), constraints, stats))
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            response["error"] = f"잘못된 요청입니다: {error!r}"
+        if totals is not None:
+            totals.merge(stats)
+        return response
+
+    return solve_request
+
+# 요청 한 줄을 읽어 풀고 응답을 돌려주는 함수 (JSON 객체가 아닌 줄은 {"id": null, "error": ...} 로 알리고 넘어감)
+def solve_line(solve_request, line):
+    try:
+        request = json.loads(line)
+    except ValueError as error:
+        return {"id": None, "error": f"JSON 이 아닌 요청입니다: {error}"}
+    if not isinstance(request, dict):
+        return {"id": None, "error": "요청은 JSON 객체여야 합니다"}
+    return solve_request(request)
+
+# 요청 파일(JSONL)을 한 줄씩 읽어 결과를 바로 한 줄씩 쓰는 함수
+# (진단 옵션을 하나라도 켜면 모든 요청의 합계와 프로파일 결과를 diagnostics 에 JSON 한 줄로 씀)
+def run(catalog, requests, output, limit=DEFAULT_LIMIT, cache_directory=None, with_stats=False, profile=False,
+        trace_memory=False, diagnostics=sys.stderr, export_directory=None, workers=1):
+    totals = SearchStats() if with_stats or profile or trace_memory else None
+    solve_request = make_solver(catalog, limit, cache_directory, with_stats, totals, export_directory, workers)
+
+    def solve_all():
+        for line in requests:
+            if not line.strip():
+                continue
+            response = solve_line(solve_request, line)
+            output.write(json.dumps(response, ensure_ascii=False) + "\n")
+
+    if totals is None:
+        solve_all()
+        return
+    run_profiled(solve_all, totals, profile, trace_memory)
+    diagnostics.write(json.dumps({"totals": totals.as_dict()}, ensure_ascii=False) + "\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="카탈로그와 학생별 요청(JSONL)으로 시간표를 한꺼번에 계산합니다.")
+    parser.add_argument("catalog", help="카탈로그 파일 (JSON, CSV 또는 컴파일된 카탈로그)")
+    parser.add_argument("requests", nargs="?", help="요청 파일 (JSONL, '-' 이면 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="결과 파일 (JSONL, 기본값은 표준 출력)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="요청마다 돌려줄 예비 시간표 수")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="예비 시간표를 나눠 찾을 프로세스 수 (0 이면 CPU 수, 기본값 1 은 나누지 않음)")
+    parser.add_argument("--cache-dir", help="여러 번 실행해도 결과를 다시 쓰도록 저장해 둘 디렉터리")
+    parser.add_argument("--compile", metavar="PATH", help="읽은 카탈로그를 빠르게 다시 열 수 있는 이진 파일로 저장")
+    parser.add_argument("--export-dir", help="요청마다 모든 예비 시간표를 이진 파일(.ttr)로 내보낼 디렉터리")
+    parser.add_argument("--stats", action="store_true", help="결과마다 탐색 측정값과 단계별 시간을 \"stats\" 로 붙임")
+    parser.add_argument("--profile", action="store_true", help="cProfile 로 재서 상위 함수 목록을 표준 오류로 씀")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc 으로 잰 최대 메모리를 표준 오류로 씀")
+    args = parser.parse_args(argv)
+    if args.requests is None and args.compile is None:
+        parser.error("요청 파일 또는 --compile 중 하나는 있어야 합니다")
+    if args.workers < 0:
+        parser.error("--workers 는 0 이상이어야 합니다")
+
+    catalog = load_catalog(args.catalog)
+    if args.compile is not None:
+        save_compiled_catalog(args.compile, catalog)
+    if args.requests is None:
+        return
+    requests = sys.stdin if args.requests == "-" else open(args.requests, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run(catalog, requests, output, args.limit, args.cache_dir, args.stats, args.profile, args.trace_memory,
+            export_directory=args.export_dir, workers=args.workers or None)
+    finally:
+        if requests is not sys.stdin:
+            requests.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2092 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import pickle
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager, nullcontext
+from heapq import heappush, heapreplace
+from itertools import chain, count, islice, product
+from math import exp, prod
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]  # 요일 순서
+MINUTES_PER_DAY = 24 * 60  # 하루를 분 단위로 나눈 칸 수
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}  # 요일별 마스크 위치
+EARLY_CLASS_MINUTE = 10 * 60  # 이 시각보다 먼저 시작하는 수업은 이른 수업
+DEFAULT_RANK_WEIGHTS = {"days": 60, "gaps": 1, "early": 30, "professor": 30}  # 추천 점수 가중치 (단위: 공강 1분)
+RANKED_TIMETABLE_COUNT = 10  # 추천 시간표 개수 기본값
+SHARDS_PER_WORKER = 4  # 병렬 탐색에서 작업 프로세스 하나에 돌아갈 작업 수의 목표치
+ELECTIVE_TIME_LIMIT = 0.3  # 선택 과목 최적 배치를 찾는 데 쓸 최대 시간 (초), 넘기면 그때까지의 최선을 씀
+ALLOCATION_ELECTIVE_TIME_LIMIT = 0.02  # 학생마다 선택 과목 최적 배치를 찾는 데 쓸 최대 시간 (초)
+ALLOCATION_REPAIR_CANDIDATES = 2  # 자리가 없는 학생을 위해 옮겨 볼 시간 구성 수
+ALLOCATION_REPAIR_MOVES = 3  # 자리 하나를 비우려고 다른 묶음으로 옮겨 볼 학생 수
+ALLOCATION_SEARCH_NODES = 500  # 학생 한 명의 시간 구성을 찾을 때 탐색할 최대 경우의 수 (넘으면 그때까지의 최선을 씀)
+ALLOCATION_PRICE_GROWTH = 8.0  # 분반 배정에서 꽉 찬 묶음의 값이 빈 묶음의 몇 배(e 의 지수)인지
+ALLOCATION_PREFERENCE_COST = 2.0  # 분반 배정에서 원하는 선택 과목과 겹치는 묶음에 더할 값 (빈 묶음의 값은 1)
+MAX_INDEXED_LECTURES = 3000  # 카탈로그 전체 충돌 인덱스를 만들 최대 강의 수 (넘으면 마스크로 바로 비교)
+ELECTIVE_KINDS = {"elective", "선택"}  # 카탈로그 CSV 의 kind 칸에서 선택 과목을 뜻하는 값
+COMPILED_CATALOG_MAGIC = b"TTCATLG\0"  # 컴파일된 카탈로그 파일의 첫 8 바이트
+COMPILED_CATALOG_VERSION = 3  # 컴파일된 카탈로그 형식 버전 (형식이 바뀌면 올림, 2부터 같은 요일에 수업이 여러 번, 3부터 정원이 있을 수 있음)
+READABLE_CATALOG_VERSIONS = (1, 2, 3)  # 읽을 수 있는 컴파일된 카탈로그 형식 버전 (1, 2 는 배치가 같고 정원 구역이 없음)
+COMPILED_CATALOG_HEADER = struct.Struct("<8sII10I")  # 매직, 버전, 플래그, 구역별 개수
+NO_STRING = 0xFFFFFFFF  # 컴파일된 카탈로그에서 값이 없는 문자열(분반 등) 번호
+NO_CAPACITY = 0xFFFFFFFF  # 컴파일된 카탈로그에서 정원이 없는(제한 없는) 강의의 정원 값
+TIMETABLE_EXPORT_MAGIC = b"TTRESLT\0"  # 내보낸 시간표 파일의 첫 8 바이트
+TIMETABLE_EXPORT_VERSION = 1  # 내보낸 시간표 파일 형식 버전
+TIMETABLE_EXPORT_HEADER = struct.Struct("<8sIIQ16sI")  # 매직, 버전, 과목 수, 시간표 수, 선택 지문, 과목명 구역 크기
+EXPORT_CHUNK_ROWS = 65536  # 시간표를 내보내거나 읽을 때 한 번에 다룰 시간표 수
+CONSECUTIVE_BREAK_MINUTES = 15  # 이보다 짧은 쉬는 시간을 사이에 둔 수업은 연속 수업으로 봄
+WEEKDAYS = DAYS[:5]  # 공강 요일 수를 셀 때 보는 요일
+PROFILE_LINES = 25  # cProfile 결과에서 보여줄 함수 수
+RESULT_CACHE_ENTRIES = 256  # 결과 캐시가 메모리에 담아 둘 결과 수
+RESULT_CACHE_DISK_BYTES = 64 * 1024 * 1024  # 결과 캐시가 디스크에 쓸 수 있는 최대 바이트 수
+
+# 요일 이름을 마스크의 요일 번호로 바꾸는 함수 (처음 보는 요일은 새 번호를 붙임)
+def day_index(day):
+    if day not in DAY_INDEX:
+        DAY_INDEX[day] = len(DAY_INDEX)
+    return DAY_INDEX[day]
+
+# 강의 일정의 수업을 (요일, (시작 시, 시작 분, 종료 시, 종료 분)) 로 하나씩 돌려주는 함수
+# (요일마다 수업 한 번 {"Mon": (9, 0, 10, 15)} 과 여러 번 {"Mon": [(9, 0, 10, 0), (13, 0, 15, 0)]} 을 모두 받음)
+def iter_meetings(schedule):
+    for day, times in schedule.items():
+        if times and isinstance(times[0], (tuple, list)):
+            for interval in times:
+                yield day, tuple(interval)
+        else:
+            yield day, tuple(times)
+
+# 강의 일정을 요일 -> 시작 시각 순으로 정렬된 수업 튜플 형태로 바꾸는 함수 (이미 그 형태면 그대로 돌려줌)
+def normalize_schedule(schedule):
+    normalized = {}
+    changed = False
+    for day, times in schedule.items():
+        if not times:
+            changed = True
+            continue
+        if isinstance(times[0], (tuple, list)):
+            if not (isinstance(times, tuple) and isinstance(times[0], tuple)
+                    and (len(times) == 1 or list(times) == sorted(times))):
+                times = tuple(sorted(map(tuple, times)))
+                changed = True
+        else:
+            times = (tuple(times),)
+            changed = True
+        normalized[day] = times
+    return normalized if changed else schedule
+
+# 강의 일정을 분 단위 주간 점유 마스크(정수 비트)로 바꾸는 함수
+def schedule_to_mask(schedule):
+    mask = 0
+    for day, (start_hour, start_minute, end_hour, end_minute) in iter_meetings(schedule):
+        start = start_hour * 60 + start_minute
+        end = end_hour * 60 + end_minute
+        if end > start:
+            offset = day_index(day) * MINUTES_PER_DAY
+            mask |= ((1 << (end - start)) - 1) << (offset + start)
+    return mask
+
+# 하루치 점유 마스크에서 수업이 이어지는 구간 (시작 분, 끝 분) 리스트를 구하는 함수
+def day_runs(day_mask):
+    runs = []
+    start = 0
+    while day_mask:
+        skip = (day_mask & -day_mask).bit_length() - 1
+        day_mask >>= skip
+        start += skip
+        length = (~day_mask & (day_mask + 1)).bit_length() - 1
+        runs.append((start, start + length))
+        day_mask >>= length
+        start += length
+    return runs
+
+# 강의 일정을 문자열로 만드는 함수 (같은 요일의 수업은 " / " 로 이어 씀)
+def format_schedule(schedule):
+    days = {}
+    for day, times in iter_meetings(schedule):
+        days.setdefault(day, []).append(f"{times[0]:02d}:{times[1]:02d}-{times[2]:02d}:{times[3]:02d}")
+    return ', '.join([f"{day}: {' / '.join(intervals)}" for day, intervals in days.items()])
+
+# 강의 정보를 담는 Lecture 클래스 (강의가 수만 개여도 가볍도록 __slots__ 사용)
+class Lecture:
+    __slots__ = ("subject", "professor", "schedule", "section", "mask", "capacity")
+
+    def __init__(self, subject, professor, schedule, section=None, mask=None, capacity=None):
+        # 강의의 속성을 초기화
+        self.subject = subject  # 과목명
+        self.professor = professor  # 교수명
+        # 강의 일정 (요일 -> 시작 시각 순으로 정렬된 수업 튜플, mask 를 함께 주면 이미 정리된 일정으로 봄)
+        self.schedule = normalize_schedule(schedule) if mask is None else schedule
+        self.section = section  # 분반 (옵션)
+        self.mask = schedule_to_mask(self.schedule) if mask is None else mask  # 주간 점유 마스크 (충돌 검사용)
+        self.capacity = capacity  # 수강 정원 (None 이면 제한 없음, 학생 여러 명에게 분반을 나눠 줄 때만 씀)
+
+    def __str__(self):
+        # 강의 일정을 문자열로 생성
+        schedule_str = format_schedule(self.schedule)
+        if self.section:
+            return f"{self.subject} ({self.section}) by {self.professor} on {schedule_str}"
+        else:
+            return f"{self.subject} by {self.professor} on {schedule_str}"
+
+# 과목 정보를 담는 Subject 클래스
+class Subject:
+    def __init__(self, name):
+        self.name = name
+        self.lectures = []  # 강의 리스트 초기화
+
+    def add_lecture(self, lecture):
+        self.lectures.append(lecture)  # 강의 추가
+
+    def remove_lecture(self, lecture):
+        self.lectures.remove(lecture)  # 강의 삭제
+
+    def __str__(self):
+        return f"{self.name}: {len(self.lectures)} 강의"
+
+# 강의 시간 충돌을 확인하는 함수 (점유 마스크가 겹치면 충돌)
+def check_conflict(lecture1, lecture2):
+    return (lecture1.mask & lecture2.mask) != 0
+
+# 강의 사이의 충돌 관계를 미리 계산해 두는 클래스 (강의마다 충돌하는 강의의 비트셋을 저장)
+class ConflictIndex:
+    def __init__(self, lectures=(), conflict_bits=None):
+        self.lectures = []  # 위치별 강의 (삭제된 자리는 None)
+        self.positions = {}  # 강의 -> 위치
+        self.conflict_bits = []  # 위치별로 충돌하는 강의 위치의 비트셋
+        self.free_positions = []  # 삭제로 비어 있는 위치
+        if conflict_bits is not None:
+            # 미리 계산해 둔 비트셋(컴파일된 카탈로그)이 있으면 충돌을 다시 계산하지 않음
+            self.lectures = list(lectures)
+            self.positions = {lecture: position for position, lecture in enumerate(self.lectures)}
+            self.conflict_bits = list(conflict_bits)
+            return
+        for lecture in lectures:
+            self.add(lecture)
+
+    def __contains__(self, lecture):
+        return lecture in self.positions
+
+    # 강의를 추가하고 기존 강의와의 충돌을 한 번만 계산하는 함수
+    def add(self, lecture):
+        if lecture in self.positions:
+            return
+        position = self.free_positions.pop() if self.free_positions else len(self.lectures)
+        if position == len(self.lectures):
+            self.lectures.append(None)
+            self.conflict_bits.append(0)
+
+        bits = 0
+        for other_position, other in enumerate(self.lectures):
+            if other is not None and check_conflict(lecture, other):
+                bits |= 1 << other_position
+                self.conflict_bits[other_position] |= 1 << position
+
+        self.lectures[position] = lecture
+        self.positions[lecture] = position
+        self.conflict_bits[position] = bits
+
+    # 강의를 삭제하고 다른 강의의 비트셋에서 지우는 함수
+    def remove(self, lecture):
+        position = self.positions.pop(lecture, None)
+        if position is None:
+            return
+        bits = self.conflict_bits[position]
+        while bits:
+            low_bit = bits & -bits
+            self.conflict_bits[low_bit.bit_length() - 1] &= ~(1 << position)
+            bits ^= low_bit
+        self.lectures[position] = None
+        self.conflict_bits[position] = 0
+        self.free_positions.append(position)
+
+    # 두 강의가 충돌하는지 조회하는 함수
+    def conflicts(self, lecture1, lecture2):
+        position1 = self.positions.get(lecture1)
+        position2 = self.positions.get(lecture2)
+        if position1 is None or position2 is None or position1 == position2:
+            return check_conflict(lecture1, lecture2)
+        return (self.conflict_bits[position1] >> position2) & 1 == 1
+
+    # 여러 강의의 위치를 하나의 비트셋으로 만드는 함수 (인덱스에 없는 강의는 먼저 추가)
+    def bits_of(self, lectures):
+        bits = 0
+        for lecture in lectures:
+            self.add(lecture)
+            bits |= 1 << self.positions[lecture]
+        return bits
+
+    # 강의와 충돌하는 강의 위치의 비트셋을 돌려주는 함수
+    def conflict_bits_of(self, lecture):
+        self.add(lecture)
+        return self.conflict_bits[self.positions[lecture]]
+
+# 선택된 강의끼리의 충돌 비트셋을 만드는 함수 (i 번째 비트 = lectures[i] 와 충돌)
+def local_conflict_bits(lectures, index=None):
+    conflict = index.conflicts if index is not None else check_conflict
+    bits = [0] * len(lectures)
+    for i, lecture1 in enumerate(lectures):
+        for j in range(i + 1, len(lectures)):
+            if conflict(lecture1, lectures[j]):
+                bits[i] |= 1 << j
+                bits[j] |= 1 << i
+    return bits
+
+# 사용자 조건을 담는 클래스 (탐색에 넣어서 조건을 어기는 가지는 펼치지 않음)
+# - 막아 둔 시간, 반드시 비울 요일, 가장 늦은 종료 시각: 겹치는 강의를 탐색 전에 과목 리스트에서 뺌
+# - 허용/제외 교수: 탐색 전에 과목 리스트에서 뺌
+# - 최소 공강 요일 수, 최대 연속 수업 시간: 탐색 중에 부분 시간표의 점유 마스크로 검사 (강의를 더할수록 나빠지기만 하므로
+#   어긴 부분 시간표는 더 내려가지 않음)
+class TimetableConstraints:
+    def __init__(self, blocked_times=None, free_days=(), min_free_days=0, max_consecutive_minutes=None,
+                 latest_end=None, allowed_professors=None, forbidden_professors=()):
+        self.blocked_times = blocked_times or {}  # 요일 -> [(시작 시, 시작 분, 종료 시, 종료 분), ...]
+        self.free_days = tuple(free_days)  # 수업이 없어야 하는 요일
+        self.min_free_days = min_free_days  # 평일 중 수업이 없어야 하는 최소 요일 수
+        self.max_consecutive_minutes = max_consecutive_minutes  # 쉬지 않고 이어지는 수업의 최대 길이 (분)
+        self.latest_end = latest_end  # 수업이 끝나야 하는 가장 늦은 시각 (시, 분)
+        self.allowed_professors = None if allowed_professors is None else set(allowed_professors)
+        self.forbidden_professors = set(forbidden_professors)
+        self.latest_end_minutes = None  # latest_end 를 자정부터 센 분으로 바꾼 값
+        if latest_end is not None:
+            hour, minute = latest_end
+            if (not isinstance(hour, int) or not isinstance(minute, int) or not 0 <= minute < 60
+                    or not 0 <= hour * 60 + minute <= MINUTES_PER_DAY):
+                raise ValueError(f"종료 시각은 00:00 부터 24:00 사이의 (시, 분) 이어야 합니다: {latest_end!r}")
+            self.latest_end_minutes = hour * 60 + minute
+
+        # 탐색 전에 쓸 막힌 시간 마스크를 한 번만 만듦
+        blocked = 0
+        for day, windows in self.blocked_times.items():
+            for window in windows:
+                blocked |= schedule_to_mask({day: window})
+        for day in self.free_days:
+            blocked |= ((1 << MINUTES_PER_DAY) - 1) << (day_index(day) * MINUTES_PER_DAY)
+        self.blocked_mask = blocked
+        self.weekday_masks = [((1 << MINUTES_PER_DAY) - 1) << (day_index(day) * MINUTES_PER_DAY) for day in WEEKDAYS]
+
+    # 캐시 키 등에 쓸 수 있게 조건을 튜플로 만드는 함수
+    def key(self):
+        return (sorted((day, sorted(map(tuple, windows))) for day, windows in self.blocked_times.items()),
+                sorted(self.free_days), self.min_free_days, self.max_consecutive_minutes,
+                tuple(self.latest_end) if self.latest_end is not None else None,
+                sorted(self.allowed_professors) if self.allowed_professors is not None else None,
+                sorted(self.forbidden_professors))
+
+    # 강의가 탐색 전에 거를 수 있는 조건을 모두 지키는지 확인하는 함수
+    # (종료 시각은 요일마다 마스크를 만들지 않고 수업마다 비교하므로, 조건을 만든 뒤에 처음 나온 요일에도 적용됨)
+    def allows(self, lecture):
+        if lecture.mask & self.blocked_mask:
+            return False
+        if self.latest_end_minutes is not None and any(
+                end_hour * 60 + end_minute > self.latest_end_minutes
+                for _, (_, _, end_hour, end_minute) in iter_meetings(lecture.schedule)):
+            return False
+        if self.allowed_professors is not None and lecture.professor not in self.allowed_professors:
+            return False
+        return lecture.professor not in self.forbidden_professors
+
+    # 조건을 지키는 강의만 남긴 과목 리스트를 만드는 함수 (강의 객체는 그대로 씀)
+    def filter_subjects(self, subjects):
+        filtered = []
+        for subject in subjects:
+            filtered_subject = Subject(subject.name)
+            filtered_subject.lectures = [lecture for lecture in subject.lectures if self.allows(lecture)]
+            filtered.append(filtered_subject)
+        return filtered
+
+    # 탐색 중에 부분 시간표를 검사해야 하는 조건이 있는지 여부
+    def has_partial_checks(self):
+        return self.min_free_days > 0 or self.max_consecutive_minutes is not None
+
+    # 부분 시간표의 점유 마스크가 조건을 지키는지 확인하는 함수
+    def check(self, mask):
+        if self.min_free_days > 0:
+            busy = sum(1 for day_mask in self.weekday_masks if mask & day_mask)
+            if len(self.weekday_masks) - busy < self.min_free_days:
+                return False
+        if self.max_consecutive_minutes is not None:
+            while mask:
+                day = (mask & -mask).bit_length() - 1
+                day_mask = (mask >> (day // MINUTES_PER_DAY * MINUTES_PER_DAY)) & ((1 << MINUTES_PER_DAY) - 1)
+                mask &= ~(((1 << MINUTES_PER_DAY) - 1) << (day // MINUTES_PER_DAY * MINUTES_PER_DAY))
+                run_start = run_end = None
+                for start, end in day_runs(day_mask):
+                    if run_end is not None and start - run_end < CONSECUTIVE_BREAK_MINUTES:
+                        run_end = end
+                    else:
+                        run_start, run_end = start, end
+                    if run_end - run_start > self.max_consecutive_minutes:
+                        return False
+        return True
+
+# 시간이 같아서 서로 바꿔도 충돌 여부가 같은 강의 묶음 클래스 (교수만 다른 분반들)
+class LectureGroup:
+    def __init__(self, lecture, check_section=False):
+        self.lectures = [lecture]  # 묶음에 속한 강의들
+        self.subject = lecture.subject
+        self.section = lecture.section
+        self.mask = lecture.mask
+        self.check_section = check_section  # 분반 일치 검사가 필요한 묶음인지 여부
+
+    def add_lecture(self, lecture):
+        self.lectures.append(lecture)
+
+    def __len__(self):
+        return len(self.lectures)
+
+    def __str__(self):
+        if len(self.lectures) == 1:
+            return str(self.lectures[0])
+        professors = " / ".join(
+            [f"{lec.professor} ({lec.section})" if lec.section else lec.professor for lec in self.lectures])
+        return f"{self.subject} by {professors} on {format_schedule(self.lectures[0].schedule)}"
+
+# 과목별 강의를 시간이 같은 묶음으로 나누는 함수
+def group_lectures(subjects):
+    owners = defaultdict(set)
+    for i, subject in enumerate(subjects):
+        for lecture in subject.lectures:
+            owners[lecture.subject].add(i)
+
+    all_groups = []
+    for subject in subjects:
+        groups = {}
+        for lecture in subject.lectures:
+            # 같은 과목명이 여러 과목에 나오면 분반 일치를 검사해야 하므로 분반도 묶음 기준에 넣음
+            check_section = len(owners[lecture.subject]) > 1
+            key = (lecture.mask, lecture.subject, lecture.section) if check_section else (lecture.mask,)
+            if key in groups:
+                groups[key].add_lecture(lecture)
+            else:
+                groups[key] = LectureGroup(lecture, check_section)
+        all_groups.append(list(groups.values()))
+    return all_groups
+
+# 탐색 진행 상황(탐색한 경우의 수, 찾은 결과 수, 잘라낸 가지 수 등)과 단계별 시간, 취소 요청을 주고받는 클래스
+# (stats 를 넘긴 계산만 세므로 넘기지 않으면 측정 비용이 거의 없음)
+class SearchStats:
+    def __init__(self):
+        self.explored = 0  # 탐색한 경우의 수
+        self.valid_groups = 0  # 찾은 결과 수 (예비 시간표는 교수 조합으로 펼치기 전의 시간 구성 수)
+        self.pruned = 0  # 충돌, 분반 불일치, 사용자 조건, 남은 과목 검사로 잘라낸 가지 수
+        self.conflict_checks = 0  # 고른 묶음과의 충돌 여부를 확인한 횟수
+        self.phase_seconds = defaultdict(float)  # 단계(solve, format, render 등)별 걸린 시간 (초)
+        self.profile = None  # cProfile 로 잰 상위 함수 목록 (run_profiled 로 켰을 때만)
+        self.peak_memory = None  # tracemalloc 으로 잰 최대 메모리 (바이트, run_profiled 로 켰을 때만)
+        self.cancelled = False  # 취소 요청 여부
+
+    def cancel(self):
+        self.cancelled = True
+
+    # with 블록에서 걸린 시간을 단계별로 더하는 함수 (with stats.phase("solve"): ...)
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] += time.perf_counter() - started
+
+    # 다른 측정값을 이 측정값에 더하는 함수 (여러 요청의 합계를 낼 때 씀)
+    def merge(self, other):
+        self.explored += other.explored
+        self.valid_groups += other.valid_groups
+        self.pruned += other.pruned
+        self.conflict_checks += other.conflict_checks
+        for name, seconds in other.phase_seconds.items():
+            self.phase_seconds[name] += seconds
+
+    # 측정값을 JSON 으로 쓸 수 있는 딕셔너리로 만드는 함수
+    def as_dict(self):
+        result = {"explored": self.explored, "valid_groups": self.valid_groups, "pruned": self.pruned,
+                  "conflict_checks": self.conflict_checks,
+                  "phases": {name: round(seconds, 6) for name, seconds in self.phase_seconds.items()}}
+        if self.peak_memory is not None:
+            result["peak_memory_bytes"] = self.peak_memory
+        if self.profile is not None:
+            result["profile"] = self.profile
+        return result
+
+# 탐색한 경우의 수가 limit 에 이르면 스스로 취소되는 SearchStats (답이 없을 수도 있는 탐색을 짧게 끊을 때 씀)
+class SearchBudget(SearchStats):
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    @property
+    def cancelled(self):
+        return self.explored >= self.limit
+
+    @cancelled.setter
+    def cancelled(self, value):
+        if value:
+            self.limit = 0
+
+# stats 가 있을 때만 단계별 시간을 재는 함수 (with measure_phase(stats, "render"): ...)
+def measure_phase(stats, name):
+    return stats.phase(name) if stats is not None else nullcontext()
+
+# 함수를 실행하며 cProfile(profile) 과 tracemalloc(trace_memory) 으로 재서 stats 에 넣는 함수 (함수의 결과를 그대로 돌려줌)
+# (cProfile, pstats 는 읽는 데 시간이 걸리므로 프로파일을 켰을 때만 import 함)
+def run_profiled(function, stats, profile=False, trace_memory=False, profile_lines=PROFILE_LINES):
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif trace_memory:
+        tracemalloc.reset_peak()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return function()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        if trace_memory:
+            stats.peak_memory = max(stats.peak_memory or 0, tracemalloc.get_traced_memory()[1])
+        if started_tracing:
+            tracemalloc.stop()
+        if profiler is not None:
+            import pstats
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(profile_lines)
+            stats.profile = output.getvalue()
+
+# 묶음 단위 탐색에 필요한 자료(과목별 묶음 위치, 충돌 비트셋)를 모아 두는 클래스
+# constraints 를 주면 조건에 맞지 않는 강의는 처음부터 빼고, 부분 시간표 검사(check)는 탐색과 개수 세기에서 씀
+class SearchSpace:
+    def __init__(self, subjects, index=None, constraints=None):
+        if constraints is not None:
+            subjects = constraints.filter_subjects(subjects)
+        self.check = constraints.check if constraints is not None and constraints.has_partial_checks() else None
+        self.groups = []  # 모든 과목의 묶음을 과목 순서대로 이어 붙인 리스트
+        self.positions = []  # 과목별 묶음 위치 범위
+        self.subject_bits = []  # 과목별 묶음 위치 비트셋
+        for groups in group_lectures(subjects):
+            start = len(self.groups)
+            self.groups.extend(groups)
+            self.positions.append(range(start, len(self.groups)))
+            self.subject_bits.append(((1 << len(groups)) - 1) << start)
+        self.conflict_bits = local_conflict_bits([group.lectures[0] for group in self.groups], index)
+        self.sizes = [len(group) for group in self.groups]  # 묶음별 교수 조합 수
+        self.masks = [group.mask for group in self.groups]  # 묶음별 점유 마스크 (부분 시간표 검사용)
+        # 분반 일치 검사가 필요한 묶음의 (과목명, 분반)
+        self.section_keys = [(group.subject, group.section) if group.check_section else None for group in self.groups]
+
+    # 작업 프로세스로 보낼 때는 강의 객체를 빼고 정수와 문자열로 된 자료만 보냄
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["groups"] = None
+        return state
+
+    # 묶음의 분반이 이미 고른 분반과 맞는지 확인하고 기록하는 함수 (맞지 않으면 None, 새로 기록했으면 True)
+    def push_section(self, position, subject_sections):
+        section_key = self.section_keys[position]
+        if section_key is None:
+            return False
+        subject, section = section_key
+        if subject not in subject_sections:
+            subject_sections[subject] = section
+            return True
+        return False if subject_sections[subject] == section else None
+
+    # push_section 으로 기록한 분반을 지우는 함수
+    def pop_section(self, position, subject_sections):
+        del subject_sections[self.section_keys[position][0]]
+
+    # depth 번째 이후 과목마다 고를 수 있는 묶음이 남아 있는지 확인하는 함수
+    def feasible(self, depth, blocked):
+        return all(bits & ~blocked for bits in self.subject_bits[depth:])
+
+    # 충돌 없는 묶음 위치 조합을 찾는 함수 (prefix 로 앞 과목들을 고정하고, stop_depth 번째 과목까지만 고름)
+    def search(self, prefix=(), stop_depth=None, stats=None):
+        stop_depth = len(self.positions) if stop_depth is None else stop_depth
+        timetable = list(prefix)
+        subject_sections = {}
+        blocked = occupied = 0
+        for position in prefix:
+            self.push_section(position, subject_sections)
+            blocked |= self.conflict_bits[position]
+            occupied |= self.masks[position]
+
+        # 깊이 우선 탐색으로 depth 번째 과목의 묶음을 고르는 함수
+        # (blocked: 이미 고른 묶음과 충돌하는 묶음 위치, occupied: 이미 고른 묶음의 점유 마스크)
+        def search_from(depth, blocked, occupied):
+            if stats is not None:
+                if stats.cancelled:
+                    return
+                stats.explored += 1
+            if depth == stop_depth:
+                if stats is not None:
+                    stats.valid_groups += 1
+                yield tuple(timetable)
+                return
+
+            pruned = 0
+            for position in self.positions[depth]:
+                if (blocked >> position) & 1:
+                    pruned += 1
+                    continue
+                added_section = self.push_section(position, subject_sections)
+                if added_section is None:
+                    pruned += 1
+                    continue
+
+                # 사용자 조건을 어기거나 남은 과목 중 고를 수 있는 묶음이 없는 과목이 생기면 더 내려가지 않음
+                next_blocked = blocked | self.conflict_bits[position]
+                next_occupied = occupied | self.masks[position]
+                if (self.check is None or self.check(next_occupied)) and self.feasible(depth + 1, next_blocked):
+                    timetable.append(position)
+                    yield from search_from(depth + 1, next_blocked, next_occupied)
+                    timetable.pop()
+                else:
+                    pruned += 1
+                if added_section:
+                    self.pop_section(position, subject_sections)
+            if stats is not None:
+                stats.conflict_checks += len(self.positions[depth])
+                stats.pruned += pruned
+
+        return search_from(len(timetable), blocked, occupied)
+
+    # depth 번째 과목에서는 positions 의 묶음만 고를 수 있게 한 탐색 공간을 돌려주는 함수 (나머지 자료는 함께 씀)
+    def restricted(self, depth, positions):
+        space = object.__new__(SearchSpace)
+        space.__dict__.update(self.__dict__)
+        space.positions = list(self.positions)
+        space.positions[depth] = list(positions)
+        space.subject_bits = list(self.subject_bits)
+        space.subject_bits[depth] = sum(1 << position for position in positions)
+        return space
+
+    # costs 합이 가장 작은 충돌 없는 묶음 조합을 찾는 함수 (분기 한정, 찾지 못하면 None)
+    # 남은 과목마다 아직 고를 수 있는 가장 싼 묶음의 합을 하한으로 써서 더 나아질 수 없는 가지는 펼치지 않고,
+    # max_nodes 번 넘게 탐색하면 그때까지 찾은 가장 좋은 조합을 돌려줌
+    def cheapest(self, costs, max_nodes=None):
+        orders = [sorted(positions, key=costs.__getitem__) for positions in self.positions]
+        best, best_cost = None, float("inf")
+        nodes = 0
+        timetable = []
+        subject_sections = {}
+
+        # depth 번째 이후 과목의 하한 (고를 수 있는 묶음이 없는 과목이 있으면 무한대)
+        def floor(depth, blocked):
+            total = 0
+            for order in orders[depth:]:
+                for position in order:
+                    if not (blocked >> position) & 1:
+                        total += costs[position]
+                        break
+                else:
+                    return float("inf")
+            return total
+
+        def search_from(depth, blocked, occupied, cost):
+            nonlocal best, best_cost, nodes
+            nodes += 1
+            if depth == len(orders):
+                best, best_cost = tuple(timetable), cost
+                return
+            for position in orders[depth]:
+                if max_nodes is not None and nodes >= max_nodes:
+                    return
+                next_cost = cost + costs[position]
+                if next_cost >= best_cost:
+                    break
+                if (blocked >> position) & 1:
+                    continue
+                added_section = self.push_section(position, subject_sections)
+                if added_section is None:
+                    continue
+                next_blocked = blocked | self.conflict_bits[position]
+                next_occupied = occupied | self.masks[position]
+                if ((self.check is None or self.check(next_occupied))
+                        and next_cost + floor(depth + 1, next_blocked) < best_cost):
+                    timetable.append(position)
+                    search_from(depth + 1, next_blocked, next_occupied, next_cost)
+                    timetable.pop()
+                if added_section:
+                    self.pop_section(position, subject_sections)
+
+        search_from(0, 0, 0, 0)
+        return best
+
+    # 과목마다 positions_by_depth 의 묶음만 그 순서대로 고르는 탐색 공간을 돌려주는 함수 (나머지 자료는 함께 씀)
+    def reordered(self, positions_by_depth):
+        space = object.__new__(SearchSpace)
+        space.__dict__.update(self.__dict__)
+        space.positions = positions_by_depth
+        space.subject_bits = [sum(1 << position for position in positions) for positions in positions_by_depth]
+        return space
+
+    # 서로 충돌할 일이 없는 과목끼리 나눈 과목 번호 묶음을 돌려주는 함수
+    # (부분 시간표 검사가 있으면 모든 과목이 서로 영향을 주므로 하나로 묶음)
+    def components(self):
+        if self.check is not None:
+            return [list(range(len(self.positions)))]
+        parent = list(range(len(self.positions)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        section_subjects = [{self.section_keys[position][0] for position in positions if self.section_keys[position]}
+                            for positions in self.positions]
+        for i, positions in enumerate(self.positions):
+            bits = 0
+            for position in positions:
+                bits |= self.conflict_bits[position]
+            for j in range(i + 1, len(self.positions)):
+                if bits & self.subject_bits[j] or section_subjects[i] & section_subjects[j]:
+                    parent[find(j)] = find(i)
+
+        components = defaultdict(list)
+        for i in range(len(self.positions)):
+            components[find(i)].append(i)
+        return list(components.values())
+
+    # depths 과목들 안에서 충돌 없는 조합의 수를 세는 함수 (남은 과목에 영향을 주는 충돌 상태가 같으면 결과를 재사용)
+    def count(self, depths, by_group=False, stats=None):
+        remaining_bits = [0] * (len(depths) + 1)
+        for k in range(len(depths) - 1, -1, -1):
+            remaining_bits[k] = remaining_bits[k + 1] | self.subject_bits[depths[k]]
+        memo = {}
+        subject_sections = {}
+
+        # 부분 시간표 검사가 있으면 점유 마스크도 남은 과목의 결과에 영향을 주므로 키에 넣음
+        def count_from(k, blocked, occupied):
+            if stats is not None:
+                if stats.cancelled:
+                    return 0
+                stats.explored += 1
+            if k == len(depths):
+                return 1
+            key = (k, blocked & remaining_bits[k], tuple(subject_sections.items()),
+                   occupied if self.check is not None else 0)
+            if key in memo:
+                return memo[key]
+
+            total = pruned = 0
+            for position in self.positions[depths[k]]:
+                if (blocked >> position) & 1:
+                    pruned += 1
+                    continue
+                added_section = self.push_section(position, subject_sections)
+                if added_section is None:
+                    pruned += 1
+                    continue
+
+                next_occupied = occupied
+                if self.check is not None:
+                    next_occupied |= self.masks[position]
+                    if not self.check(next_occupied):
+                        pruned += 1
+                        if added_section:
+                            self.pop_section(position, subject_sections)
+                        continue
+                variants = 1 if by_group else self.sizes[position]
+                total += variants * count_from(k + 1, blocked | self.conflict_bits[position], next_occupied)
+                if added_section:
+                    self.pop_section(position, subject_sections)
+            if stats is not None:
+                stats.conflict_checks += len(self.positions[depths[k]])
+                stats.pruned += pruned
+
+            memo[key] = total
+            return total
+
+        return count_from(0, 0, 0)
+
+# 충돌 없는 묶음 조합(시간표의 시간 구성)을 찾는 함수 (과목마다 묶음을 하나씩 고르며 충돌이 생기면 바로 가지치기)
+def create_timetable_groups(subjects, index=None, stats=None, constraints=None):
+    space = SearchSpace(subjects, index, constraints)
+    for positions in space.search(stats=stats):
+        yield tuple(space.groups[position] for position in positions)
+
+worker_space = None  # 작업 프로세스마다 한 번 받아 두는 탐색 자료
+
+# 작업 프로세스를 시작할 때 탐색 자료를 받아 두는 함수
+def init_search_worker(space):
+    global worker_space
+    worker_space = space
+
+# 작업 프로세스에서 prefix 로 시작하는 묶음 위치 조합을 모두 찾는 함수 (돌려주는 값: (조합 리스트, 이 작업의 SearchStats))
+def search_shard(prefix):
+    stats = SearchStats()
+    return list(worker_space.search(prefix, stats=stats)), stats
+
+# 여러 프로세스로 나눠서 충돌 없는 묶음 조합을 찾는 함수 (앞의 한두 과목의 선택으로 작업을 나누고 결과를 작업 단위 묶음으로 돌려줌)
+# (stats 를 주면 작업마다 측정값을 더하고, 작업 단위 묶음 사이에서 취소 요청을 확인함)
+# (concurrent.futures 는 multiprocessing 까지 읽어 오므로 병렬 탐색을 쓸 때만 import 함)
+def create_timetable_groups_parallel(subjects, index=None, workers=None, ordered=True, constraints=None, stats=None):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    space = SearchSpace(subjects, index, constraints)
+    workers = workers or os.cpu_count() or 1
+    split_stats = SearchStats()
+    shards = list(space.search(stop_depth=min(1, len(space.positions)), stats=split_stats))
+    if len(shards) < workers * SHARDS_PER_WORKER and len(space.positions) >= 2:
+        split_stats = SearchStats()
+        shards = list(space.search(stop_depth=2, stats=split_stats))
+    if stats is not None:
+        # 작업을 나눈 끝 칸은 작업 프로세스가 다시 세므로 빼고, 나눈 칸은 결과가 아니므로 valid_groups 에 넣지 않음
+        split_stats.explored -= len(shards)
+        split_stats.valid_groups = 0
+        stats.merge(split_stats)
+        if stats.cancelled:
+            return
+
+    executor = ProcessPoolExecutor(workers, initializer=init_search_worker, initargs=(space,))
+    try:
+        if ordered:
+            chunks = executor.map(search_shard, shards)
+        else:
+            chunks = (future.result() for future in as_completed([executor.submit(search_shard, shard) for shard in shards]))
+        for chunk, shard_stats in chunks:
+            if stats is not None:
+                stats.merge(shard_stats)
+            yield [tuple(space.groups[position] for position in positions) for positions in chunk]
+            if stats is not None and stats.cancelled:
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# 묶음 조합에서 나올 수 있는 교수 조합의 수를 구하는 함수
+def count_timetable_variants(groups):
+    return prod(len(group) for group in groups)
+
+# 묶음 조합의 k 번째 교수 조합을 바로 구하는 함수 (expand_timetable_groups 와 같은 순서)
+def timetable_variant(groups, k):
+    timetable = []
+    for group in reversed(groups):
+        k, choice = divmod(k, len(group))
+        timetable.append(group.lectures[choice])
+    timetable.reverse()
+    return timetable
+
+# 묶음 조합의 교수 조합들을 필요할 때만 펼쳐 주는 목록 클래스
+class TimetableVariants:
+    def __init__(self, groups):
+        self.groups = groups
+        self.length = count_timetable_variants(groups)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, k):
+        if not 0 <= k < self.length:
+            raise IndexError(k)
+        return timetable_variant(self.groups, k)
+
+# 묶음 조합을 실제 강의 시간표들로 펼치는 함수
+def expand_timetable_groups(groups):
+    for combination in product(*[group.lectures for group in groups]):
+        yield list(combination)
+
+# 충돌 없는 예비 시간표의 정확한 개수를 세는 함수 (by_group=True면 교수 조합을 하나로 셈)
+def count_preliminary_timetables(subjects, index=None, by_group=False, stats=None, constraints=None):
+    space = SearchSpace(subjects, index, constraints)
+    total = 1
+    for depths in space.components():
+        total *= space.count(depths, by_group, stats)
+        if total == 0:
+            break
+    return total
+
+# 예비 시간표 개수의 상한을 빠르게 추정하는 함수 (다른 과목 중 하나와도 맞출 수 없는 묶음은 빼고 곱함)
+def estimate_preliminary_timetables(subjects, index=None, constraints=None):
+    space = SearchSpace(subjects, index, constraints)
+    estimate = 1
+    for depth, positions in enumerate(space.positions):
+        other_bits = space.subject_bits[:depth] + space.subject_bits[depth + 1:]
+        estimate *= sum(len(space.groups[position]) for position in positions
+                        if all(bits & ~space.conflict_bits[position] for bits in other_bits))
+    return estimate
+
+# 예비 시간표를 생성하는 함수 (묶음 단위로 탐색한 뒤 교수 조합으로 펼침, workers 가 2 이상이면 여러 프로세스로 탐색)
+def create_preliminary_timetables(subjects, index=None, workers=1, ordered=True, constraints=None, stats=None):
+    if workers is None or workers > 1:
+        for chunk in create_timetable_groups_parallel(subjects, index, workers, ordered, constraints, stats):
+            for groups in chunk:
+                yield from expand_timetable_groups(groups)
+        return
+
+    for groups in create_timetable_groups(subjects, index, stats, constraints):
+        yield from expand_timetable_groups(groups)
+
+# 예비 시간표(묶음 조합)를 모두 들고 있다가 강의가 추가, 삭제되면 바뀐 부분만 다시 계산하는 클래스
+# - 강의 삭제: 묶음에 다른 강의가 남으면 교수 조합 수만 줄이고, 묶음이 비면 그 묶음이 든 조합만 지움
+# - 강의 추가: 같은 시간의 묶음이 있으면 교수 조합 수만 늘리고, 새 시간이면 그 묶음을 고정한 조합만 탐색함
+# 과목 구성이 바뀌거나 분반 일치 검사가 필요한 과목명이 달라지면 처음부터 다시 계산함
+class IncrementalTimetables:
+    def __init__(self, index=None, limit=None):
+        self.index = index  # 충돌 인덱스 (없으면 마스크로 바로 비교)
+        self.limit = limit  # 들고 있을 최대 조합 수 (넘으면 다음 갱신 때 처음부터 다시 계산)
+        self.lock = threading.Lock()  # 취소된 작업 스레드와 새 작업 스레드가 겹쳐도 안전하도록 잠금
+        self.subjects = None  # 마지막으로 계산한 과목 리스트
+        self.snapshots = []  # 과목별로 마지막으로 계산할 때의 강의 리스트
+        self.complete = False  # 모든 조합을 다 찾아 두었는지 여부
+        self.space = None
+        self.rows = {}  # 조합 번호 -> 묶음 위치 튜플 (찾은 순서)
+        self.rows_by_position = []  # 묶음 위치별로 그 묶음이 든 조합 번호 집합
+        self.total = 0  # 교수 조합까지 펼친 시간표 수
+        self.next_row = 0
+
+    # 과목마다 묶음 키 -> 묶음 위치 사전을 만드는 함수
+    def group_keys_of(self, depth):
+        keys = {}
+        for position in self.space.positions[depth]:
+            group = self.space.groups[position]
+            keys[self.group_key(group.lectures[0])] = position
+        return keys
+
+    def group_key(self, lecture):
+        if lecture.subject in self.shared_names:
+            return (lecture.mask, lecture.subject, lecture.section)
+        return (lecture.mask,)
+
+    # 여러 과목에 나오는 과목명(분반 일치 검사가 필요한 과목명)을 구하는 함수
+    def shared_names_of(self, subjects):
+        owners = defaultdict(set)
+        for i, subject in enumerate(subjects):
+            for lecture in subject.lectures:
+                owners[lecture.subject].add(i)
+        return {name for name, owner in owners.items() if len(owner) > 1}
+
+    def variants(self, positions, skip=None):
+        return prod(self.space.sizes[position] for position in positions if position != skip)
+
+    def add_row(self, positions):
+        row = self.next_row
+        self.next_row += 1
+        self.rows[row] = positions
+        for position in positions:
+            self.rows_by_position[position].add(row)
+        self.total += self.variants(positions)
+
+    # 찾은 조합을 저장하며 돌려주는 함수 (limit 를 넘으면 멈추고 complete 를 False 로 둠)
+    def collect(self, space, stats):
+        for positions in space.search(stats=stats):
+            if self.limit is not None and len(self.rows) >= self.limit:
+                self.complete = False
+                return
+            self.add_row(positions)
+            yield tuple(self.space.groups[position] for position in positions)
+        if stats is not None and stats.cancelled:
+            self.complete = False
+
+    # 처음부터 다시 계산하며 찾은 조합을 하나씩 돌려주는 함수
+    def rebuild(self, subjects, stats=None):
+        self.subjects = list(subjects)
+        self.snapshots = [list(subject.lectures) for subject in subjects]
+        self.shared_names = self.shared_names_of(subjects)
+        self.space = SearchSpace(subjects, self.index)
+        self.space.positions = [list(positions) for positions in self.space.positions]
+        self.rows = {}
+        self.rows_by_position = [set() for _ in self.space.groups]
+        self.lecture_positions = {id(lecture): position for position, group in enumerate(self.space.groups)
+                                  for lecture in group.lectures}
+        self.total = 0
+        self.complete = True
+        yield from self.collect(self.space, stats)
+
+    # 지금 과목 구성이 마지막 계산과 같아서 바뀐 강의만 반영하면 되는지 확인하는 함수
+    def can_update(self, subjects):
+        return (self.complete and self.subjects is not None and len(subjects) == len(self.subjects)
+                and all(a is b for a, b in zip(subjects, self.subjects))
+                and self.shared_names_of(subjects) == self.shared_names)
+
+    # 마지막 계산 이후 추가, 삭제된 강의만 반영하는 함수 (새로 생긴 조합 수를 돌려줌)
+    def update(self, stats=None):
+        added_rows = 0
+        for depth, subject in enumerate(self.subjects):
+            current = {id(lecture) for lecture in subject.lectures}
+            for lecture in self.snapshots[depth]:
+                if id(lecture) not in current:
+                    self.remove_lecture(lecture)
+            previous = {id(lecture) for lecture in self.snapshots[depth]}
+            for lecture in subject.lectures:
+                if id(lecture) not in previous:
+                    added_rows += self.add_lecture(depth, lecture, stats)
+            self.snapshots[depth] = list(subject.lectures)
+        return added_rows
+
+    # 강의를 묶음에서 빼는 함수 (묶음이 비면 그 묶음이 든 조합을 지움)
+    def remove_lecture(self, lecture):
+        position = self.lecture_positions.pop(id(lecture))
+        group = self.space.groups[position]
+        rows = self.rows_by_position[position]
+        if len(group) > 1:
+            for row in rows:
+                self.total -= self.variants(self.rows[row], position)
+            group.lectures.remove(lecture)
+            self.space.sizes[position] -= 1
+            return
+
+        for row in list(rows):
+            positions = self.rows.pop(row)
+            self.total -= self.variants(positions)
+            for other in positions:
+                self.rows_by_position[other].discard(row)
+        depth = next(depth for depth, positions in enumerate(self.space.positions) if position in positions)
+        self.space.positions[depth].remove(position)
+        self.space.subject_bits[depth] &= ~(1 << position)
+        self.space.groups[position] = None
+
+    # 강의를 같은 시간의 묶음에 넣거나 새 묶음을 만들어 그 묶음이 든 조합을 찾는 함수 (새로 생긴 조합 수를 돌려줌)
+    def add_lecture(self, depth, lecture, stats=None):
+        space = self.space
+        position = self.group_keys_of(depth).get(self.group_key(lecture))
+        if position is not None:
+            for row in self.rows_by_position[position]:
+                self.total += self.variants(self.rows[row], position)
+            space.groups[position].add_lecture(lecture)
+            space.sizes[position] += 1
+            self.lecture_positions[id(lecture)] = position
+            return 0
+
+        position = len(space.groups)
+        group = LectureGroup(lecture, lecture.subject in self.shared_names)
+        conflict = self.index.conflicts if self.index is not None else check_conflict
+        bits = 0
+        for other_position, other in enumerate(space.groups):
+            if other is not None and conflict(lecture, other.lectures[0]):
+                bits |= 1 << other_position
+                space.conflict_bits[other_position] |= 1 << position
+        space.groups.append(group)
+        space.conflict_bits.append(bits)
+        space.sizes.append(1)
+        space.masks.append(group.mask)
+        space.section_keys.append((group.subject, group.section) if group.check_section else None)
+        space.positions[depth].append(position)
+        space.subject_bits[depth] |= 1 << position
+        self.rows_by_position.append(set())
+        self.lecture_positions[id(lecture)] = position
+
+        before = len(self.rows)
+        for _ in self.collect(space.restricted(depth, [position]), stats):
+            pass
+        return len(self.rows) - before
+
+    # 들고 있는 조합을 묶음 튜플로 돌려주는 함수
+    def timetable_groups(self):
+        groups = self.space.groups
+        return [tuple(groups[position] for position in positions) for positions in self.rows.values()]
+
+# 선택된 과목과 선택 과목의 강의를 한 줄로 늘어놓는 함수 (캐시에는 강의를 이 순서의 번호로 저장함)
+def selection_lectures(subjects, electives=()):
+    return [lecture for subject in subjects for lecture in subject.lectures] + list(electives)
+
+# 강의 내용을 캐시 키에 넣을 튜플로 만드는 함수
+def lecture_key(lecture):
+    return (lecture.subject, lecture.professor, lecture.section, tuple(lecture.schedule.items()))
+
+# 선택된 강의의 내용과 조건으로 캐시 키를 만드는 함수
+# (강의를 추가, 수정, 삭제하면 키가 달라지므로 예전 결과는 따로 지우지 않아도 다시 쓰이지 않음)
+def selection_fingerprint(subjects, electives=(), options=()):
+    digest = hashlib.blake2b(repr(options).encode("utf-8"), digest_size=16)
+    for subject in subjects:
+        digest.update(repr((subject.name, [lecture_key(lecture) for lecture in subject.lectures])).encode("utf-8"))
+    digest.update(repr([lecture_key(lecture) for lecture in electives]).encode("utf-8"))
+    return digest.hexdigest()
+
+# 예비 시간표(묶음 조합) 목록을 캐시에 넣을 수 있게 강의 번호로 바꾸는 함수 (같은 묶음은 한 번만 저장)
+def encode_timetable_groups(subjects, rows):
+    numbers = {id(lecture): i for i, lecture in enumerate(selection_lectures(subjects))}
+    group_numbers = {}
+    group_table = []
+    encoded_rows = []
+    for groups in rows:
+        encoded = []
+        for group in groups:
+            if id(group) not in group_numbers:
+                group_numbers[id(group)] = len(group_table)
+                group_table.append((group.check_section, tuple(numbers[id(lecture)] for lecture in group.lectures)))
+            encoded.append(group_numbers[id(group)])
+        encoded_rows.append(tuple(encoded))
+    return group_table, encoded_rows
+
+# encode_timetable_groups 로 바꾼 목록을 지금의 강의 객체로 되돌리는 함수
+def decode_timetable_groups(subjects, encoded):
+    lectures = selection_lectures(subjects)
+    group_table, encoded_rows = encoded
+    groups = []
+    for check_section, lecture_numbers in group_table:
+        group = LectureGroup(lectures[lecture_numbers[0]], check_section)
+        for number in lecture_numbers[1:]:
+            group.add_lecture(lectures[number])
+        groups.append(group)
+    return [[groups[number] for number in row] for row in encoded_rows]
+
+# 계산 결과를 키로 찾아 쓰는 캐시 클래스 (메모리에서는 LRU, 디렉터리를 주면 디스크에도 저장하고 크기를 넘으면 오래된 것부터 지움)
+# 값은 강의 객체 대신 강의 번호처럼 다시 만들 수 있는 형태로 넣어야 함 (디스크에는 pickle 로 저장)
+class ResultCache:
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, directory=None, max_disk_bytes=RESULT_CACHE_DISK_BYTES):
+        self.entries = OrderedDict()  # 키 -> 값 (뒤쪽이 최근에 쓴 것)
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()  # 작업 스레드 여러 개가 함께 써도 되도록 잠금
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def path_of(self, key):
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    # 키에 해당하는 값을 찾는 함수 (없으면 None)
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        value = self.read_disk(key)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.remember(key, value)
+        return value
+
+    # 값을 저장하는 함수
+    def put(self, key, value):
+        with self.lock:
+            self.remember(key, value)
+        if self.directory is not None:
+            self.write_disk(key, value)
+
+    # 메모리에 값을 넣고 개수를 넘으면 가장 오래 안 쓴 것을 지우는 함수 (잠금을 잡은 채로 부름)
+    def remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # 디스크에서 값을 읽는 함수 (읽은 파일은 최근에 쓴 것으로 표시, 깨진 파일은 지움)
+    def read_disk(self, key):
+        if self.directory is None:
+            return None
+        path = self.path_of(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    # 디스크에 값을 쓰고 전체 크기를 넘으면 가장 오래 안 쓴 파일부터 지우는 함수
+    def write_disk(self, key, value):
+        path = self.path_of(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return
+
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pickle"):
+                    try:
+                        info = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((info.st_mtime, info.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, old_path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(old_path)
+            except OSError:
+                continue
+            total -= size
+
+    # 메모리와 디스크의 결과를 모두 지우는 함수
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.directory is not None:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".pickle"):
+                        os.remove(entry.path)
+
+# 점유 마스크에서 등교 일수, 공강 시간(분), 이른 수업이 있는 날 수를 구하는 함수
+def occupancy_stats(mask):
+    days = gaps = early = 0
+    day_mask = (1 << MINUTES_PER_DAY) - 1
+    while mask:
+        day = mask & day_mask
+        if day:
+            first = (day & -day).bit_length() - 1
+            days += 1
+            gaps += day.bit_length() - first - day.bit_count()
+            if first < EARLY_CLASS_MINUTE:
+                early += 1
+        mask >>= MINUTES_PER_DAY
+    return days, gaps, early
+
+# 선호 교수가 아닌 강의면 1을 돌려주는 함수 (선호 교수가 없으면 항상 0)
+def professor_penalty(lecture, preferred_professors):
+    if not preferred_professors:
+        return 0
+    names = [name.strip() for name in lecture.professor.split(",")]
+    return 0 if any(name in preferred_professors for name in names) else 1
+
+# 시간표의 추천 점수를 계산하는 함수 (낮을수록 좋은 시간표)
+def score_timetable(timetable, weights=None, preferred_professors=()):
+    weights = {**DEFAULT_RANK_WEIGHTS, **(weights or {})}
+    preferred_professors = set(preferred_professors)
+    mask = 0
+    for lecture in timetable:
+        mask |= lecture.mask
+    days, gaps, early = occupancy_stats(mask)
+    penalty = sum(professor_penalty(lecture, preferred_professors) for lecture in timetable)
+    return days * weights["days"] + gaps * weights["gaps"] + early * weights["early"] + penalty * weights["professor"]
+
+# 추천 점수가 가장 좋은 시간표 k개를 찾는 함수 (점수 하한이 k 번째 점수보다 나쁜 가지는 더 내려가지 않음)
+def rank_preliminary_timetables(subjects, k=RANKED_TIMETABLE_COUNT, weights=None, preferred_professors=(), index=None,
+                                constraints=None, stats=None):
+    if k <= 0:
+        return []
+    weights = {**DEFAULT_RANK_WEIGHTS, **(weights or {})}
+    preferred_professors = set(preferred_professors)
+    space = SearchSpace(subjects, index, constraints)
+
+    # 묶음마다 교수 벌점을 미리 계산하고, 남은 과목에서 최소로 받게 될 벌점의 합을 구해 둠
+    penalties = [[professor_penalty(lecture, preferred_professors) for lecture in group.lectures] for group in space.groups]
+    min_penalties = [min(group_penalties) for group_penalties in penalties]
+    remaining_penalty = [0] * (len(space.positions) + 1)
+    for depth in range(len(space.positions) - 1, -1, -1):
+        least = min((min_penalties[position] for position in space.positions[depth]), default=0)
+        remaining_penalty[depth] = remaining_penalty[depth + 1] + least
+
+    heap = []  # (-점수, -발견 순서, -교수 조합 번호들, 시간표) 최대 힙으로 지금까지의 상위 k개를 보관
+    order = count()
+    timetable = []
+    subject_sections = {}
+
+    # 지금 상위 k개에 들어가려면 넘어서는 안 되는 점수
+    def threshold():
+        return -heap[0][0] if len(heap) == k else float("inf")
+
+    # 공강은 강의가 추가되면 줄어들 수 있으므로 하한에는 등교 일수, 이른 수업, 교수 벌점만 넣음
+    def lower_bound(mask, penalty):
+        days, _, early = occupancy_stats(mask)
+        return days * weights["days"] + early * weights["early"] + penalty * weights["professor"]
+
+    # 완성된 묶음 조합의 교수 조합 중 상위 k개에 들 수 있는 것만 점수를 매겨 상위 k개를 갱신하는 함수
+    # (묶음마다 벌점이 작은 교수부터 고르고, 남은 묶음의 최소 벌점을 더해도 상위 k개에 못 들면 그 뒤는 보지 않음,
+    #  점수가 같으면 처음 버전처럼 먼저 찾은 묶음 조합, 그 안에서는 교수 조합 순서가 앞선 것이 남음)
+    def collect(mask):
+        days, gaps, early = occupancy_stats(mask)
+        base = days * weights["days"] + gaps * weights["gaps"] + early * weights["early"]
+        leaf = -next(order)
+        choices = [sorted(range(len(penalties[position])), key=penalties[position].__getitem__) for position in timetable]
+        floors = [0] * (len(timetable) + 1)
+        for depth in range(len(timetable) - 1, -1, -1):
+            floors[depth] = floors[depth + 1] + min_penalties[timetable[depth]]
+        chosen = []
+
+        def choose(depth, penalty):
+            if depth == len(timetable):
+                entry = (-(base + penalty * weights["professor"]), leaf, tuple(-choice for choice in chosen))
+                if len(heap) < k:
+                    heappush(heap, entry + (chosen_lectures(),))
+                elif entry > heap[0][:3]:
+                    heapreplace(heap, entry + (chosen_lectures(),))
+                return
+            group_penalties = penalties[timetable[depth]]
+            for choice in choices[depth]:
+                next_penalty = penalty + group_penalties[choice]
+                best = -(base + (next_penalty + floors[depth + 1]) * weights["professor"])
+                if len(heap) == k and (best, leaf) < heap[0][:2]:
+                    break
+                chosen.append(choice)
+                choose(depth + 1, next_penalty)
+                chosen.pop()
+
+        def chosen_lectures():
+            return [space.groups[position].lectures[choice] for position, choice in zip(timetable, chosen)]
+
+        choose(0, 0)
+
+    # 깊이 우선 탐색으로 depth 번째 과목의 묶음을 고르는 함수
+    def search(depth, blocked, mask, penalty):
+        if stats is not None:
+            if stats.cancelled:
+                return
+            stats.explored += 1
+        if depth == len(space.positions):
+            collect(mask)
+            return
+
+        for position in space.positions[depth]:
+            if (blocked >> position) & 1:
+                continue
+            added_section = space.push_section(position, subject_sections)
+            if added_section is None:
+                continue
+
+            next_blocked = blocked | space.conflict_bits[position]
+            next_mask = mask | space.groups[position].mask
+            next_penalty = penalty + min_penalties[position]
+            if ((space.check is None or space.check(next_mask)) and space.feasible(depth + 1, next_blocked)
+                    and lower_bound(next_mask, next_penalty + remaining_penalty[depth + 1]) < threshold()):
+                timetable.append(position)
+                search(depth + 1, next_blocked, next_mask, next_penalty)
+                timetable.pop()
+            if added_section:
+                space.pop_section(position, subject_sections)
+
+    search(0, 0, 0, 0)
+    return [(-negative_score, lectures) for negative_score, _, _, lectures in sorted(heap, reverse=True)]
+
+# 시간표를 정렬하는 함수
+# (강의마다 가장 이른 수업의 요일과 시작 시각 순)
+def sort_timetable(timetable):
+    timetable.sort(key=lambda lec: min(
+        [(day_index(day), times[0] * 60 + times[1]) for day, times in iter_meetings(lec.schedule)], default=(0, 0)))
+    return timetable
+
+# 비트셋에 들어 있는 위치들을 차례로 돌려주는 함수
+def iter_bits(bits):
+    while bits:
+        low_bit = bits & -bits
+        yield low_bit.bit_length() - 1
+        bits ^= low_bit
+
+# 충돌 비트셋으로 주어진 그래프에서 candidates 안의 최대 가중 독립 집합을 찾는 함수 (분기 한정법)
+# best_weight 보다 큰 해만 찾으며, 돌려주는 값: (최선의 위치 비트셋, 그 가중치, 시간 초과 여부)
+def max_weight_independent_set(conflict_bits, values, candidates, best_weight=0, best_bits=None, deadline=None):
+    timed_out = False
+
+    # 남은 후보를 서로 충돌하는 묶음(클리크)으로 나누고 묶음마다 최대 가중치만 더한 상한
+    def upper_bound(remaining):
+        bound = 0
+        while remaining:
+            position = remaining.bit_length() - 1
+            clique = remaining & conflict_bits[position]
+            heaviest = values[position]
+            remaining ^= 1 << position
+            for other in iter_bits(clique):
+                if (clique >> other) & 1:
+                    clique &= conflict_bits[other]
+                    heaviest = max(heaviest, values[other])
+                    remaining ^= 1 << other
+            bound += heaviest
+        return bound
+
+    # remaining 후보 중에서 넣을 과목을 고르는 함수
+    def search(remaining, chosen, weight):
+        nonlocal best_weight, best_bits, timed_out
+        if timed_out or (deadline is not None and time.monotonic() > deadline):
+            timed_out = True
+            return
+        if not remaining:
+            if weight > best_weight:
+                best_weight, best_bits = weight, chosen
+            return
+        if weight + upper_bound(remaining) <= best_weight:
+            return
+
+        # 남은 후보와 가장 많이 충돌하는 과목을 넣는 경우와 빼는 경우로 나눔
+        position = max(iter_bits(remaining), key=lambda i: (conflict_bits[i] & remaining).bit_count())
+        bit = 1 << position
+        if not conflict_bits[position] & remaining:
+            search(remaining ^ bit, chosen | bit, weight + values[position])
+            return
+        search(remaining & ~conflict_bits[position] & ~bit, chosen | bit, weight + values[position])
+        search(remaining & ~bit, chosen, weight)
+
+    search(candidates, 0, 0)
+    return best_bits, best_weight, timed_out
+
+# 시간표에 함께 넣을 수 있는 선택 과목의 가중치 합이 가장 큰 조합을 찾는 함수 (충돌 그래프의 최대 가중 독립 집합)
+# 돌려주는 값: (넣은 선택 과목, 넣지 못한 선택 과목, 최적해인지 여부)
+def pack_electives(base_timetable, electives, weights=None, index=None, time_limit=ELECTIVE_TIME_LIMIT):
+    occupied = 0
+    for lecture in base_timetable:
+        occupied |= lecture.mask
+    if index is not None:
+        base_bits = index.bits_of(base_timetable)
+        candidates = [elective for elective in electives if not index.conflict_bits_of(elective) & base_bits]
+    else:
+        candidates = [elective for elective in electives if not elective.mask & occupied]
+
+    values = [1 if weights is None else weights.get(elective, 1) for elective in candidates]
+    conflict_bits = local_conflict_bits(candidates, index)
+
+    # 먼저 가중치 대비 충돌이 적은 순서로 넣는 탐욕해를 구해 두고 최선값의 시작점으로 씀
+    greedy_weight = 0
+    greedy_bits = 0
+    blocked = 0
+    for position in sorted(range(len(candidates)), key=lambda i: -values[i] / (1 + conflict_bits[i].bit_count())):
+        if not (blocked >> position) & 1:
+            greedy_bits |= 1 << position
+            greedy_weight += values[position]
+            blocked |= conflict_bits[position] | (1 << position)
+
+    best_bits, _, timed_out = max_weight_independent_set(
+        conflict_bits, values, (1 << len(candidates)) - 1, greedy_weight, greedy_bits, time.monotonic() + time_limit)
+
+    chosen = [elective for position, elective in enumerate(candidates) if (best_bits >> position) & 1]
+    chosen_set = set(chosen)
+    dropped = [elective for elective in electives if elective not in chosen_set]
+    return chosen, dropped, not timed_out
+
+# 모든 예비 시간표 중에서 선택 과목을 가장 적게 빼도 되는 시간표를 찾는 함수
+# 돌려주는 값: (뺄 선택 과목, 그때의 예비 시간표 묶음 조합) - 예비 시간표가 하나도 없으면 (None, None)
+# constraints 를 주면 예비 시간표는 조건을 지키는 것만 보고, 막힌 시간 등에 걸리는 선택 과목은 처음부터 빼야 하는 것으로 셈
+def recommend_minimum_removals(subjects, electives, index=None, stats=None, constraints=None):
+    space = SearchSpace(subjects, index, constraints)
+    elective_bits = local_conflict_bits(electives, index)
+    values = [1] * len(electives)
+    all_electives = (1 << len(electives)) - 1
+
+    # 묶음마다 충돌하는 선택 과목의 비트셋 (묶음 안의 강의는 시간이 같으므로 대표 강의로 계산)
+    conflict = index.conflicts if index is not None else check_conflict
+    group_conflicts = []
+    for group in space.groups:
+        bits = 0
+        for position, elective in enumerate(electives):
+            if conflict(group.lectures[0], elective):
+                bits |= 1 << position
+        group_conflicts.append(bits)
+
+    best_removals = len(electives) + 1
+    best_kept = 0
+    best_timetable = None
+    exact_sets = {}  # 남은 선택 과목 비트셋 -> (최대 독립 집합 크기, 그 비트셋)
+    upper_limits = {}  # 남은 선택 과목 비트셋 -> 최대 독립 집합 크기의 상한
+    timetable = []
+    subject_sections = {}
+
+    # 완성된 예비 시간표에서 남은 선택 과목 중 최대한 많이 넣어 보는 함수
+    def evaluate(forced):
+        nonlocal best_removals, best_kept, best_timetable
+        remaining = all_electives & ~forced
+        # 지금까지의 최선보다 적게 빼려면 remaining 에서 need 개보다 많이 넣어야 함
+        need = remaining.bit_count() - (best_removals - forced.bit_count())
+        if remaining in exact_sets:
+            kept, kept_bits = exact_sets[remaining]
+            if kept <= need:
+                return
+        else:
+            if upper_limits.get(remaining, need + 1) <= need:
+                return
+            kept_bits, kept, _ = max_weight_independent_set(elective_bits, values, remaining, need)
+            if kept_bits is None:
+                upper_limits[remaining] = need
+                return
+            exact_sets[remaining] = (kept, kept_bits)
+        best_removals = forced.bit_count() + remaining.bit_count() - kept
+        best_kept = kept_bits
+        best_timetable = tuple(space.groups[position] for position in timetable)
+
+    # 깊이 우선 탐색으로 예비 시간표를 만들며, 이미 반드시 빼야 하는 과목 수가 최선 이상이면 더 내려가지 않음
+    def search(depth, blocked, forced, occupied):
+        if stats is not None:
+            if stats.cancelled:
+                return
+            stats.explored += 1
+        if depth == len(space.positions):
+            evaluate(forced)
+            return
+
+        for position in space.positions[depth]:
+            if best_removals == 0:
+                return
+            if (blocked >> position) & 1:
+                continue
+            next_forced = forced | group_conflicts[position]
+            if next_forced.bit_count() >= best_removals:
+                continue
+            added_section = space.push_section(position, subject_sections)
+            if added_section is None:
+                continue
+
+            next_blocked = blocked | space.conflict_bits[position]
+            next_occupied = occupied | space.masks[position]
+            if (space.check is None or space.check(next_occupied)) and space.feasible(depth + 1, next_blocked):
+                timetable.append(position)
+                search(depth + 1, next_blocked, next_forced, next_occupied)
+                timetable.pop()
+            if added_section:
+                space.pop_section(position, subject_sections)
+
+    forced = 0
+    if constraints is not None:
+        for position, elective in enumerate(electives):
+            if not constraints.allows(elective):
+                forced |= 1 << position
+    search(0, 0, forced, 0)
+    if best_timetable is None:
+        return None, None
+    removals = [elective for position, elective in enumerate(electives) if not (best_kept >> position) & 1]
+    return removals, best_timetable
+
+# 삭제할 과목을 추천하는 함수
+def recommend_removals(preliminary_timetable, elective_lectures, index=None):
+    if index is not None:
+        timetable_bits = index.bits_of(preliminary_timetable)
+        return [elective for elective in elective_lectures if index.conflict_bits_of(elective) & timetable_bits]
+
+    occupied = 0
+    for lecture in preliminary_timetable:
+        occupied |= lecture.mask
+    return [elective for elective in elective_lectures if elective.mask & occupied]
+
+# 여러 학생에게 강의 정원을 지키며 분반을 나눠 주는 클래스 (학생을 추가, 삭제할 때마다 그 학생만 다시 배정함)
+# - 묶음마다 찬 비율이 높을수록 지수적으로 비싼 값을 매기고, 학생마다 값의 합이 가장 작은 충돌 없는 시간 구성을 고름
+#   (원하는 선택 과목과 겹치는 묶음은 더 비싸게 봄), 그 뒤 원하는 선택 과목을 가장 많이(같으면 더 원하는 것을) 넣음
+# - 자리가 없어 배정하지 못하면, 정원을 무시한 시간 구성에서 꽉 찬 강의를 차지한 다른 학생을
+#   선택 과목을 잃지 않는 선에서 다른 묶음으로 옮겨 자리를 만들어 봄
+# 배정: (강의 리스트, 넣은 선택 과목 리스트), 배정하지 못한 학생은 None
+class CohortAllocator:
+    def __init__(self, index=None, elective_time_limit=ALLOCATION_ELECTIVE_TIME_LIMIT):
+        self.index = index
+        self.elective_time_limit = elective_time_limit
+        self.seats = {}  # 강의 -> 남은 자리 (정원이 있고 누군가 배정된 적이 있는 강의만)
+        self.holders = defaultdict(set)  # 강의 -> 그 강의에 배정된 학생 키
+        self.students = {}  # 학생 키 -> (필수 과목 리스트, 원하는 선택 과목 리스트(원하는 순서))
+        self.assignments = {}  # 학생 키 -> 배정 또는 None
+        self.spaces = {}  # 과목 구성 -> 탐색 공간 (같은 과목을 듣는 학생끼리 함께 씀)
+
+    # 강의의 남은 자리 수 (정원이 없으면 None)
+    def free_seats(self, lecture):
+        remaining = self.seats.get(lecture)
+        return lecture.capacity if remaining is None else remaining
+
+    # 묶음(또는 과목)에서 excluded 가 아닌 강의들의 남은 자리 수 합계 (정원이 없는 강의가 있으면 무한대)
+    def group_seats(self, group, excluded=()):
+        total = 0
+        for lecture in group.lectures:
+            if lecture in excluded:
+                continue
+            remaining = self.free_seats(lecture)
+            if remaining is None:
+                return float("inf")
+            total += remaining
+        return total
+
+    # 묶음의 값: 정원 대비 찬 비율에 따라 1 에서 e^ALLOCATION_PRICE_GROWTH 까지 (자리가 없으면 무한대)
+    def group_price(self, group, excluded=()):
+        seats = capacity = 0
+        for lecture in group.lectures:
+            if lecture in excluded:
+                continue
+            remaining = self.free_seats(lecture)
+            if remaining is None:
+                return 1.0
+            seats += remaining
+            capacity += lecture.capacity
+        if seats <= 0:
+            return float("inf")
+        return exp(ALLOCATION_PRICE_GROWTH * (1 - seats / capacity))
+
+    # 묶음에서 남은 자리가 가장 많은 강의를 고르는 함수
+    def pick_lecture(self, group, excluded=()):
+        best = best_seats = None
+        for lecture in group.lectures:
+            if lecture in excluded:
+                continue
+            remaining = self.free_seats(lecture)
+            if remaining is None:
+                return lecture
+            if remaining > 0 and (best is None or remaining > best_seats):
+                best, best_seats = lecture, remaining
+        return best
+
+    def space_of(self, subjects):
+        key = tuple(id(subject) for subject in subjects)
+        space = self.spaces.get(key)
+        if space is None:
+            space = self.spaces[key] = SearchSpace(subjects, self.index)
+        return space
+
+    # 배정의 점수: (넣은 선택 과목 수, 더 원하는 과목일수록 큰 값)
+    def score(self, assignment, electives):
+        if assignment is None:
+            return (-1, 0)
+        ranks = {elective: rank for rank, elective in enumerate(electives)}
+        return (len(assignment[1]), -sum(ranks[elective] for elective in assignment[1]))
+
+    # 지금 남은 자리로 학생의 배정을 찾는 함수 (excluded 강의는 쓰지 않음, 찾지 못하면 None)
+    def place(self, subjects, electives, excluded=()):
+        space = self.space_of(subjects)
+        available = [elective for elective in electives
+                     if elective not in excluded and (self.free_seats(elective) is None or self.free_seats(elective) > 0)]
+        # 더 원하는 과목의 가중치를 조금 더 크게 하되, 넣은 과목 수가 먼저 비교되도록 차이를 1 보다 작게 둠
+        weights = {elective: 1 + (len(electives) - rank) / (len(electives) + 1) ** 2
+                   for rank, elective in enumerate(electives)}
+        conflict = self.index.conflicts if self.index is not None else check_conflict
+
+        costs = []
+        for group in space.groups:
+            cost = self.group_price(group, excluded)
+            for elective in available:
+                if conflict(group.lectures[0], elective):
+                    cost += ALLOCATION_PREFERENCE_COST * weights[elective]
+            costs.append(cost)
+        ordered = space.reordered([[position for position in positions if costs[position] != float("inf")]
+                                   for positions in space.positions])
+        positions = ordered.cheapest(costs, ALLOCATION_SEARCH_NODES)
+        if positions is None:
+            return None
+
+        timetable = [self.pick_lecture(space.groups[position], excluded) for position in positions]
+        chosen = []
+        if available:
+            chosen, _, _ = pack_electives(timetable, available, weights, self.index, self.elective_time_limit)
+        return timetable, chosen
+
+    # 배정한 자리를 차지하거나(step=-1) 돌려주는(step=1) 함수
+    def book(self, key, assignment, step):
+        timetable, chosen = assignment
+        for lecture in chain(timetable, chosen):
+            if lecture.capacity is not None:
+                self.seats[lecture] = self.free_seats(lecture) + step
+            if step < 0:
+                self.holders[lecture].add(key)
+            else:
+                self.holders[lecture].discard(key)
+
+    # 꽉 찬 묶음에 자리를 하나 만드는 함수 (묶음의 강의를 차지한 학생을 reserved 밖의 강의로 옮겨 봄)
+    def make_room(self, group, reserved):
+        for lecture in group.lectures:
+            for holder in list(self.holders[lecture])[:ALLOCATION_REPAIR_MOVES]:
+                old = self.assignments[holder]
+                subjects, electives = self.students[holder]
+                self.book(holder, old, 1)
+                new = self.place(subjects, electives, reserved)
+                if new is not None and self.score(new, electives) >= self.score(old, electives):
+                    self.book(holder, new, -1)
+                    self.assignments[holder] = new
+                    return True
+                self.book(holder, old, -1)
+        return False
+
+    # 자리가 없어 배정하지 못한 학생을 위해 다른 학생을 옮겨서 배정해 보는 함수
+    def repair(self, key):
+        subjects, electives = self.students[key]
+        # 과목 전체에 남은 자리가 없으면 다른 학생을 옮겨도 자리가 생기지 않음
+        for subject in subjects:
+            if self.group_seats(subject) <= 0:
+                return None
+        space = self.space_of(subjects)
+        for positions in islice(space.search(stats=SearchBudget(ALLOCATION_SEARCH_NODES)), ALLOCATION_REPAIR_CANDIDATES):
+            full = [space.groups[position] for position in positions if self.group_seats(space.groups[position]) <= 0]
+            reserved = set()
+            for group in full:
+                reserved.update(group.lectures)
+            if all(self.make_room(group, reserved) for group in full):
+                assignment = self.place(subjects, electives)
+                if assignment is not None:
+                    return assignment
+        return None
+
+    # 학생을 추가하고 배정을 돌려주는 함수 (이미 있는 키면 그 학생의 배정만 다시 함)
+    def add_student(self, key, subjects, electives=()):
+        if key in self.students:
+            self.remove_student(key)
+        self.students[key] = (list(subjects), list(electives))
+        assignment = self.place(subjects, electives)
+        if assignment is None:
+            assignment = self.repair(key)
+        if assignment is not None:
+            self.book(key, assignment, -1)
+        self.assignments[key] = assignment
+        return assignment
+
+    # 학생을 빼고 그 학생의 자리를 돌려주는 함수 (없는 학생이거나 이미 뺀 학생이면 KeyError)
+    def remove_student(self, key):
+        if key not in self.students:
+            raise KeyError(f"배정 목록에 없는 학생입니다: {key!r}")
+        assignment = self.assignments.pop(key)
+        del self.students[key]
+        if assignment is not None:
+            self.book(key, assignment, 1)
+
+    # 배정하지 못한 학생들을 다시 배정해 보는 함수 (자리가 생겼을 때, 돌려주는 값: 새로 배정한 학생 수)
+    def retry_unassigned(self):
+        assigned = 0
+        for key in [key for key, assignment in self.assignments.items() if assignment is None]:
+            subjects, electives = self.students[key]
+            if self.add_student(key, subjects, electives) is not None:
+                assigned += 1
+        return assigned
+
+    # 배정하지 못한 학생 키 리스트
+    def unassigned(self):
+        return [key for key, assignment in self.assignments.items() if assignment is None]
+
+# 학생들((필수 과목 리스트, 원하는 선택 과목 리스트) 의 리스트)에게 정원을 지키며 분반을 나눠 주는 함수
+# (돌려주는 값: 학생 번호를 키로 배정을 담은 CohortAllocator, 이후 학생을 추가, 삭제하며 계속 쓸 수 있음)
+def allocate_cohort(students, index=None):
+    allocator = CohortAllocator(index)
+    for key, (subjects, electives) in enumerate(students):
+        allocator.add_student(key, subjects, electives)
+    return allocator
+
+# 필수 과목, 선택 과목과 그 충돌 인덱스를 함께 들고 있는 카탈로그 클래스 (여러 요청이 같은 인덱스를 함께 씀)
+class Catalog:
+    def __init__(self, subjects=(), electives=(), build_index=True):
+        self.subjects = {subject.name: subject for subject in subjects}  # 과목명 -> Subject
+        self.electives = list(electives)  # 선택 과목 강의 리스트
+        self.lectures = [lecture for subject in self.subjects.values() for lecture in subject.lectures] + self.electives
+        self.lecture_ids = {lecture: i for i, lecture in enumerate(self.lectures)}  # 강의 -> 강의 번호
+        # 강의 수의 제곱만큼 커지는 인덱스는 작은 카탈로그에만 만들고, 큰 카탈로그는 마스크로 바로 비교함
+        self.index = None
+        if build_index and len(self.lectures) <= MAX_INDEXED_LECTURES:
+            self.index = ConflictIndex(self.lectures)
+
+# 카탈로그를 한 번에 읽어 들이며 같은 문자열, 일정, 마스크는 한 객체만 만들어 함께 쓰는 클래스
+# (공유된 일정 딕셔너리는 읽기 전용으로만 씀)
+class CatalogBuilder:
+    def __init__(self):
+        self.schedules = {}  # 일정 키 -> (공유 일정 딕셔너리, 마스크)
+        self.subjects = {}  # 과목명 -> Subject (처음 나온 순서)
+        self.electives = []  # 선택 과목 강의 리스트
+
+    # 문자열을 공유 객체로 바꾸는 함수 (빈 문자열은 None)
+    def intern(self, text):
+        return sys.intern(text) if text else None
+
+    # 강의를 만들어 과목 목록 또는 선택 과목 목록에 넣는 함수
+    def add_lecture(self, subject, professor, schedule, section=None, elective=False, capacity=None):
+        schedule = normalize_schedule(schedule)
+        key = tuple(schedule.items())
+        shared = self.schedules.get(key)
+        if shared is None:
+            shared = ({self.intern(day): times for day, times in key}, schedule_to_mask(schedule))
+            self.schedules[key] = shared
+        subject = self.intern(subject)
+        lecture = Lecture(subject, self.intern(professor), shared[0], self.intern(section), shared[1], capacity)
+
+        if elective:
+            self.electives.append(lecture)
+        else:
+            if subject not in self.subjects:
+                self.subjects[subject] = Subject(subject)
+            self.subjects[subject].add_lecture(lecture)
+        return lecture
+
+    def catalog(self):
+        return Catalog(self.subjects.values(), self.electives)
+
+# 강의를 카탈로그 파일(JSON)에 쓸 딕셔너리로 만드는 함수 (수업이 한 번인 요일은 예전처럼 [시, 분, 시, 분] 으로 씀)
+def lecture_to_dict(lecture):
+    data = {"subject": lecture.subject, "professor": lecture.professor, "section": lecture.section,
+            "schedule": {day: list(times[0]) if len(times) == 1 else [list(interval) for interval in times]
+                         for day, times in lecture.schedule.items()}}
+    if lecture.capacity is not None:
+        data["capacity"] = lecture.capacity
+    return data
+
+# 카탈로그 파일을 읽는 함수 (컴파일된 카탈로그는 첫 바이트로 알아보고, 확장자가 .csv 면 CSV, 그 밖에는 JSON)
+def load_catalog(path):
+    with open(path, "rb") as file:
+        if file.read(len(COMPILED_CATALOG_MAGIC)) == COMPILED_CATALOG_MAGIC:
+            return load_compiled_catalog(path)
+    if path.lower().endswith(".csv"):
+        return load_catalog_csv(path)
+    return load_catalog_json(path)
+
+# 카탈로그 파일(JSON)을 읽는 함수
+# 형식: {"subjects": [{"name": ..., "lectures": [강의, ...]}], "electives": [강의, ...]}
+# 강의: {"subject": ..., "professor": ..., "section": ..., "schedule": {"Mon": [9, 0, 10, 15]}, "capacity": 40}
+#       (같은 요일에 수업이 여러 번이면 "Mon": [[9, 0, 10, 0], [13, 0, 15, 0]], capacity 는 생략 가능)
+def load_catalog_json(path):
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    builder = CatalogBuilder()
+    for subject_data in data.get("subjects", []):
+        for lecture in subject_data["lectures"]:
+            builder.add_lecture(subject_data["name"], lecture["professor"], lecture["schedule"], lecture.get("section"),
+                                capacity=lecture.get("capacity"))
+    for lecture in data.get("electives", []):
+        builder.add_lecture(lecture["subject"], lecture["professor"], lecture["schedule"], lecture.get("section"), True,
+                            lecture.get("capacity"))
+    return builder.catalog()
+
+# 대학 수강편람에서 내보낸 카탈로그 파일(CSV)을 읽는 함수
+# 칸: kind(mandatory/elective, 생략 가능), subject, section, professor, day, start(09:00), end(10:15), lecture_id(생략 가능),
+#     capacity(생략 가능)
+# 한 줄이 수업 한 번이며, lecture_id 가 같은 줄(없으면 kind, 과목명, 분반, 교수명이 같은 줄)은 한 강의로 묶음
+def load_catalog_csv(path):
+    import csv  # CSV 카탈로그를 읽을 때만 필요함 (re 까지 읽어 오므로 시작할 때는 import 하지 않음)
+
+    lectures = {}  # 강의 키 -> (선택 과목 여부, 과목명, 교수명, 분반, 일정, 정원)
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        column = {name: i for i, name in enumerate(header)}
+        subject_at, professor_at = column["subject"], column["professor"]
+        day_at, start_at, end_at = column["day"], column["start"], column["end"]
+        kind_at, section_at, id_at = column.get("kind"), column.get("section"), column.get("lecture_id")
+        capacity_at = column.get("capacity")
+
+        # DictReader 보다 빠르도록 칸 번호로 바로 읽음
+        for row in reader:
+            if not row:
+                continue
+            kind = row[kind_at].strip() if kind_at is not None else ""
+            section = row[section_at] if section_at is not None else None
+            key = row[id_at] if id_at is not None and row[id_at] else (kind, row[subject_at], section, row[professor_at])
+            lecture = lectures.get(key)
+            if lecture is None:
+                capacity = int(row[capacity_at]) if capacity_at is not None and row[capacity_at].strip() else None
+                lecture = (kind in ELECTIVE_KINDS, row[subject_at], row[professor_at], section, {}, capacity)
+                lectures[key] = lecture
+            start_hour, start_minute = row[start_at].split(":")
+            end_hour, end_minute = row[end_at].split(":")
+            schedule = lecture[4]
+            day = row[day_at]
+            schedule[day] = schedule.get(day, ()) + ((int(start_hour), int(start_minute), int(end_hour), int(end_minute)),)
+
+    builder = CatalogBuilder()
+    for elective, subject, professor, section, schedule, capacity in lectures.values():
+        builder.add_lecture(subject, professor, schedule, section, elective, capacity)
+    return builder.catalog()
+
+# 과목 목록을 카탈로그 파일(JSON)로 저장하는 함수
+def save_catalog(path, subjects, electives=()):
+    data = {
+        "subjects": [{"name": subject.name, "lectures": [lecture_to_dict(lecture) for lecture in subject.lectures]}
+                     for subject in subjects],
+        "electives": [lecture_to_dict(lecture) for lecture in electives],
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=1)
+
+# 버퍼의 일부를 부호 없는 32비트 정수 배열로 보는 함수 (복사하지 않음)
+def uint32_view(buffer, offset, length):
+    view = memoryview(buffer)[offset:offset + 4 * length]
+    if sys.byteorder == "little":
+        return view.cast("I")
+    return struct.unpack(f"<{length}I", view)
+
+# 구역을 4 바이트 경계에 맞추도록 채울 바이트 수를 구하는 함수
+def padding(size):
+    return -size % 4
+
+# 파싱과 인덱싱이 끝난 카탈로그를 mmap 으로 바로 읽을 수 있는 이진 파일로 저장하는 함수
+# 구역 순서: 문자열 위치/바이트, 요일, 일정별 수업 위치/수업, 일정별 마스크 위치/이동/바이트, 강의, 과목별 강의 위치/과목명,
+#            충돌 비트셋(카탈로그에 충돌 인덱스가 있을 때만, 강의마다 같은 길이, 4 바이트 경계까지 채움),
+#            강의별 정원(정원이 있는 강의가 하나라도 있을 때만)
+# 강의 번호는 Catalog.lectures 순서(필수 과목 강의 다음 선택 과목 강의)와 같음
+def save_compiled_catalog(path, catalog):
+    strings = {}  # 문자열 -> 번호
+    string_bytes = []
+
+    def string_id(text):
+        if text is None:
+            return NO_STRING
+        if text not in strings:
+            strings[text] = len(strings)
+            string_bytes.append(text.encode("utf-8"))
+        return strings[text]
+
+    schedules = {}  # 공유 일정 딕셔너리의 id -> 일정 번호
+    meeting_offsets, meetings = [0], []
+    mask_offsets, mask_shifts, mask_bytes = [0], [], []
+    lecture_records = []
+    for lecture in catalog.lectures:
+        schedule_id = schedules.get(id(lecture.schedule))
+        if schedule_id is None:
+            schedule_id = len(schedules)
+            schedules[id(lecture.schedule)] = schedule_id
+            for day, times in iter_meetings(lecture.schedule):
+                meetings += [string_id(day), *times]
+            meeting_offsets.append(len(meetings) // 5)
+            shift = ((lecture.mask & -lecture.mask).bit_length() - 1) // 8 * 8 if lecture.mask else 0
+            trimmed = lecture.mask >> shift
+            mask_bytes.append(trimmed.to_bytes((trimmed.bit_length() + 7) // 8, "little"))
+            mask_shifts.append(shift)
+            mask_offsets.append(mask_offsets[-1] + len(mask_bytes[-1]))
+        lecture_records += [string_id(lecture.subject), string_id(lecture.professor), string_id(lecture.section),
+                            schedule_id]
+
+    subject_offsets, subject_names = [0], []
+    for name, subject in catalog.subjects.items():
+        subject_names.append(string_id(name))
+        subject_offsets.append(subject_offsets[-1] + len(subject.lectures))
+    days = [string_id(day) for day in DAY_INDEX]
+    string_offsets = [0]
+    for encoded in string_bytes:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+
+    # 충돌 비트셋은 강의 번호 기준으로 저장 (인덱스 위치가 강의 번호와 다르면 다시 맞춤)
+    index = catalog.index
+    conflict_rows = []
+    if index is not None:
+        if all(index.positions.get(lecture) == i for i, lecture in enumerate(catalog.lectures)):
+            conflict_rows = index.conflict_bits[:len(catalog.lectures)]
+        else:
+            conflict_rows = local_conflict_bits(catalog.lectures, index)
+    row_size = (len(catalog.lectures) + 7) // 8 if index is not None else 0
+    capacities = []
+    if any(lecture.capacity is not None for lecture in catalog.lectures):
+        capacities = [NO_CAPACITY if lecture.capacity is None else lecture.capacity for lecture in catalog.lectures]
+
+    header = COMPILED_CATALOG_HEADER.pack(
+        COMPILED_CATALOG_MAGIC, COMPILED_CATALOG_VERSION, (1 if index is not None else 0) | (2 if capacities else 0),
+        len(string_bytes), string_offsets[-1], len(days), len(schedules), len(meetings) // 5, mask_offsets[-1],
+        len(catalog.lectures), len(subject_names), len(catalog.electives), row_size)
+    blob = b"".join(string_bytes)
+    masks = b"".join(mask_bytes)
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(struct.pack(f"<{len(string_offsets)}I", *string_offsets))
+        file.write(blob + bytes(padding(len(blob))))
+        for values in (days, meeting_offsets, meetings, mask_offsets, mask_shifts):
+            file.write(struct.pack(f"<{len(values)}I", *values))
+        file.write(masks + bytes(padding(len(masks))))
+        for values in (lecture_records, subject_offsets, subject_names):
+            file.write(struct.pack(f"<{len(values)}I", *values))
+        for bits in conflict_rows:
+            file.write(bits.to_bytes(row_size, "little"))
+        if capacities:
+            file.write(bytes(padding(row_size * len(conflict_rows))))
+            file.write(struct.pack(f"<{len(capacities)}I", *capacities))
+
+# 컴파일된 카탈로그 파일을 mmap 으로 열어 배열을 그대로 읽는 함수
+# (문자열, 일정, 마스크는 한 번씩만 만들고, 충돌 인덱스는 저장된 비트셋을 그대로 씀)
+def load_compiled_catalog(path):
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        (magic, version, flags, string_count, string_size, day_count, schedule_count, meeting_count, mask_size,
+         lecture_count, subject_count, elective_count, row_size) = COMPILED_CATALOG_HEADER.unpack_from(buffer)
+        if magic != COMPILED_CATALOG_MAGIC:
+            raise ValueError(f"컴파일된 카탈로그 파일이 아닙니다: {path}")
+        if version not in READABLE_CATALOG_VERSIONS:
+            raise ValueError(f"지원하지 않는 카탈로그 형식 버전입니다: {version} (지원: {READABLE_CATALOG_VERSIONS})")
+
+        offset = COMPILED_CATALOG_HEADER.size
+
+        def take(length):
+            nonlocal offset
+            values = uint32_view(buffer, offset, length)
+            offset += 4 * length
+            return values
+
+        string_offsets = take(string_count + 1)
+        blob = buffer[offset:offset + string_size]
+        offset += string_size + padding(string_size)
+        strings = [sys.intern(blob[string_offsets[i]:string_offsets[i + 1]].decode("utf-8"))
+                   for i in range(string_count)]
+
+        def optional_string(i):
+            return None if i == NO_STRING else strings[i]
+
+        # 저장할 때의 요일 번호가 지금과 같아야 저장된 마스크를 그대로 쓸 수 있음
+        day_ids = take(day_count)
+        same_days = all(day_index(strings[day_id]) == i for i, day_id in enumerate(day_ids))
+        meeting_offsets, meetings = take(schedule_count + 1), take(5 * meeting_count)
+        mask_offsets, mask_shifts = take(schedule_count + 1), take(schedule_count)
+        masks = buffer[offset:offset + mask_size]
+        offset += mask_size + padding(mask_size)
+
+        schedules = []
+        for i in range(schedule_count):
+            schedule = {}
+            for m in range(5 * meeting_offsets[i], 5 * meeting_offsets[i + 1], 5):
+                schedule.setdefault(strings[meetings[m]], []).append(tuple(meetings[m + 1:m + 5]))
+            schedule = {day: tuple(intervals) for day, intervals in schedule.items()}
+            if same_days:
+                mask = int.from_bytes(masks[mask_offsets[i]:mask_offsets[i + 1]], "little") << mask_shifts[i]
+            else:
+                mask = schedule_to_mask(schedule)
+            schedules.append((schedule, mask))
+
+        records = take(4 * lecture_count)
+        lectures = []
+        for r in range(0, 4 * lecture_count, 4):
+            schedule, mask = schedules[records[r + 3]]
+            lectures.append(Lecture(strings[records[r]], optional_string(records[r + 1]), schedule,
+                                    optional_string(records[r + 2]), mask))
+
+        subject_offsets, subject_names = take(subject_count + 1), take(subject_count)
+        subjects = []
+        for i in range(subject_count):
+            subject = Subject(strings[subject_names[i]])
+            subject.lectures = lectures[subject_offsets[i]:subject_offsets[i + 1]]
+            subjects.append(subject)
+
+        conflict_bits = None
+        if flags & 1:
+            conflict_bits = [int.from_bytes(buffer[offset + i * row_size:offset + (i + 1) * row_size], "little")
+                             for i in range(lecture_count)]
+            offset += row_size * lecture_count
+        if flags & 2:
+            offset += padding(row_size * lecture_count if flags & 1 else 0)
+            capacities = take(lecture_count)
+            for lecture, capacity in zip(lectures, capacities):
+                lecture.capacity = None if capacity == NO_CAPACITY else capacity
+            if isinstance(capacities, memoryview):
+                capacities.release()
+        for view in (string_offsets, day_ids, meeting_offsets, meetings, mask_offsets, mask_shifts, records,
+                     subject_offsets, subject_names):
+            if isinstance(view, memoryview):
+                view.release()
+
+    catalog = Catalog(subjects, lectures[lecture_count - elective_count:], build_index=False)
+    if conflict_bits is not None:
+        catalog.index = ConflictIndex(catalog.lectures, conflict_bits)
+    return catalog
+
+# 예비 시간표를 탐색하면서 바로 파일로 내보내는 함수 (돌려주는 값: 내보낸 시간표 수)
+# 시간표마다 과목 순서대로 카탈로그 강의 번호(uint32)를 적으므로 시간표 수와 상관없이 메모리는 한 묶음만큼만 씀
+# 파일: 헤더, 과목명(줄바꿈으로 구분, 4 바이트 경계까지 채움), 시간표들 (stats 로 취소하면 그때까지 찾은 것만 남음)
+def export_timetables(path, catalog, subjects, constraints=None, stats=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    width = len(subjects)
+    digest = bytes.fromhex(selection_fingerprint(subjects, options=("export",)))
+    names = "\n".join(subject.name for subject in subjects).encode("utf-8")
+    group_ids = {}  # 묶음의 id -> 묶음 안 강의들의 카탈로그 강의 번호
+    total = 0
+    chunk = array("I")
+    chunk_rows = max(1, chunk_rows)
+
+    def flush():
+        if sys.byteorder != "little":
+            chunk.byteswap()
+        chunk.tofile(file)
+        del chunk[:]
+
+    with open(path, "wb") as file:
+        file.write(TIMETABLE_EXPORT_HEADER.pack(
+            TIMETABLE_EXPORT_MAGIC, TIMETABLE_EXPORT_VERSION, width, 0, digest, len(names)))
+        file.write(names + bytes(padding(len(names))))
+        for groups in create_timetable_groups(subjects, catalog.index, stats, constraints):
+            lecture_lists = []
+            for group in groups:
+                ids = group_ids.get(id(group))
+                if ids is None:
+                    ids = group_ids[id(group)] = [catalog.lecture_ids[lecture] for lecture in group.lectures]
+                lecture_lists.append(ids)
+            # 교수 조합이 아주 많은 묶음도 한 묶음씩 나눠서 씀
+            variants = product(*lecture_lists)
+            while True:
+                rows = list(islice(variants, chunk_rows - len(chunk) // max(1, width)))
+                if not rows:
+                    break
+                chunk.extend(chain.from_iterable(rows))
+                total += len(rows)
+                if len(chunk) >= chunk_rows * width:
+                    flush()
+        flush()
+        file.seek(0)
+        file.write(TIMETABLE_EXPORT_HEADER.pack(
+            TIMETABLE_EXPORT_MAGIC, TIMETABLE_EXPORT_VERSION, width, total, digest, len(names)))
+    return total
+
+# export_timetables 로 내보낸 파일을 mmap 으로 열어 i 번째 시간표를 바로 읽는 클래스
+# (catalog 를 주면 내보낼 때와 같은 과목 구성인지 확인하고 timetable(i) 로 강의 객체를 돌려줌)
+class TimetableExport:
+    def __init__(self, path, catalog=None):
+        self.file = open(path, "rb")
+        self.buffer = None
+        try:
+            self.read_header(path, catalog)
+        except BaseException:
+            self.close()
+            raise
+
+    # 파일을 mmap 으로 열고 머리말, 파일 길이, 과목 구성을 확인하는 함수 (맞지 않으면 ValueError)
+    def read_header(self, path, catalog):
+        size = os.fstat(self.file.fileno()).st_size
+        if size < TIMETABLE_EXPORT_HEADER.size:
+            raise ValueError(f"내보낸 시간표 파일이 아닙니다 (머리말보다 짧은 {size} 바이트): {path}")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.count, digest, names_size = TIMETABLE_EXPORT_HEADER.unpack_from(self.buffer)
+        if magic != TIMETABLE_EXPORT_MAGIC:
+            raise ValueError(f"내보낸 시간표 파일이 아닙니다: {path}")
+        if version != TIMETABLE_EXPORT_VERSION:
+            raise ValueError(f"지원하지 않는 시간표 파일 형식 버전입니다: {version} (지원: {TIMETABLE_EXPORT_VERSION})")
+        offset = TIMETABLE_EXPORT_HEADER.size
+        self.data_offset = offset + names_size + padding(names_size)
+        expected = self.data_offset + 4 * self.width * self.count
+        if len(self.buffer) < expected:
+            raise ValueError(f"내보낸 시간표 파일이 잘렸습니다 ({len(self.buffer)} 바이트, 필요: {expected} 바이트): {path}")
+        names = self.buffer[offset:offset + names_size].decode("utf-8")
+        self.subject_names = names.split("\n") if self.width else []
+
+        self.catalog = catalog
+        if catalog is not None:
+            subjects = [catalog.subjects.get(name) for name in self.subject_names]
+            if None in subjects or bytes.fromhex(selection_fingerprint(subjects, options=("export",))) != digest:
+                raise ValueError(f"카탈로그의 과목 구성이 내보낼 때와 다릅니다: {path}")
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    # i 번째 시간표의 카탈로그 강의 번호 튜플을 돌려주는 함수
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return tuple(uint32_view(self.buffer, self.data_offset + 4 * self.width * i, self.width))
+
+    # i 번째 시간표의 강의 객체 리스트를 돌려주는 함수 (catalog 를 줬을 때만)
+    def timetable(self, i):
+        return [self.catalog.lectures[lecture_id] for lecture_id in self[i]]
+
+    # 시간표를 rows 개씩 (시작 번호, 강의 번호 배열) 로 돌려주는 함수 (배열은 rows * width 길이의 평평한 uint32 array)
+    # (mmap 을 가리키는 뷰 대신 복사본을 주므로 묶음을 들고 있어도 파일을 닫을 수 있음)
+    def chunks(self, rows=EXPORT_CHUNK_ROWS):
+        for start in range(0, self.count, rows):
+            length = min(rows, self.count - start)
+            offset = self.data_offset + 4 * self.width * start
+            chunk = array("I")
+            chunk.frombytes(self.buffer[offset:offset + 4 * self.width * length])
+            if sys.byteorder != "little":
+                chunk.byteswap()
+            yield start, chunk
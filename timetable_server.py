@@ -0,0 +1,329 @@
+import argparse
+import asyncio
+import base64
+import ipaddress
+import json
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, islice
+
+from timetable_engine import (
+    ResultCache, TimetableConstraints, count_preliminary_timetables, count_timetable_variants, create_timetable_groups,
+    decode_timetable_groups, encode_timetable_groups, load_catalog, pack_electives, recommend_removals,
+    selection_fingerprint, timetable_variant)
+
+DEFAULT_HOST = "127.0.0.1"  # 서비스는 이 컴퓨터 안에서만 받음
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 20  # 한 번에 돌려줄 예비 시간표 수 기본값
+MAX_PAGE_SIZE = 200  # 한 번에 돌려줄 수 있는 최대 예비 시간표 수
+MAX_STORED_ROWS = 200000  # 선택마다 기억해 둘 최대 시간 구성(묶음 조합) 수 (넘으면 그 뒤는 넘겨 볼 수 없음)
+DEFAULT_DEADLINE = 10.0  # 요청마다 결과를 기다릴 최대 시간 기본값 (초)
+MAX_DEADLINE = 60.0  # 요청에서 정할 수 있는 최대 기다림 시간 (초)
+MAX_BODY_BYTES = 1024 * 1024  # 받을 수 있는 요청 본문의 최대 크기
+RESULT_ENTRIES = 1024  # 작업 프로세스가 계산한 결과를 기억해 둘 개수
+PAGE_ENTRIES = 64  # 페이지를 바로 자를 수 있게 준비해 둔 결과를 기억해 둘 개수
+STATUS_TEXTS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+                500: "Internal Server Error", 504: "Gateway Timeout"}
+
+# 잘못된 요청을 HTTP 상태 코드와 함께 알리는 예외
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+worker_catalog = None  # 작업 프로세스마다 한 번 읽어 두는 카탈로그
+
+# 작업 프로세스를 시작할 때 카탈로그를 읽어 두는 함수 (강의 번호는 서비스 프로세스와 같은 순서)
+def init_service_worker(catalog_path):
+    global worker_catalog
+    worker_catalog = load_catalog(catalog_path)
+
+# 작업 프로세스에서 예비 시간표 수와 앞의 시간 구성들을 구하는 함수 (결과는 선택된 강의 안에서의 번호)
+# (돌려주는 값: (전체 수, 인코딩한 시간 구성들, 시간 구성마다 그 줄까지의 교수 조합 수 누적합))
+def solve_timetables(subject_names, constraint_args):
+    subjects = [worker_catalog.subjects[name] for name in subject_names]
+    constraints = TimetableConstraints(**constraint_args) if constraint_args else None
+    total = count_preliminary_timetables(subjects, worker_catalog.index, constraints=constraints)
+    rows = list(islice(create_timetable_groups(subjects, worker_catalog.index, constraints=constraints), MAX_STORED_ROWS))
+    ends = list(accumulate(count_timetable_variants(groups) for groups in rows))
+    return total, encode_timetable_groups(subjects, rows), ends
+
+# 작업 프로세스에서 예비 시간표에 함께 넣을 수 있는 선택 과목의 최대 조합을 찾는 함수 (create_final_timetable 의 계산)
+def solve_final(lecture_ids, elective_numbers):
+    timetable = [worker_catalog.lectures[i] for i in lecture_ids]
+    electives = [worker_catalog.electives[number] for number in elective_numbers]
+    chosen, _, optimal = pack_electives(timetable, electives, index=worker_catalog.index)
+    chosen_set = set(chosen)
+    return ([number for number, elective in zip(elective_numbers, electives) if elective in chosen_set],
+            [number for number, elective in zip(elective_numbers, electives) if elective not in chosen_set], optimal)
+
+# 페이지 위치를 요청 내용과 함께 감춘 문자열로 바꾸는 함수 (다른 요청의 커서는 쓸 수 없음)
+def encode_cursor(key, offset):
+    return base64.urlsafe_b64encode(f"{key}:{offset}".encode("ascii")).decode("ascii")
+
+def decode_cursor(cursor, key):
+    try:
+        cursor_key, offset = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":")
+        offset = int(offset)
+    except (ValueError, UnicodeError):
+        raise RequestError(400, "잘못된 커서입니다") from None
+    if cursor_key != key or offset < 0:
+        raise RequestError(400, "커서가 이 요청의 것이 아닙니다")
+    return offset
+
+# 카탈로그와 인덱스를 메모리에 들고, 무거운 계산은 작업 프로세스에 맡기는 asyncio HTTP/JSON 서비스 클래스
+# - 같은 계산이 진행 중이면 새로 시작하지 않고 그 결과를 함께 기다림
+# - 요청마다 기다릴 시간이 정해져 있고, 넘기면 504 를 돌려줌 (계산은 계속되어 다음 요청에서 캐시로 씀)
+# - 예비 시간표는 커서로 조금씩 넘겨 봄
+class TimetableService:
+    def __init__(self, catalog, catalog_path, workers=None, deadline=DEFAULT_DEADLINE, cache_directory=None):
+        self.catalog = catalog
+        self.deadline = deadline
+        self.executor = ProcessPoolExecutor(
+            workers or os.cpu_count() or 1, initializer=init_service_worker, initargs=(catalog_path,))
+        self.results = ResultCache(RESULT_ENTRIES, cache_directory)  # 작업 프로세스의 계산 결과
+        self.pages = ResultCache(PAGE_ENTRIES)  # 강의 객체로 되돌리고 페이지 경계를 구해 둔 결과
+        self.in_flight = {}  # 키 -> 진행 중인 계산의 Future
+        self.coalesced = 0  # 진행 중인 계산을 함께 기다린 요청 수
+        self.timeouts = 0  # 기다림 시간을 넘긴 요청 수
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # key 의 계산(start() 코루틴)을 한 번만 시작하고 같은 키의 요청은 그 계산을 함께 기다리게 하는 함수
+    # (deadline 초를 넘기면 504, 계산은 계속되어 끝나면 각자의 캐시에 들어감)
+    async def shared(self, key, deadline, start):
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(start())
+            self.in_flight[key] = future
+
+            def finished(future):
+                del self.in_flight[key]
+                if not future.cancelled():
+                    future.exception()  # 아무도 기다리지 않은 계산의 오류도 가져간 것으로 표시
+
+            future.add_done_callback(finished)
+        else:
+            self.coalesced += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise RequestError(504, "계산이 제한 시간 안에 끝나지 않았습니다. 잠시 뒤 다시 요청하세요") from None
+
+    # 결과 캐시에서 값을 찾는 코루틴 (디스크 캐시를 쓰면 파일을 읽는 동안 이벤트 루프를 막지 않게 스레드에서 찾음)
+    async def cached_result(self, key):
+        if self.results.directory is None:
+            return self.results.get(key)
+        return await asyncio.get_running_loop().run_in_executor(None, self.results.get, key)
+
+    # 작업 프로세스에서 계산하고 결과를 캐시에 넣는 코루틴 (디스크에 쓰는 것도 스레드에서 함)
+    async def run_worker(self, key, function, *args):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, function, *args)
+        if self.results.directory is None:
+            self.results.put(key, result)
+        else:
+            await loop.run_in_executor(None, self.results.put, key, result)
+        return result
+
+    # 작업 프로세스에서 계산한 결과를 돌려주는 함수 (캐시에 있으면 그대로, 같은 계산이 진행 중이면 그것을 함께 기다림)
+    async def compute(self, key, deadline, function, *args):
+        result = await self.cached_result(key)
+        if result is not None:
+            return result
+        return await self.shared(key, deadline, lambda: self.run_worker(key, function, *args))
+
+    # 예비 시간표 계산 결과로 페이지 자료 (전체 수, 묶음 표, 인코딩한 줄, 누적합) 를 한 번 만들어 두는 코루틴
+    # (묶음 표만 강의 객체로 되돌리고, 줄은 페이지를 자를 때 필요한 것만 묶음으로 바꿈)
+    async def load_page(self, key, subjects, constraint_args):
+        result = await self.cached_result(key)
+        if result is None:
+            subject_names = [subject.name for subject in subjects]
+            result = await self.run_worker(key, solve_timetables, subject_names, constraint_args)
+        total, (group_table, encoded_rows), ends = result
+        # 모든 묶음 번호를 한 줄로 되돌리면 묶음 표 순서대로의 묶음 리스트가 됨
+        groups = decode_timetable_groups(subjects, (group_table, [range(len(group_table))]))[0]
+        page = (total, groups, encoded_rows, ends)
+        self.pages.put(key, page)
+        return page
+
+    # 요청에서 기다릴 시간을 읽는 함수
+    def request_deadline(self, body):
+        deadline = body.get("deadline", self.deadline)
+        if not isinstance(deadline, (int, float)) or deadline <= 0:
+            raise RequestError(400, "deadline 은 양수여야 합니다")
+        return min(deadline, MAX_DEADLINE)
+
+    # 요청의 예비 시간표 한 페이지를 돌려주는 함수
+    # 요청: {"subjects": [과목명, ...], "constraints": {...}, "limit": 20, "cursor": 이전 응답의 next_cursor}
+    async def timetables(self, body):
+        subjects = [self.catalog.subjects[name] for name in body.get("subjects", [])]
+        constraint_args = body.get("constraints") or None
+        constraints = TimetableConstraints(**constraint_args) if constraint_args else None
+        limit = body.get("limit", DEFAULT_PAGE_SIZE)
+        if not isinstance(limit, int) or not 1 <= limit <= MAX_PAGE_SIZE:
+            raise RequestError(400, f"limit 은 1 이상 {MAX_PAGE_SIZE} 이하여야 합니다")
+        deadline = self.request_deadline(body)  # 캐시에 있는지와 상관없이 같은 요청은 같은 응답을 받도록 먼저 확인함
+        options = ("server", MAX_STORED_ROWS, "ends", constraints and constraints.key())
+        key = selection_fingerprint(subjects, options=options)
+        offset = decode_cursor(body["cursor"], key) if body.get("cursor") else 0
+
+        page = self.pages.get(key)
+        if page is None:
+            page = await self.shared(("page", key), deadline,
+                                     lambda: self.load_page(key, subjects, constraint_args))
+
+        total, groups, rows, ends = page
+        stored = ends[-1] if ends else 0
+        timetables = []
+        row = bisect_right(ends, offset)
+        while row < len(rows) and len(timetables) < limit:
+            start = ends[row - 1] if row else 0
+            row_groups = [groups[number] for number in rows[row]]
+            for k in range(offset - start, ends[row] - start):
+                timetables.append([self.catalog.lecture_ids[lecture] for lecture in timetable_variant(row_groups, k)])
+                offset += 1
+                if len(timetables) == limit:
+                    break
+            row += 1
+        return {"count": total, "stored": stored, "truncated": stored < total, "timetables": timetables,
+                "next_cursor": encode_cursor(key, offset) if offset < stored else None}
+
+    # 예비 시간표에 함께 넣을 선택 과목을 고르는 함수
+    # 요청: {"timetable": [강의 번호, ...], "electives": [선택 과목 번호, ...] (없으면 모두)}
+    async def final(self, body):
+        lecture_ids, elective_numbers = self.timetable_and_electives(body)
+        key = selection_fingerprint([], [self.catalog.lectures[i] for i in lecture_ids] + [
+            self.catalog.electives[number] for number in elective_numbers], ("final", len(lecture_ids)))
+        chosen, dropped, optimal = await self.compute(
+            key, self.request_deadline(body), solve_final, lecture_ids, elective_numbers)
+        return {"chosen": chosen, "dropped": dropped, "optimal": optimal}
+
+    # 예비 시간표와 겹쳐서 뺄 수밖에 없는 선택 과목을 구하는 함수 (충돌 인덱스로 바로 구하므로 작업 프로세스를 쓰지 않음)
+    # 요청: {"timetable": [강의 번호, ...], "electives": [선택 과목 번호, ...] (없으면 모두)}
+    async def removals(self, body):
+        lecture_ids, elective_numbers = self.timetable_and_electives(body)
+        electives = [self.catalog.electives[number] for number in elective_numbers]
+        removed = set(recommend_removals([self.catalog.lectures[i] for i in lecture_ids], electives, self.catalog.index))
+        return {"removals": [number for number, elective in zip(elective_numbers, electives) if elective in removed]}
+
+    # 요청에서 예비 시간표의 강의 번호와 선택 과목 번호를 읽는 함수
+    def timetable_and_electives(self, body):
+        lecture_ids = body.get("timetable", [])
+        elective_numbers = body.get("electives")
+        if elective_numbers is None:
+            elective_numbers = list(range(len(self.catalog.electives)))
+        for number in list(lecture_ids) + list(elective_numbers):
+            if not isinstance(number, int) or number < 0:
+                raise RequestError(400, f"잘못된 번호입니다: {number!r}")
+        return lecture_ids, elective_numbers
+
+    # 서비스 상태(진행 중인 계산, 함께 기다린 요청, 캐시 적중)를 돌려주는 함수
+    def health(self):
+        return {"status": "ok", "in_flight": len(self.in_flight), "coalesced": self.coalesced,
+                "timeouts": self.timeouts, "cache_hits": self.results.hits, "cache_misses": self.results.misses}
+
+    # 경로와 메서드에 맞는 처리 함수를 불러 (상태 코드, 응답) 을 돌려주는 함수
+    async def dispatch(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                raise RequestError(405, "GET 만 쓸 수 있습니다")
+            return 200, self.health()
+        handlers = {"/timetables": self.timetables, "/final": self.final, "/removals": self.removals}
+        if path not in handlers:
+            raise RequestError(404, f"없는 경로입니다: {path}")
+        if method != "POST":
+            raise RequestError(405, "POST 만 쓸 수 있습니다")
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(400, "요청 본문이 JSON 이 아닙니다") from None
+        if not isinstance(request, dict):
+            raise RequestError(400, "요청 본문은 JSON 객체여야 합니다")
+        try:
+            return 200, await handlers[path](request)
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            raise RequestError(400, f"잘못된 요청입니다: {error!r}") from None
+
+    # 연결 하나에서 HTTP/1.1 요청을 차례로 받아 처리하는 함수 (keep-alive 를 지원함)
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              if version == "HTTP/1.1" else headers.get("connection", "").lower() == "keep-alive")
+
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise RequestError(413, "요청 본문이 너무 큽니다")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target.split("?")[0], body)
+                except RequestError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except ValueError:
+                    status, payload, keep_alive = 400, {"error": "잘못된 Content-Length 입니다"}, False
+                except Exception as error:
+                    status, payload = 500, {"error": f"서버 오류입니다: {error!r}"}
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXTS[status]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="카탈로그를 메모리에 들고 시간표 계산을 HTTP/JSON 으로 제공하는 로컬 서비스입니다.")
+    parser.add_argument("catalog", help="카탈로그 파일 (JSON, CSV 또는 컴파일된 카탈로그, 작업 프로세스도 이 파일을 읽음)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="받을 주소 (이 컴퓨터 안의 주소만 쓸 수 있음)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="받을 포트")
+    parser.add_argument("--workers", type=int, help="작업 프로세스 수 (기본값은 CPU 수)")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE, help="요청마다 결과를 기다릴 최대 시간 (초)")
+    parser.add_argument("--cache-dir", help="작업 프로세스의 계산 결과를 저장해 둘 디렉터리")
+    args = parser.parse_args(argv)
+    try:
+        loopback = args.host == "localhost" or ipaddress.ip_address(args.host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        parser.error("서비스는 이 컴퓨터 안의 주소(127.0.0.1, ::1, localhost)에서만 받을 수 있습니다")
+
+    service = TimetableService(load_catalog(args.catalog), args.catalog, args.workers, args.deadline, args.cache_dir)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,275 @@
-import tkinter as tk
-from tkinter import messagebox, ttk
-from collections import defaultdict
-
-# 강의 정보를 담는 Lecture 클래스
-class Lecture:
-    def __init__(self, subject, professor, schedule, section=None):
-        # 강의의 속성을 초기화
-        self.subject = subject  # 과목명
-        self.professor = professor  # 교수명
-        self.schedule = schedule  # 강의 일정 (딕셔너리 형태)
-        self.section = section  # 분반 (옵션)
-
-    def __str__(self):
-        # 강의 일정을 문자열로 생성
-        schedule_str = ', '.join(
-            [f"{day}: {times[0]:02d}:{times[1]:02d}-{times[2]:02d}:{times[3]:02d}" for day, times in self.schedule.items()])
-        if self.section:
-            return f"{self.subject} ({self.section}) by {self.professor} on {schedule_str}"
-        else:
-            return f"{self.subject} by {self.professor} on {schedule_str}"
-
-# 과목 정보를 담는 Subject 클래스
-class Subject:
+import importlib
+import os
+import queue
+import sys
+import threading
+import time
+
+from timetable_engine import (
+    format_schedule, Lecture, Subject, ConflictIndex, SearchStats, create_timetable_groups,
+    count_timetable_variants, timetable_variant, TimetableVariants, expand_timetable_groups,
+    count_preliminary_timetables, estimate_preliminary_timetables, rank_preliminary_timetables, pack_electives,
+    recommend_minimum_removals, load_catalog, ResultCache, selection_fingerprint, encode_timetable_groups,
+    decode_timetable_groups, IncrementalTimetables, TimetableConstraints, iter_meetings, schedule_to_mask,
+    MINUTES_PER_DAY, measure_phase, run_profiled, day_index, WEEKDAYS)
+
+MAX_DISPLAY_ROWS = 200000  # 예비 시간표 화면에 담아 둘 최대 줄 수
+LINE_HEIGHT = 18  # 가상 목록에서 글자 한 줄의 높이 (픽셀)
+ROW_BUFFER = 10  # 가상 목록에서 화면 밖에 미리 만들어 둘 줄 수
+POLL_INTERVAL_MS = 50  # 작업 스레드의 결과를 확인하는 간격 (밀리초)
+BATCH_INTERVAL = 0.1  # 작업 스레드가 찾은 결과를 모아서 보내는 간격 (초)
+EDIT_WAIT_SECONDS = 2.0  # 강의를 고치기 전에 취소된 계산이 끝나기를 기다릴 최대 시간 (초)
+GRID_HOUR_HEIGHT = 40  # 주간 시간표에서 한 시간의 높이 (픽셀)
+GRID_DAY_WIDTH = 110  # 주간 시간표에서 요일 한 칸의 너비 (픽셀)
+GRID_TIME_WIDTH = 50  # 주간 시간표 왼쪽 시각 칸의 너비 (픽셀)
+GRID_HEADER_HEIGHT = 24  # 주간 시간표 위쪽 요일 칸의 높이 (픽셀)
+GRID_HOURS = (9, 18)  # 주간 시간표에 늘 보여줄 시간대 (수업이 그 밖에 있으면 넓힘)
+GRID_COLORS = ["#ffd8a8", "#c3fae8", "#d0bfff", "#ffc9c9", "#a5d8ff", "#d8f5a2", "#fcc2d7", "#ffec99"]  # 과목별 색
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.ttc")  # 있으면 초기 데이터 대신 여는 컴파일된 카탈로그
+
+STARTUP_CHECK_OPTION = "--startup-check"  # 메인 화면을 그리자마자 끝내는 옵션 (시작 시간을 잴 때 씀)
+
+# 처음 쓸 때 모듈을 import 하는 대리 객체 (이 파일을 import 만 하고 화면을 띄우지 않으면 tkinter 를 읽지 않음)
+class LazyModule:
     def __init__(self, name):
         self.name = name
-        self.lectures = []  # 강의 리스트 초기화
-
-    def add_lecture(self, lecture):
-        self.lectures.append(lecture)  # 강의 추가
-
-    def remove_lecture(self, lecture):
-        self.lectures.remove(lecture)  # 강의 삭제
-
-    def __str__(self):
-        return f"{self.name}: {len(self.lectures)} 강의"
-
-# 강의 시간 충돌을 확인하는 함수
-def check_conflict(lecture1, lecture2):
-    for day, times1 in lecture1.schedule.items():
-        if day in lecture2.schedule:
-            times2 = lecture2.schedule[day]
-            start1 = times1[0] * 60 + times1[1]
-            end1 = times1[2] * 60 + times1[3]
-            start2 = times2[0] * 60 + times2[1]
-            end2 = times2[2] * 60 + times2[3]
-            if not (end1 <= start2 or end2 <= start1):
-                return True  # 시간 충돌 발생
-    return False  # 시간 충돌 없음
-
-# 예비 시간표를 생성하는 함수
-def create_preliminary_timetables(subjects):
-    from itertools import product
-    all_lectures = [subject.lectures for subject in subjects]
-    all_combinations = list(product(*all_lectures))
-    valid_timetables = []
-
-    for combination in all_combinations:
-        timetable = []
-        conflict = False
-        subject_sections = {}
-
-        for lecture in combination:
-            if any(check_conflict(lecture, existing) for existing in timetable):
-                conflict = True
-                break
-
-            if lecture.subject in subject_sections:
-                if subject_sections[lecture.subject] != lecture.section:
-                    conflict = True
-                    break
+        self.module = None
+
+    def __getattr__(self, attribute):
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attribute)
+
+tk = LazyModule("tkinter")
+messagebox = LazyModule("tkinter.messagebox")  # 오류, 안내 창을 처음 띄울 때 읽음
+ttk = LazyModule("tkinter.ttk")  # 진행 막대를 처음 보여줄 때 읽음
+
+# 보이는 줄만 그리는 가상 목록 클래스 (결과가 많아도 캔버스 항목 수와 문자열 변환 횟수가 일정함)
+class VirtualList:
+    def __init__(self, parent, rows, format_row, headers, column_widths, lines_per_row, on_select=None, stats=None):
+        self.rows = rows  # 길이와 인덱스 접근을 지원하는 결과 목록
+        self.format_row = format_row  # (줄 번호, 결과) -> 칸별 문자열 리스트
+        self.stats = stats  # 있으면 문자열 변환(format)과 캔버스 갱신(render) 시간을 더할 SearchStats
+        self.column_widths = column_widths  # 칸별 너비 (픽셀)
+        self.row_height = lines_per_row * LINE_HEIGHT + 6
+        self.on_select = on_select
+        self.offset = 0  # 목록 맨 위에서부터 내려간 거리 (픽셀)
+        self.selected = None  # 선택된 줄 번호
+        self.items = []  # 줄마다 재사용하는 (배경 사각형, 칸별 글자) 캔버스 항목
+        self.texts = {}  # 화면 근처 줄의 문자열 (그 밖의 줄은 버림)
+
+        self.frame = tk.Frame(parent)
+        header_frame = tk.Frame(self.frame)
+        header_frame.pack(fill="x")
+        for header, width in zip(headers, column_widths):
+            label = tk.Label(header_frame, text=header, borderwidth=1, relief="solid", anchor="w", width=max(1, width // 8))
+            label.pack(side="left")
+
+        body_frame = tk.Frame(self.frame)
+        body_frame.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(body_frame, background="white", highlightthickness=0)
+        self.scroll_y = tk.Scrollbar(body_frame, orient="vertical", command=self.yview)
+        self.scroll_x = tk.Scrollbar(self.frame, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self.scroll_x.set)
+        self.scroll_y.pack(fill="y", side="right")
+        self.canvas.pack(fill="both", expand=True, side="left")
+        self.scroll_x.pack(fill="x")
+
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<Button-1>", self.click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.yview("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+        self.canvas.bind("<Up>", lambda event: self.move_selection(-1))
+        self.canvas.bind("<Down>", lambda event: self.move_selection(1))
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    # 목록 전체 높이 (픽셀)
+    def total_height(self):
+        return max(1, len(self.rows) * self.row_height)
+
+    # 스크롤바의 moveto / scroll 명령을 처리하는 함수
+    def yview(self, *args):
+        height = self.canvas.winfo_height()
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total_height())
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.offset += amount * (height if args[2] == "pages" else self.row_height)
+        self.offset = max(0, min(self.offset, self.total_height() - height))
+        self.redraw()
+
+    # 결과가 늘어났을 때 스크롤바와 화면을 갱신하는 함수
+    def refresh(self):
+        self.redraw()
+
+    # 보이는 줄(과 앞뒤 여유 줄)만 문자열로 만들어 캔버스 항목에 채우는 함수
+    def redraw(self):
+        height = self.canvas.winfo_height()
+        first = max(0, self.offset // self.row_height - ROW_BUFFER)
+        last = min(len(self.rows), (self.offset + height) // self.row_height + 1 + ROW_BUFFER)
+
+        texts = {}
+        with measure_phase(self.stats, "format"):
+            for row in range(first, last):
+                texts[row] = self.texts[row] if row in self.texts else self.format_row(row, self.rows[row])
+        self.texts = texts
+
+        with measure_phase(self.stats, "render"):
+            self.draw_rows(first, last, height)
+
+    # first 부터 last 앞까지의 줄을 캔버스 항목에 채우고 스크롤바를 맞추는 함수
+    def draw_rows(self, first, last, height):
+        texts = self.texts
+        while len(self.items) < last - first:
+            rectangle = self.canvas.create_rectangle(0, 0, 0, 0, outline="gray")
+            labels = [self.canvas.create_text(0, 0, anchor="nw") for _ in self.column_widths]
+            self.items.append((rectangle, labels))
+
+        width = sum(self.column_widths)
+        for slot, (rectangle, labels) in enumerate(self.items):
+            row = first + slot
+            if row >= last:
+                self.canvas.itemconfigure(rectangle, state="hidden")
+                for label in labels:
+                    self.canvas.itemconfigure(label, state="hidden")
+                continue
+            top = row * self.row_height - self.offset
+            fill = "lightblue" if row == self.selected else "white"
+            self.canvas.coords(rectangle, 0, top, width, top + self.row_height)
+            self.canvas.itemconfigure(rectangle, state="normal", fill=fill)
+            x = 0
+            for label, column_width, text in zip(labels, self.column_widths, texts[row]):
+                self.canvas.coords(label, x + 4, top + 3)
+                self.canvas.itemconfigure(label, state="normal", text=text)
+                x += column_width
+
+        text_width = width
+        bbox = self.canvas.bbox("all")
+        if bbox:
+            text_width = max(width, bbox[2])
+        self.canvas.configure(scrollregion=(0, 0, text_width, height))
+        total = self.total_height()
+        self.scroll_y.set(self.offset / total, min(1.0, (self.offset + height) / total))
+
+    # 클릭한 줄을 선택하는 함수 (이후 위, 아래 화살표로 선택을 옮길 수 있게 캔버스에 포커스를 줌)
+    def click(self, event):
+        self.canvas.focus_set()
+        row = (event.y + self.offset) // self.row_height
+        if 0 <= row < len(self.rows):
+            self.select(row)
+
+    # 줄을 선택하고 화면 밖이면 보이도록 스크롤하는 함수
+    def select(self, row):
+        self.selected = row
+        height = self.canvas.winfo_height()
+        top = row * self.row_height
+        if top < self.offset:
+            self.offset = top
+        elif top + self.row_height > self.offset + height:
+            self.offset = max(0, top + self.row_height - height)
+        self.redraw()
+        if self.on_select is not None:
+            self.on_select(row)
+
+    # 선택을 step 줄만큼 옮기는 함수 (화살표 키)
+    def move_selection(self, step):
+        if not len(self.rows):
+            return
+        row = 0 if self.selected is None else min(max(self.selected + step, 0), len(self.rows) - 1)
+        if row != self.selected:
+            self.select(row)
+
+# 한 주의 시간표를 캔버스 하나에 분 단위 위치의 사각형으로 그리는 클래스
+# (시간표를 바꿔도 만들어 둔 사각형과 글자를 옮기고 내용만 바꿔 쓰므로 여러 시간표를 빠르게 넘겨 볼 수 있음)
+class WeekGrid:
+    def __init__(self, parent, height=GRID_HEADER_HEIGHT + GRID_HOUR_HEIGHT * 10):
+        self.frame = tk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, background="white", highlightthickness=0, height=height)
+        self.scroll_y = tk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scroll_y.set)
+        self.scroll_y.pack(fill="y", side="right")
+        self.canvas.pack(fill="both", expand=True, side="left")
+        self.layout = None  # 배경을 그린 (요일 목록, 시작 시, 끝 시)
+        self.blocks = []  # 수업마다 재사용하는 (사각형, 글자) 캔버스 항목
+        self.colors = {}  # 과목명 -> 색
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    # 요일 칸, 시각 줄 등 배경을 그리는 함수 (보여줄 요일이나 시간대가 바뀔 때만 다시 그림)
+    def draw_background(self, days, first_hour, last_hour):
+        self.canvas.delete("background")
+        width = GRID_TIME_WIDTH + GRID_DAY_WIDTH * len(days)
+        height = GRID_HEADER_HEIGHT + GRID_HOUR_HEIGHT * (last_hour - first_hour)
+        for hour in range(first_hour, last_hour + 1):
+            y = GRID_HEADER_HEIGHT + GRID_HOUR_HEIGHT * (hour - first_hour)
+            self.canvas.create_line(0, y, width, y, fill="lightgray", tags="background")
+            if hour < last_hour:
+                self.canvas.create_text(GRID_TIME_WIDTH - 4, y + 2, text=f"{hour:02d}:00", anchor="ne", tags="background")
+        for column, day in enumerate(days):
+            x = GRID_TIME_WIDTH + GRID_DAY_WIDTH * column
+            self.canvas.create_line(x, 0, x, height, fill="gray", tags="background")
+            self.canvas.create_text(x + GRID_DAY_WIDTH // 2, GRID_HEADER_HEIGHT // 2, text=day, tags="background")
+        self.canvas.create_line(width, 0, width, height, fill="gray", tags="background")
+        self.canvas.tag_lower("background")
+        self.canvas.configure(scrollregion=(0, 0, width, height), width=width)
+        self.layout = (days, first_hour, last_hour)
+
+    # 시간표를 그리는 함수 (같은 요일에 시간이 겹치는 수업은 칸을 나눠서 나란히 그림)
+    def show(self, timetable):
+        meetings = []
+        for lecture in timetable:
+            for day, (start_hour, start_minute, end_hour, end_minute) in iter_meetings(lecture.schedule):
+                meetings.append((day, start_hour * 60 + start_minute, end_hour * 60 + end_minute, lecture))
+
+        # 평일 다음에 주말과 그 밖의 요일(소문자, 한글 등 엔진이 따로 자리를 준 요일)을 엔진의 요일 순서대로 붙임
+        used_days = {meeting[0] for meeting in meetings}
+        days = WEEKDAYS + sorted((day for day in used_days if day not in WEEKDAYS), key=day_index)
+        columns = {day: column for column, day in enumerate(days)}
+        first_hour = min([GRID_HOURS[0]] + [start // 60 for _, start, _, _ in meetings])
+        last_hour = max([GRID_HOURS[1]] + [-(-end // 60) for _, _, end, _ in meetings])
+        if self.layout != (days, first_hour, last_hour):
+            self.draw_background(days, first_hour, last_hour)
+
+        # 요일마다 시작 시각 순으로 겹치지 않는 줄(lane)을 나눠 줌
+        meetings.sort(key=lambda meeting: (day_index(meeting[0]), meeting[1], meeting[2]))
+        lanes = []
+        lane_counts = {}
+        lane_ends = {}
+        for day, start, end, _ in meetings:
+            ends = lane_ends.setdefault(day, [])
+            lane = next((i for i, lane_end in enumerate(ends) if lane_end <= start), len(ends))
+            if lane == len(ends):
+                ends.append(end)
             else:
-                subject_sections[lecture.subject] = lecture.section
-
-            timetable.append(lecture)
-
-        if not conflict:
-            valid_timetables.append(timetable)
-
-    return valid_timetables
-
-# 시간표를 정렬하는 함수
-def sort_timetable(timetable):
-    days_order = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    timetable.sort(
-        key=lambda lec: (days_order.index(list(lec.schedule.keys())[0]),
-                         list(lec.schedule.values())[0][0] * 60 + list(lec.schedule.values())[0][1]))
-    return timetable
-
-# 삭제할 과목을 추천하는 함수
-def recommend_removals(preliminary_timetable, elective_lectures):
-    conflicts = []
-    for elective in elective_lectures:
-        for lecture in preliminary_timetable:
-            if check_conflict(elective, lecture):
-                conflicts.append(elective)
-                break
-    return conflicts
+                ends[lane] = end
+            lanes.append(lane)
+            lane_counts[day] = len(ends)
+
+        while len(self.blocks) < len(meetings):
+            rectangle = self.canvas.create_rectangle(0, 0, 0, 0, outline="gray")
+            text = self.canvas.create_text(0, 0, anchor="nw", font=("Arial", 9))
+            self.blocks.append((rectangle, text))
+
+        for slot, (rectangle, text) in enumerate(self.blocks):
+            if slot >= len(meetings):
+                self.canvas.itemconfigure(rectangle, state="hidden")
+                self.canvas.itemconfigure(text, state="hidden")
+                continue
+            day, start, end, lecture = meetings[slot]
+            lane_width = GRID_DAY_WIDTH / lane_counts[day]
+            left = GRID_TIME_WIDTH + GRID_DAY_WIDTH * columns[day] + lane_width * lanes[slot]
+            top = GRID_HEADER_HEIGHT + (start - first_hour * 60) * GRID_HOUR_HEIGHT / 60
+            bottom = GRID_HEADER_HEIGHT + (end - first_hour * 60) * GRID_HOUR_HEIGHT / 60
+            color = self.colors.setdefault(lecture.subject, GRID_COLORS[len(self.colors) % len(GRID_COLORS)])
+            label = "\n".join(part for part in (lecture.subject, lecture.section, lecture.professor) if part)
+            self.canvas.coords(rectangle, left + 1, top + 1, left + lane_width - 1, bottom - 1)
+            self.canvas.itemconfigure(rectangle, state="normal", fill=color)
+            self.canvas.coords(text, left + 3, top + 2)
+            self.canvas.itemconfigure(text, state="normal", text=label, width=max(1, int(lane_width) - 6))
 
 # 시간표 생성 앱 클래스
 class TimetableApp:
@@ -106,18 +280,137 @@ class TimetableApp:
         self.mandatory_subjects = []  # 필수 과목 리스트
         self.electives = []  # 선택 과목 리스트
         self.selected_timetable = []  # 선택된 시간표
+        self.preferred_professors = ""  # 추천 시간표에서 우선할 교수 (쉼표로 구분)
+        self.background_stats = None  # 작업 스레드에서 실행 중인 계산의 진행 상황
+        self.catalog_lock = threading.Lock()  # 작업 스레드의 계산과 강의 추가, 삭제가 겹치지 않게 하는 잠금
+        self.constraints = None  # 시간표 조건 (TimetableConstraints, 없으면 None)
+        self.constraint_texts = {}  # 조건 입력 화면에 다시 보여줄 입력값
+        self.result_cache = ResultCache()  # 예비 시간표 결과 캐시 (강의가 바뀌면 키가 달라져 다시 계산)
+        self.last_stats = None  # 마지막으로 실행한 계산의 측정값 (진단 정보 화면에서 보여줌)
+        self.profile_enabled = False  # 계산을 cProfile 로 잴지 여부
+        self.trace_memory_enabled = False  # 계산의 최대 메모리를 tracemalloc 으로 잴지 여부
+        self.conflict_index = None  # 강의 충돌 인덱스 (카탈로그를 읽으면서 만듦)
+        self.incremental_timetables = None  # 마지막 예비 시간표 결과 (강의를 추가, 삭제한 뒤에는 바뀐 부분만 다시 계산)
+        self.catalog_thread = None  # 카탈로그를 읽는 작업 스레드
+        self.catalog_error = None  # 카탈로그를 읽다가 난 오류
 
         self.main_frame = tk.Frame(root)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.initialize_subjects()  # 초기 과목 데이터를 설정하는 메서드 호출
         self.create_main_screen()
+        # 메인 화면을 먼저 띄우고, 카탈로그는 그 뒤에 작업 스레드에서 읽음 (과목 화면을 열 때 아직 읽는 중이면 기다림)
+        self.root.after_idle(self.start_loading_catalog)
 
-    # 프레임을 초기화하는 함수
+    # 프레임을 초기화하는 함수 (다른 화면으로 넘어가면 실행 중인 계산도 취소)
     def clear_frame(self, frame):
+        self.cancel_background_task()
         for widget in frame.winfo_children():
             widget.destroy()
 
+    # 작업 스레드에서 실행 중인 계산을 취소하는 함수
+    def cancel_background_task(self):
+        if self.background_stats is not None:
+            self.background_stats.cancel()
+            self.background_stats = None
+
+    # 계산을 작업 스레드에서 실행하고, 보내온 메시지를 root.after 로 주기적으로 받아 처리하는 함수
+    # (계산 시간은 "solve" 단계로 재고, 진단 정보 화면에서 켠 cProfile, tracemalloc 도 함께 씀)
+    def run_in_background(self, task, handle_message, show_progress=None):
+        self.cancel_background_task()
+        stats = SearchStats()
+        self.background_stats = stats
+        self.last_stats = stats
+        messages = queue.Queue()
+        profile, trace_memory = self.profile_enabled, self.trace_memory_enabled
+
+        def measured_task():
+            with stats.phase("solve"):
+                task(stats, messages.put)
+
+        def worker():
+            try:
+                with self.catalog_lock:
+                    run_profiled(measured_task, stats, profile, trace_memory)
+            except Exception as error:
+                messages.put(("error", str(error)))
+            messages.put(("done",))
+
+        def poll():
+            if self.background_stats is not stats:
+                return
+            try:
+                while True:
+                    message = messages.get_nowait()
+                    handle_message(message)
+                    if message[0] == "done":
+                        if self.background_stats is stats:
+                            self.background_stats = None
+                        break
+            except queue.Empty:
+                pass
+            if show_progress is not None:
+                show_progress(stats)
+            if self.background_stats is stats:
+                self.root.after(POLL_INTERVAL_MS, poll)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(POLL_INTERVAL_MS, poll)
+        return stats
+
+    # 강의를 고치기 전에 계산을 취소하고 작업 스레드가 끝나기를 기다리는 함수 (끝나지 않으면 오류를 보여주고 False)
+    # (작업 스레드는 강의 목록을 읽고 충돌 인덱스에 강의를 늦게 넣기도 하므로, 고치는 동안에는 잠금을 잡고 있어야 함)
+    def lock_catalog(self):
+        self.cancel_background_task()
+        if self.catalog_lock.acquire(timeout=EDIT_WAIT_SECONDS):
+            return True
+        messagebox.showerror("오류", "이전 계산이 아직 끝나지 않았습니다. 잠시 뒤 다시 시도해주세요.")
+        return False
+
+    # 카탈로그를 읽고 충돌 인덱스를 만드는 함수 (작업 스레드에서 실행되므로 화면은 건드리지 않음)
+    def load_subjects(self):
+        try:
+            if os.path.exists(CATALOG_PATH):
+                self.load_compiled_subjects(CATALOG_PATH)  # 컴파일된 카탈로그가 있으면 그대로 읽음
+            else:
+                self.initialize_subjects()  # 초기 과목 데이터를 설정하는 메서드 호출
+                self.conflict_index = ConflictIndex(self.all_lectures())
+            self.incremental_timetables = IncrementalTimetables(self.conflict_index, MAX_DISPLAY_ROWS)
+        except Exception as error:
+            self.catalog_error = error
+
+    # 카탈로그를 작업 스레드에서 읽기 시작하는 함수 (이미 시작했으면 아무것도 하지 않음)
+    def start_loading_catalog(self):
+        if self.catalog_thread is None:
+            self.catalog_thread = threading.Thread(target=self.load_subjects, daemon=True)
+            self.catalog_thread.start()
+
+    # 카탈로그를 다 읽은 뒤 screen 을 여는 함수 (아직 읽는 중이면 안내 문구를 보여주고 기다림)
+    def open_with_catalog(self, screen):
+        self.start_loading_catalog()
+        if self.catalog_thread.is_alive():
+            self.clear_frame(self.main_frame)
+            label = tk.Label(self.main_frame, text="과목 정보를 읽는 중입니다...", font=("Arial", 14))
+            label.pack(pady=20)
+            self.root.after(POLL_INTERVAL_MS, lambda: self.open_with_catalog(screen))
+        elif self.catalog_error is not None:
+            messagebox.showerror("오류", f"과목 정보를 읽지 못했습니다: {self.catalog_error}")
+            self.create_main_screen()
+        else:
+            screen()
+
+    # 필수 과목과 선택 과목의 모든 강의를 돌려주는 함수
+    def all_lectures(self):
+        lectures = [lecture for subject in self.mandatory_subjects for lecture in subject.lectures]
+        return lectures + self.electives
+
+    # 컴파일된 카탈로그에서 과목과 충돌 인덱스를 읽는 함수
+    # (큰 카탈로그는 충돌 인덱스 없이 저장되므로 빈 인덱스에서 시작해 쓰이는 강의만 추가됨)
+    def load_compiled_subjects(self, path):
+        catalog = load_catalog(path)
+        self.mandatory_subjects = list(catalog.subjects.values())
+        self.electives = catalog.electives
+        self.conflict_index = catalog.index if catalog.index is not None else ConflictIndex()
+
     # 초기 과목 데이터를 설정하는 함수
     def initialize_subjects(self):
         # 비판적사고와표현 과목 초기 데이터
@@ -168,8 +461,9 @@ class TimetableApp:
         title_label.pack(pady=20)
 
         buttons = [
-            ("필수 과목 관리", self.create_mandatory_subject_screen),
-            ("교양 과목 관리", self.create_elective_subject_screen),
+            ("필수 과목 관리", lambda: self.open_with_catalog(self.create_mandatory_subject_screen)),
+            ("교양 과목 관리", lambda: self.open_with_catalog(self.create_elective_subject_screen)),
+            ("진단 정보 보기", self.create_diagnostics_screen),
             ("종료", self.root.quit)
         ]
 
@@ -177,6 +471,63 @@ class TimetableApp:
             button = tk.Button(self.main_frame, text=text, command=command, font=("Arial", 14))
             button.pack(pady=10, padx=20, fill="x")
 
+    # 마지막 계산의 측정값(탐색 수, 잘라낸 가지 수, 단계별 시간, 프로파일)을 보여주는 화면을 생성하는 함수
+    def create_diagnostics_screen(self):
+        self.clear_frame(self.main_frame)
+
+        label = tk.Label(self.main_frame, text="진단 정보", font=("Arial", 18))
+        label.pack(pady=20)
+
+        option_frame = tk.Frame(self.main_frame)
+        option_frame.pack(pady=5)
+        profile_var = tk.BooleanVar(value=self.profile_enabled)
+        trace_memory_var = tk.BooleanVar(value=self.trace_memory_enabled)
+
+        def save_options():
+            self.profile_enabled = profile_var.get()
+            self.trace_memory_enabled = trace_memory_var.get()
+
+        profile_check = tk.Checkbutton(option_frame, text="cProfile 로 계산 재기", variable=profile_var, command=save_options)
+        profile_check.pack(side="left", padx=10)
+        memory_check = tk.Checkbutton(option_frame, text="tracemalloc 으로 최대 메모리 재기", variable=trace_memory_var,
+                                      command=save_options)
+        memory_check.pack(side="left", padx=10)
+
+        stats = self.last_stats
+        if stats is None:
+            summary = "아직 실행한 계산이 없습니다."
+        else:
+            lines = [f"탐색한 경우의 수: {stats.explored}", f"찾은 시간 구성 수: {stats.valid_groups}",
+                     f"잘라낸 가지 수: {stats.pruned}", f"충돌 확인 횟수: {stats.conflict_checks}"]
+            lines += [f"{name} 단계: {seconds * 1000:.1f} ms" for name, seconds in stats.phase_seconds.items()]
+            if stats.peak_memory is not None:
+                lines.append(f"최대 메모리: {stats.peak_memory / 1024:.1f} KiB")
+            if stats.cancelled:
+                lines.append("(취소된 계산입니다)")
+            summary = "\n".join(lines)
+        summary_label = tk.Label(self.main_frame, text=summary, font=("Arial", 12), justify="left")
+        summary_label.pack(pady=10)
+
+        bottom_frame = tk.Frame(self.main_frame)
+        bottom_frame.pack(side="bottom")
+
+        if stats is not None and stats.profile is not None:
+            text_frame = tk.Frame(self.main_frame)
+            text_frame.pack(fill="both", expand=True, padx=10)
+            profile_text = tk.Text(text_frame, wrap="none", height=20)
+            scroll_y = tk.Scrollbar(text_frame, orient="vertical", command=profile_text.yview)
+            profile_text.configure(yscrollcommand=scroll_y.set)
+            scroll_y.pack(fill="y", side="right")
+            profile_text.pack(fill="both", expand=True, side="left")
+            profile_text.insert("1.0", stats.profile)
+            profile_text.config(state="disabled")
+
+        refresh_button = tk.Button(bottom_frame, text="새로고침", command=self.create_diagnostics_screen, font=("Arial", 14))
+        refresh_button.pack(pady=10)
+
+        back_button = tk.Button(bottom_frame, text="뒤로가기", command=self.create_main_screen, font=("Arial", 14))
+        back_button.pack(pady=20)
+
     # 필수 과목 관리 화면을 생성하는 함수
     def create_mandatory_subject_screen(self):
         self.clear_frame(self.main_frame)
@@ -189,6 +540,8 @@ class TimetableApp:
             ("필수 과목 추가하기", self.add_mandatory_subject),
             ("필수 과목 삭제하기", self.delete_mandatory_subject),
             ("예비 시간표 생성하기", self.create_preliminary_timetable),
+            ("추천 시간표 보기", self.create_ranked_timetable),
+            ("시간표 조건 설정하기", self.create_constraint_screen),
             ("뒤로가기", self.create_main_screen)
         ]
 
@@ -208,6 +561,7 @@ class TimetableApp:
             ("선택 과목 추가하기", self.add_elective_subject),
             ("선택 과목 삭제하기", self.delete_elective_subject),
             ("시간표 생성하기", self.create_final_timetable),
+            ("최소 삭제 추천 받기", self.create_removal_recommendation),
             ("뒤로가기", self.create_main_screen)
         ]
 
@@ -241,7 +595,7 @@ class TimetableApp:
                 label.grid(row=row, column=1)
                 label = tk.Label(table_frame, text=lecture.professor, borderwidth=1, relief="solid", width=18)
                 label.grid(row=row, column=2)
-                label = tk.Label(table_frame, text=", ".join([f"{day}: {start:02d}:{start_m:02d}-{end:02d}:{end_m:02d}" for day, (start, start_m, end, end_m) in lecture.schedule.items()]), borderwidth=1, relief="solid", width=40)
+                label = tk.Label(table_frame, text=format_schedule(lecture.schedule), borderwidth=1, relief="solid", width=40)
                 label.grid(row=row, column=3)
                 row += 1
 
@@ -292,7 +646,7 @@ class TimetableApp:
             label.grid(row=row, column=1)
             label = tk.Label(table_frame, text=lecture.professor, borderwidth=1, relief="solid", width=18)
             label.grid(row=row, column=2)
-            label = tk.Label(table_frame, text=", ".join([f"{day}: {start:02d}:{start_m:02d}-{end:02d}:{end_m:02d}" for day, (start, start_m, end, end_m) in lecture.schedule.items()]), borderwidth=1, relief="solid", width=40)
+            label = tk.Label(table_frame, text=format_schedule(lecture.schedule), borderwidth=1, relief="solid", width=40)
             label.grid(row=row, column=3)
 
         back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_elective_subject_screen, font=("Arial", 14))
@@ -338,8 +692,16 @@ class TimetableApp:
         try:
             start_hour, start_minute = map(int, start.split(":"))
             end_hour, end_minute = map(int, end.split(":"))
-            self.schedule[day] = (start_hour, start_minute, end_hour, end_minute)
-            messagebox.showinfo("성공", f"{day} {start}-{end} 추가됨.")
+            if not 0 <= start_hour * 60 + start_minute < end_hour * 60 + end_minute <= MINUTES_PER_DAY:
+                messagebox.showerror("오류", "종료시간은 시작시간보다 늦어야 합니다. (00:00-24:00)")
+            else:
+                interval = (start_hour, start_minute, end_hour, end_minute)
+                # 같은 요일에 수업을 여러 번 넣을 수 있지만, 이미 넣은 시간과 겹치면 받지 않음
+                if schedule_to_mask({day: interval}) & schedule_to_mask(self.schedule):
+                    messagebox.showerror("오류", f"{day} {start}-{end} 는 이미 추가한 시간과 겹칩니다.")
+                else:
+                    self.schedule.setdefault(day, []).append(interval)
+                    messagebox.showinfo("성공", f"{day} {start}-{end} 추가됨.")
         except ValueError:
             messagebox.showerror("오류", "시간 형식이 올바르지 않습니다. (e.g., 09:00)")
 
@@ -357,12 +719,18 @@ class TimetableApp:
             messagebox.showerror("오류", "모든 필드를 입력해주세요.")
             return
 
-        lecture = Lecture(subject_name, professor, self.schedule, section)
-        subject = next((sub for sub in self.mandatory_subjects if sub.name == subject_name), None)
-        if subject is None:
-            subject = Subject(subject_name)
-            self.mandatory_subjects.append(subject)
-        subject.add_lecture(lecture)
+        if not self.lock_catalog():
+            return
+        try:
+            lecture = Lecture(subject_name, professor, self.schedule, section)
+            subject = next((sub for sub in self.mandatory_subjects if sub.name == subject_name), None)
+            if subject is None:
+                subject = Subject(subject_name)
+                self.mandatory_subjects.append(subject)
+            subject.add_lecture(lecture)
+            self.conflict_index.add(lecture)
+        finally:
+            self.catalog_lock.release()
 
         messagebox.showinfo("성공", "필수 과목이 추가되었습니다.")
         self.create_mandatory_subject_screen()
@@ -396,7 +764,7 @@ class TimetableApp:
                 label.grid(row=row, column=2)
                 label = tk.Label(table_frame, text=lecture.professor, borderwidth=1, relief="solid", width=22)
                 label.grid(row=row, column=3)
-                label = tk.Label(table_frame, text=", ".join([f"{day}: {start:02d}:{start_m:02d}-{end:02d}:{end_m:02d}" for day, (start, start_m, end, end_m) in lecture.schedule.items()]), borderwidth=1, relief="solid", width=30)
+                label = tk.Label(table_frame, text=format_schedule(lecture.schedule), borderwidth=1, relief="solid", width=30)
                 label.grid(row=row, column=4)
                 row += 1
                 index += 1
@@ -415,16 +783,96 @@ class TimetableApp:
         try:
             index = int(self.delete_index_entry.get())
             if index in self.lecture_map:
-                subject, lecture = self.lecture_map[index]
-                subject.remove_lecture(lecture)
-                if not subject.lectures:
-                    self.mandatory_subjects.remove(subject)
+                if not self.lock_catalog():
+                    return
+                try:
+                    subject, lecture = self.lecture_map[index]
+                    subject.remove_lecture(lecture)
+                    self.conflict_index.remove(lecture)
+                    if not subject.lectures:
+                        self.mandatory_subjects.remove(subject)
+                finally:
+                    self.catalog_lock.release()
                 messagebox.showinfo("성공", "필수 과목이 삭제되었습니다.")
             else:
                 messagebox.showerror("오류", "유효하지 않은 인덱스입니다.")
         except ValueError:
             messagebox.showerror("오류", "인덱스는 숫자여야 합니다.")
 
+    # 시간표 조건(막을 시간, 공강 요일, 연속 수업, 종료 시각, 교수)을 설정하는 화면을 생성하는 함수
+    def create_constraint_screen(self):
+        self.clear_frame(self.main_frame)
+
+        label = tk.Label(self.main_frame, text="시간표 조건 설정하기", font=("Arial", 18))
+        label.pack(pady=20)
+
+        form_frame = tk.Frame(self.main_frame)
+        form_frame.pack()
+
+        labels = ["막을 시간 (e.g., Mon 18:00-22:00, Wed 18:00-22:00)", "비울 요일 (e.g., Fri)", "최소 공강 요일 수",
+                  "최대 연속 수업 시간 (시간)", "가장 늦은 종료 시각 (e.g., 18:00)", "허용 교수 (쉼표로 구분)",
+                  "제외 교수 (쉼표로 구분)"]
+        self.entries = {}
+
+        for i, text in enumerate(labels):
+            label = tk.Label(form_frame, text=text, width=45, anchor="w")
+            label.grid(row=i, column=0, padx=10, pady=5)
+            entry = tk.Entry(form_frame, width=40)
+            entry.insert(0, self.constraint_texts.get(text, ""))
+            entry.grid(row=i, column=1, padx=10, pady=5)
+            self.entries[text] = entry
+
+        save_button = tk.Button(self.main_frame, text="조건 저장하기", command=self.save_constraints, font=("Arial", 14))
+        save_button.pack(pady=10)
+
+        clear_button = tk.Button(self.main_frame, text="조건 지우기", command=self.clear_constraints, font=("Arial", 14))
+        clear_button.pack(pady=10)
+
+        back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_mandatory_subject_screen, font=("Arial", 14))
+        back_button.pack(pady=20)
+
+    # 입력한 시간표 조건을 확인하고 저장하는 함수
+    def save_constraints(self):
+        texts = {text: entry.get().strip() for text, entry in self.entries.items()}
+        blocked_text, free_text, free_count_text, consecutive_text, latest_text, allowed_text, forbidden_text = texts.values()
+
+        def parse_time(text):
+            hour, minute = map(int, text.split(":"))
+            if not 0 <= hour * 60 + minute <= MINUTES_PER_DAY:
+                raise ValueError(text)
+            return hour, minute
+
+        try:
+            blocked_times = {}
+            for window in filter(None, [part.strip() for part in blocked_text.split(",")]):
+                day, times = window.split()
+                start, end = times.split("-")
+                start_hour, start_minute = parse_time(start)
+                end_hour, end_minute = parse_time(end)
+                blocked_times.setdefault(day, []).append((start_hour, start_minute, end_hour, end_minute))
+            free_days = [day.strip() for day in free_text.split(",") if day.strip()]
+            min_free_days = int(free_count_text) if free_count_text else 0
+            max_consecutive = round(float(consecutive_text) * 60) if consecutive_text else None
+            latest_end = parse_time(latest_text) if latest_text else None
+        except ValueError:
+            messagebox.showerror("오류", "조건 형식이 올바르지 않습니다. (e.g., Mon 18:00-22:00, 18:00, 숫자)")
+            return
+
+        allowed = [name.strip() for name in allowed_text.split(",") if name.strip()]
+        forbidden = [name.strip() for name in forbidden_text.split(",") if name.strip()]
+        self.constraints = TimetableConstraints(
+            blocked_times, free_days, min_free_days, max_consecutive, latest_end, allowed or None, forbidden)
+        self.constraint_texts = texts
+        messagebox.showinfo("성공", "시간표 조건이 저장되었습니다.")
+        self.create_mandatory_subject_screen()
+
+    # 시간표 조건을 모두 지우는 함수
+    def clear_constraints(self):
+        self.constraints = None
+        self.constraint_texts = {}
+        messagebox.showinfo("성공", "시간표 조건을 지웠습니다.")
+        self.create_constraint_screen()
+
     # 예비 시간표를 생성하는 화면을 생성하는 함수
     def create_preliminary_timetable(self):
         self.clear_frame(self.main_frame)
@@ -432,25 +880,241 @@ class TimetableApp:
         label = tk.Label(self.main_frame, text="예비 시간표 생성하기", font=("Arial", 18))
         label.pack(pady=20)
 
-        preliminary_timetables = create_preliminary_timetables(self.mandatory_subjects)
-        self.timetable_map = {}
+        count_label = tk.Label(self.main_frame, text="가능한 시간표 수를 계산하는 중입니다...", font=("Arial", 12))
+        count_label.pack(pady=5)
+
+        progress_frame = tk.Frame(self.main_frame)
+        progress_frame.pack(pady=5)
+        progress_bar = ttk.Progressbar(progress_frame, mode="indeterminate", length=300)
+        progress_bar.pack(side="left", padx=10)
+        progress_bar.start()
+        progress_label = tk.Label(progress_frame, text="", width=40)
+        progress_label.pack(side="left")
+        cancel_button = tk.Button(progress_frame, text="취소")
+        cancel_button.pack(side="left", padx=10)
+
+        # 아래쪽 버튼을 먼저 배치해서 목록이 창을 다 차지해도 가려지지 않게 함
+        bottom_frame = tk.Frame(self.main_frame)
+        bottom_frame.pack(side="bottom")
+
+        # 결과는 묶음 조합만 담아 두고, 화면에 보이는 줄만 문자열로 만듦
+        self.timetable_results = []
+
+        # 교수만 다른 시간표는 한 줄로 묶어서 보여줌
+        def format_row(row, groups):
+            variants = count_timetable_variants(groups)
+            index_text = str(row + 1) if variants == 1 else f"{row + 1}\n(교수 조합 {variants}개)"
+            return [index_text, "\n".join([str(group) for group in groups])]
+
+        # 목록에서 고른(화살표 키로 옮긴) 시간 구성을 오른쪽 주간 시간표로 바로 보여줌
+        preview = WeekGrid(self.main_frame)
+        preview.pack(side="right", fill="y", padx=10)
+
+        def select_row(row):
+            self.set_timetable_index(row)
+            preview.show(timetable_variant(self.timetable_results[row], 0))
+
+        result_list = VirtualList(
+            self.main_frame, self.timetable_results, format_row, ["Index", "예비 시간표 초안"], [160, 700],
+            max(2, len(self.mandatory_subjects)), on_select=select_row)
+        result_list.pack(fill="both", expand=True)
+
+        subjects = list(self.mandatory_subjects)
+        conflict_index = self.conflict_index
+        result_cache = self.result_cache
+        incremental = self.incremental_timetables
+        constraints = self.constraints
+
+        # 작업 스레드: 결과 개수의 추정치를 바로 보내고, 정확한 개수를 센 다음, 찾은 시간 구성을 조금씩 모아서 보냄
+        # (같은 과목 구성으로 끝까지 계산한 적이 있으면 캐시에서 바로 보내고,
+        #  지난번과 강의 몇 개만 다르면 바뀐 부분만 다시 계산해서 보냄, 시간표 조건이 있으면 조건을 넣어 새로 탐색함)
+        def task(stats, send):
+            key = selection_fingerprint(
+                subjects, options=("preliminary", MAX_DISPLAY_ROWS, constraints and constraints.key()))
+            cached = result_cache.get(key)
+            if cached is not None:
+                total, group_total, encoded = cached
+                send(("count", total, group_total))
+                send(("rows", decode_timetable_groups(subjects, encoded)))
+                return
+            send(("estimate", estimate_preliminary_timetables(subjects, conflict_index, constraints)))
+
+            if constraints is not None:
+                total = count_preliminary_timetables(subjects, conflict_index, stats=stats, constraints=constraints)
+                group_total = count_preliminary_timetables(
+                    subjects, conflict_index, by_group=True, stats=stats, constraints=constraints)
+                if stats.cancelled:
+                    return
+                send(("count", total, group_total))
+                rows = []
+                for groups in create_timetable_groups(subjects, conflict_index, stats, constraints):
+                    rows.append(groups)
+                    if len(rows) == MAX_DISPLAY_ROWS:
+                        break
+                send(("rows", rows))
+                if not stats.cancelled:
+                    result_cache.put(key, (total, group_total, encode_timetable_groups(subjects, rows)))
+                return
+
+            with incremental.lock:
+                if incremental.can_update(subjects):
+                    incremental.update(stats)
+                    if stats.cancelled:
+                        return
+                    if incremental.complete:
+                        rows = incremental.timetable_groups()
+                        send(("count", incremental.total, len(rows)))
+                        send(("rows", rows))
+                        result_cache.put(key, (incremental.total, len(rows), encode_timetable_groups(subjects, rows)))
+                        return
+
+                total = count_preliminary_timetables(subjects, conflict_index, stats=stats)
+                group_total = count_preliminary_timetables(subjects, conflict_index, by_group=True, stats=stats)
+                if stats.cancelled:
+                    return
+                send(("count", total, group_total))
+
+                rows = []
+                batch = []
+                sent_at = time.monotonic()
+                for groups in incremental.rebuild(subjects, stats):
+                    batch.append(groups)
+                    if time.monotonic() - sent_at >= BATCH_INTERVAL:
+                        send(("rows", batch))
+                        rows.extend(batch)
+                        batch = []
+                        sent_at = time.monotonic()
+                if batch:
+                    send(("rows", batch))
+                    rows.extend(batch)
+            if not stats.cancelled:
+                result_cache.put(key, (total, group_total, encode_timetable_groups(subjects, rows)))
+
+        def add_rows(rows):
+            self.timetable_results.extend(rows)
+            result_list.refresh()
+            progress_bar["value"] = len(self.timetable_results)
+
+        def handle_message(message):
+            if message[0] == "estimate":
+                count_label.config(text=f"가능한 시간표 최대 {message[1]}개 (추정치, 정확한 수를 세는 중입니다...)")
+            elif message[0] == "count":
+                _, total, group_total = message
+                count_text = f"가능한 시간표 {total}개 (시간 구성 {group_total}개)"
+                if group_total > MAX_DISPLAY_ROWS:
+                    count_text += f" - 앞의 {MAX_DISPLAY_ROWS}개만 표시합니다."
+                count_label.config(text=count_text)
+                progress_bar.stop()
+                progress_bar.config(mode="determinate", maximum=max(1, min(group_total, MAX_DISPLAY_ROWS)), value=0)
+            elif message[0] == "rows":
+                add_rows(message[1])
+            elif message[0] == "error":
+                messagebox.showerror("오류", message[1])
+            elif message[0] == "done":
+                cancel_button.config(state="disabled")
+
+        def show_progress(stats):
+            status = "취소되었습니다. " if stats.cancelled else ""
+            progress_label.config(text=f"{status}탐색 {stats.explored}회 / 찾은 시간 구성 {stats.valid_groups}개")
+            if stats.cancelled:
+                progress_bar.stop()
+                cancel_button.config(state="disabled")
+
+        stats = self.run_in_background(task, handle_message, show_progress)
+        result_list.stats = stats
+        cancel_button.config(command=lambda: (stats.cancel(), show_progress(stats)))
+
+        self.timetable_index_entry = tk.Entry(bottom_frame, width=10)
+        self.timetable_index_entry.pack(pady=10)
+
+        select_button = tk.Button(bottom_frame, text="예비 시간표 선택하기", command=self.select_preliminary_timetable, font=("Arial", 14))
+        select_button.pack(pady=10)
+
+        back_button = tk.Button(bottom_frame, text="뒤로가기", command=self.create_mandatory_subject_screen, font=("Arial", 14))
+        back_button.pack(pady=20)
+
+    # 목록에서 클릭한 예비 시간표 번호를 입력칸에 넣는 함수
+    def set_timetable_index(self, row):
+        self.timetable_index_entry.delete(0, tk.END)
+        self.timetable_index_entry.insert(0, str(row + 1))
+
+    # 목록에서 클릭한 교수 조합 번호를 입력칸에 넣는 함수
+    def set_variant_index(self, row):
+        self.variant_index_entry.delete(0, tk.END)
+        self.variant_index_entry.insert(0, str(row + 1))
+
+    # 추천 점수가 좋은 예비 시간표를 보여주는 화면을 생성하는 함수
+    def create_ranked_timetable(self):
+        self.clear_frame(self.main_frame)
+
+        label = tk.Label(self.main_frame, text="추천 시간표 보기", font=("Arial", 18))
+        label.pack(pady=20)
+
+        label = tk.Label(self.main_frame, text="등교 일수, 공강 시간, 10시 이전 수업이 적을수록 높은 순위입니다.", font=("Arial", 10))
+        label.pack()
+
+        form_frame = tk.Frame(self.main_frame)
+        form_frame.pack(pady=5)
+        label = tk.Label(form_frame, text="선호 교수 (쉼표로 구분)", width=20)
+        label.grid(row=0, column=0, padx=10)
+        self.preferred_professors_entry = tk.Entry(form_frame, width=30)
+        self.preferred_professors_entry.insert(0, self.preferred_professors)
+        self.preferred_professors_entry.grid(row=0, column=1, padx=10)
+        refresh_button = tk.Button(form_frame, text="다시 계산하기", command=self.refresh_ranked_timetable)
+        refresh_button.grid(row=0, column=2, padx=10)
+
+        self.variant_results = []
+        progress_label = tk.Label(self.main_frame, text="추천 시간표를 계산하는 중입니다...", font=("Arial", 12))
+        progress_label.pack(pady=10)
+        progress_bar = ttk.Progressbar(self.main_frame, mode="indeterminate", length=300)
+        progress_bar.pack(pady=10)
+        progress_bar.start()
+        cancel_button = tk.Button(self.main_frame, text="취소", command=self.create_mandatory_subject_screen, font=("Arial", 14))
+        cancel_button.pack(pady=10)
+
+        subjects = list(self.mandatory_subjects)
+        preferred = [name.strip() for name in self.preferred_professors.split(",") if name.strip()]
+        conflict_index = self.conflict_index
+        constraints = self.constraints
+
+        # 작업 스레드: 추천 점수가 가장 좋은 시간표들을 찾음
+        def task(stats, send):
+            ranked_timetables = rank_preliminary_timetables(
+                subjects, preferred_professors=preferred, index=conflict_index, constraints=constraints, stats=stats)
+            if not stats.cancelled:
+                send(("result", ranked_timetables))
+
+        def handle_message(message):
+            if message[0] == "result":
+                for widget in (progress_label, progress_bar, cancel_button):
+                    widget.destroy()
+                self.show_ranked_timetables(message[1])
+            elif message[0] == "error":
+                messagebox.showerror("오류", message[1])
+
+        self.run_in_background(task, handle_message)
+
+    # 찾은 추천 시간표를 표로 보여주는 함수
+    def show_ranked_timetables(self, ranked_timetables):
+        self.variant_results = [timetable for _, timetable in ranked_timetables]
 
         canvas = tk.Canvas(self.main_frame)
         scroll_y = tk.Scrollbar(self.main_frame, orient="vertical", command=canvas.yview)
 
         table_frame = tk.Frame(canvas)
 
-        headers = ["Index", "예비 시간표 초안"]
+        headers = ["Index", "점수", "추천 시간표"]
         for i, header in enumerate(headers):
-            label = tk.Label(table_frame, text=header, borderwidth=1, relief="solid", width=20)
+            label = tk.Label(table_frame, text=header, borderwidth=1, relief="solid", width=20 if i != 1 else 8)
             label.grid(row=0, column=i)
 
-        for index, timetable in enumerate(preliminary_timetables, start=1):
-            self.timetable_map[index] = timetable
+        for index, (score, timetable) in enumerate(ranked_timetables, start=1):
             label = tk.Label(table_frame, text=str(index), borderwidth=1, relief="solid", width=20)
             label.grid(row=index, column=0)
-            label = tk.Label(table_frame, text="\n".join([str(lec) for lec in timetable]), borderwidth=1, relief="solid", width=50)
+            label = tk.Label(table_frame, text=str(score), borderwidth=1, relief="solid", width=8)
             label.grid(row=index, column=1)
+            label = tk.Label(table_frame, text="\n".join([str(lec) for lec in timetable]), borderwidth=1, relief="solid", width=50)
+            label.grid(row=index, column=2)
 
         canvas.create_window(0, 0, anchor='nw', window=table_frame)
         canvas.update_idletasks()
@@ -459,21 +1123,82 @@ class TimetableApp:
         canvas.pack(fill='both', expand=True, side='left')
         scroll_y.pack(fill='y', side='right')
 
-        self.timetable_index_entry = tk.Entry(self.main_frame, width=10)
-        self.timetable_index_entry.pack(pady=10)
+        self.variant_index_entry = tk.Entry(self.main_frame, width=10)
+        self.variant_index_entry.pack(pady=10)
 
-        select_button = tk.Button(self.main_frame, text="예비 시간표 선택하기", command=self.select_preliminary_timetable, font=("Arial", 14))
+        select_button = tk.Button(self.main_frame, text="추천 시간표 선택하기", command=self.select_timetable_variant, font=("Arial", 14))
         select_button.pack(pady=10)
 
         back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_mandatory_subject_screen, font=("Arial", 14))
         back_button.pack(pady=20)
 
+    # 선호 교수를 반영해 추천 시간표를 다시 계산하는 함수
+    def refresh_ranked_timetable(self):
+        self.preferred_professors = self.preferred_professors_entry.get()
+        self.create_ranked_timetable()
+
     # 예비 시간표를 선택하는 함수
     def select_preliminary_timetable(self):
         try:
             index = int(self.timetable_index_entry.get())
-            if index in self.timetable_map:
-                self.selected_timetable = self.timetable_map[index]
+            if 1 <= index <= len(self.timetable_results):
+                groups = self.timetable_results[index - 1]
+                if count_timetable_variants(groups) == 1:
+                    self.selected_timetable = next(expand_timetable_groups(groups))
+                    messagebox.showinfo("성공", "예비 시간표가 선택되었습니다.")
+                    self.create_elective_subject_screen()
+                else:
+                    self.show_timetable_variants(groups)
+            else:
+                messagebox.showerror("오류", "유효하지 않은 인덱스입니다.")
+        except ValueError:
+            messagebox.showerror("오류", "인덱스는 숫자여야 합니다.")
+
+    # 선택한 시간 구성의 교수 조합을 보여주는 화면을 생성하는 함수
+    def show_timetable_variants(self, groups):
+        self.clear_frame(self.main_frame)
+
+        label = tk.Label(self.main_frame, text="교수 조합 선택하기", font=("Arial", 18))
+        label.pack(pady=20)
+
+        bottom_frame = tk.Frame(self.main_frame)
+        bottom_frame.pack(side="bottom")
+
+        # 교수 조합은 목록에서 보이는 줄만 그때그때 펼침
+        self.variant_results = TimetableVariants(groups)
+
+        def format_row(row, timetable):
+            return [str(row + 1), "\n".join([str(lec) for lec in timetable])]
+
+        preview = WeekGrid(self.main_frame)
+        preview.pack(side="right", fill="y", padx=10)
+
+        def select_row(row):
+            self.set_variant_index(row)
+            preview.show(self.variant_results[row])
+
+        variant_list = VirtualList(
+            self.main_frame, self.variant_results, format_row, ["Index", "예비 시간표"], [160, 700],
+            max(1, len(groups)), on_select=select_row, stats=self.last_stats)
+        variant_list.pack(fill="both", expand=True)
+        variant_list.selected = 0
+        select_row(0)
+
+        self.variant_index_entry = tk.Entry(bottom_frame, width=10)
+        self.variant_index_entry.pack(pady=10)
+
+        select_button = tk.Button(bottom_frame, text="교수 조합 선택하기", command=self.select_timetable_variant, font=("Arial", 14))
+        select_button.pack(pady=10)
+
+        back_button = tk.Button(bottom_frame, text="뒤로가기", command=self.create_preliminary_timetable, font=("Arial", 14))
+        back_button.pack(pady=20)
+
+    # 교수 조합을 선택하는 함수
+    def select_timetable_variant(self):
+        try:
+            index = int(self.variant_index_entry.get())
+            if 1 <= index <= len(self.variant_results):
+                self.selected_timetable = self.variant_results[index - 1]
                 messagebox.showinfo("성공", "예비 시간표가 선택되었습니다.")
                 self.create_elective_subject_screen()
             else:
@@ -521,8 +1246,16 @@ class TimetableApp:
         try:
             start_hour, start_minute = map(int, start.split(":"))
             end_hour, end_minute = map(int, end.split(":"))
-            self.schedule[day] = (start_hour, start_minute, end_hour, end_minute)
-            messagebox.showinfo("성공", f"{day} {start}-{end} 추가됨.")
+            if not 0 <= start_hour * 60 + start_minute < end_hour * 60 + end_minute <= MINUTES_PER_DAY:
+                messagebox.showerror("오류", "종료시간은 시작시간보다 늦어야 합니다. (00:00-24:00)")
+            else:
+                interval = (start_hour, start_minute, end_hour, end_minute)
+                # 같은 요일에 수업을 여러 번 넣을 수 있지만, 이미 넣은 시간과 겹치면 받지 않음
+                if schedule_to_mask({day: interval}) & schedule_to_mask(self.schedule):
+                    messagebox.showerror("오류", f"{day} {start}-{end} 는 이미 추가한 시간과 겹칩니다.")
+                else:
+                    self.schedule.setdefault(day, []).append(interval)
+                    messagebox.showinfo("성공", f"{day} {start}-{end} 추가됨.")
         except ValueError:
             messagebox.showerror("오류", "시간 형식이 올바르지 않습니다. (e.g., 09:00)")
 
@@ -540,8 +1273,14 @@ class TimetableApp:
             messagebox.showerror("오류", "모든 필드를 입력해주세요.")
             return
 
-        lecture = Lecture(subject_name, professor, self.schedule, section)
-        self.electives.append(lecture)
+        if not self.lock_catalog():
+            return
+        try:
+            lecture = Lecture(subject_name, professor, self.schedule, section)
+            self.electives.append(lecture)
+            self.conflict_index.add(lecture)
+        finally:
+            self.catalog_lock.release()
 
         messagebox.showinfo("성공", "선택 과목이 추가되었습니다.")
         self.create_elective_subject_screen()
@@ -573,7 +1312,7 @@ class TimetableApp:
             label.grid(row=row, column=2)
             label = tk.Label(table_frame, text=lecture.professor, borderwidth=1, relief="solid", width=22)
             label.grid(row=row, column=3)
-            label = tk.Label(table_frame, text=", ".join([f"{day}: {start:02d}:{start_m:02d}-{end:02d}:{end_m:02d}" for day, (start, start_m, end, end_m) in lecture.schedule.items()]), borderwidth=1, relief="solid", width=30)
+            label = tk.Label(table_frame, text=format_schedule(lecture.schedule), borderwidth=1, relief="solid", width=30)
             label.grid(row=row, column=4)
             row += 1
 
@@ -591,8 +1330,14 @@ class TimetableApp:
         try:
             index = int(self.delete_elective_index_entry.get())
             if index in self.elective_map:
-                lecture = self.elective_map[index]
-                self.electives.remove(lecture)
+                if not self.lock_catalog():
+                    return
+                try:
+                    lecture = self.elective_map[index]
+                    self.electives.remove(lecture)
+                    self.conflict_index.remove(lecture)
+                finally:
+                    self.catalog_lock.release()
                 messagebox.showinfo("성공", "선택 과목이 삭제되었습니다.")
             else:
                 messagebox.showerror("오류", "유효하지 않은 인덱스입니다.")
@@ -601,92 +1346,164 @@ class TimetableApp:
 
     # 최종 시간표를 생성하는 함수
     def create_final_timetable(self):
-        final_timetable = self.selected_timetable[:]
-        conflict_lectures = []
-        for elective in self.electives:
-            if not any(check_conflict(elective, lecture) for lecture in final_timetable):
-                final_timetable.append(elective)
-            else:
-                conflict_lectures.append(elective)
+        self.clear_frame(self.main_frame)
 
+        label = tk.Label(self.main_frame, text="시간표를 생성하는 중입니다...", font=("Arial", 18))
+        label.pack(pady=20)
+        progress_bar = ttk.Progressbar(self.main_frame, mode="indeterminate", length=300)
+        progress_bar.pack(pady=10)
+        progress_bar.start()
+        cancel_button = tk.Button(self.main_frame, text="취소", command=self.create_elective_subject_screen, font=("Arial", 14))
+        cancel_button.pack(pady=10)
+
+        selected_timetable = self.selected_timetable[:]
+        electives = list(self.electives)
+        conflict_index = self.conflict_index
+
+        # 작업 스레드: 예비 시간표에 함께 넣을 수 있는 선택 과목의 최대 조합을 찾음
+        def task(stats, send):
+            chosen, dropped, _ = pack_electives(selected_timetable, electives, index=conflict_index)
+            if not stats.cancelled:
+                send(("result", selected_timetable + chosen, dropped))
+
+        def handle_message(message):
+            if message[0] == "result":
+                self.show_final_timetable(message[1], message[2])
+            elif message[0] == "error":
+                messagebox.showerror("오류", message[1])
+
+        self.run_in_background(task, handle_message)
+
+    # 모든 예비 시간표를 살펴 선택 과목을 가장 적게 빼도 되는 방법을 보여주는 화면을 생성하는 함수
+    def create_removal_recommendation(self):
+        self.clear_frame(self.main_frame)
+
+        label = tk.Label(self.main_frame, text="최소 삭제 추천을 계산하는 중입니다...", font=("Arial", 18))
+        label.pack(pady=20)
+        progress_bar = ttk.Progressbar(self.main_frame, mode="indeterminate", length=300)
+        progress_bar.pack(pady=10)
+        progress_bar.start()
+        progress_label = tk.Label(self.main_frame, text="")
+        progress_label.pack()
+        cancel_button = tk.Button(self.main_frame, text="취소", command=self.create_elective_subject_screen, font=("Arial", 14))
+        cancel_button.pack(pady=10)
+
+        subjects = list(self.mandatory_subjects)
+        electives = list(self.electives)
+        conflict_index = self.conflict_index
+        constraints = self.constraints
+
+        def task(stats, send):
+            removals, groups = recommend_minimum_removals(subjects, electives, conflict_index, stats, constraints)
+            if not stats.cancelled:
+                send(("result", removals, groups))
+
+        def handle_message(message):
+            if message[0] == "result":
+                self.show_removal_recommendation(message[1], message[2])
+            elif message[0] == "error":
+                messagebox.showerror("오류", message[1])
+
+        def show_progress(stats):
+            progress_label.config(text=f"탐색 {stats.explored}회")
+
+        self.run_in_background(task, handle_message, show_progress)
+
+    # 최소 삭제 추천 결과를 보여주는 화면을 생성하는 함수
+    def show_removal_recommendation(self, removals, groups):
         self.clear_frame(self.main_frame)
 
-        if conflict_lectures:
-            label = tk.Label(self.main_frame, text="시간표 생성에 실패했습니다.", font=("Arial", 18))
-            label1 = tk.Label(self.main_frame, text="삭제하면 좋을 과목", font=("Arial", 10))
+        if groups is None:
+            label = tk.Label(self.main_frame, text="가능한 예비 시간표가 없습니다.", font=("Arial", 18))
             label.pack(pady=20)
-            label1.pack(padx=10)
-            
+        else:
+            text = "선택 과목을 모두 넣을 수 있습니다." if not removals else f"선택 과목 {len(removals)}개만 빼면 됩니다."
+            label = tk.Label(self.main_frame, text=text, font=("Arial", 18))
+            label.pack(pady=20)
+
+            if removals:
+                label = tk.Label(self.main_frame, text="삭제하면 좋을 과목", font=("Arial", 10))
+                label.pack(padx=10)
+
+                table_frame = tk.Frame(self.main_frame)
+                table_frame.pack()
+
+                headers = ["강의명", "분반", "교수명", "강의 시간"]
+                for i, header in enumerate(headers):
+                    label = tk.Label(table_frame, text=header, borderwidth=1, relief="solid", width=22)
+                    label.grid(row=0, column=i)
+
+                for row, lecture in enumerate(removals, start=1):
+                    label = tk.Label(table_frame, text=lecture.subject, borderwidth=1, relief="solid", width=22)
+                    label.grid(row=row, column=0)
+                    label = tk.Label(table_frame, text=lecture.section, borderwidth=1, relief="solid", width=22)
+                    label.grid(row=row, column=1)
+                    label = tk.Label(table_frame, text=lecture.professor, borderwidth=1, relief="solid", width=22)
+                    label.grid(row=row, column=2)
+                    label = tk.Label(table_frame, text=format_schedule(lecture.schedule), borderwidth=1, relief="solid", width=30)
+                    label.grid(row=row, column=3)
+
+            label = tk.Label(self.main_frame, text="이때의 예비 시간표", font=("Arial", 10))
+            label.pack(pady=(10, 0))
+            label = tk.Label(self.main_frame, text="\n".join([str(group) for group in groups]), borderwidth=1, relief="solid", justify="left")
+            label.pack(padx=10)
+
+            # 교수만 다른 예비 시간표가 여러 개면 교수 조합을 고르는 화면으로 넘어감
+            def select_base():
+                if count_timetable_variants(groups) == 1:
+                    self.selected_timetable = timetable_variant(groups, 0)
+                    messagebox.showinfo("성공", "예비 시간표가 선택되었습니다.")
+                    self.create_elective_subject_screen()
+                else:
+                    self.show_timetable_variants(groups)
+
+            select_button = tk.Button(self.main_frame, text="이 예비 시간표 선택하기", command=select_base, font=("Arial", 14))
+            select_button.pack(pady=10)
+
+        back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_elective_subject_screen, font=("Arial", 14))
+        back_button.pack(pady=20)
+
+    # 최종 시간표와 넣지 못한 선택 과목을 보여주는 화면을 생성하는 함수
+    def show_final_timetable(self, final_timetable, dropped_lectures):
+        self.clear_frame(self.main_frame)
+
+        label = tk.Label(self.main_frame, text="최종 시간표", font=("Arial", 18))
+        label.pack(pady=20)
+
+        back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_elective_subject_screen, font=("Arial", 14))
+        back_button.pack(pady=20, side="bottom")
+
+        if dropped_lectures:
+            label = tk.Label(self.main_frame, text="시간이 겹쳐 넣지 못한 선택 과목 (삭제하면 좋을 과목)", font=("Arial", 10))
+            label.pack(padx=10)
+
             table_frame = tk.Frame(self.main_frame)
-            table_frame.pack()
+            table_frame.pack(pady=5)
 
             headers = ["강의명", "분반", "교수명", "강의 시간"]
             for i, header in enumerate(headers):
                 label = tk.Label(table_frame, text=header, borderwidth=1, relief="solid", width=22)
                 label.grid(row=0, column=i)
 
-            for row, lecture in enumerate(recommend_removals(final_timetable, conflict_lectures), start=1):
+            for row, lecture in enumerate(dropped_lectures, start=1):
                 label = tk.Label(table_frame, text=lecture.subject, borderwidth=1, relief="solid", width=22)
                 label.grid(row=row, column=0)
                 label = tk.Label(table_frame, text=lecture.section, borderwidth=1, relief="solid", width=22)
                 label.grid(row=row, column=1)
                 label = tk.Label(table_frame, text=lecture.professor, borderwidth=1, relief="solid", width=22)
                 label.grid(row=row, column=2)
-                label = tk.Label(table_frame, text=", ".join([f"{day}: {start:02d}:{start_m:02d}-{end:02d}:{end_m:02d}" for day, (start, start_m, end, end_m) in lecture.schedule.items()]), borderwidth=1, relief="solid", width=30)
+                label = tk.Label(table_frame, text=format_schedule(lecture.schedule), borderwidth=1, relief="solid", width=30)
                 label.grid(row=row, column=3)
 
-            back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_elective_subject_screen, font=("Arial", 14))
-            back_button.pack(pady=20)
-
-        else:
-            sorted_final_timetable = sort_timetable(final_timetable)
-            label = tk.Label(self.main_frame, text="최종 시간표", font=("Arial", 18))
-            label.pack(pady=20)
-
-            canvas = tk.Canvas(self.main_frame)
-            scroll_y = tk.Scrollbar(self.main_frame, orient="vertical", command=canvas.yview)
-
-            table_frame = tk.Frame(canvas)
-
-            headers = ["시간", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-            for i, header in enumerate(headers):
-                label = tk.Label(table_frame, text=header, borderwidth=1, relief="solid", width=22)
-                label.grid(row=0, column=i)
-
-            timetable_dict = defaultdict(list)
-            for lecture in sorted_final_timetable:
-                for day, (start_hour, start_minute, end_hour, end_minute) in lecture.schedule.items():
-                    time_slot = f"{start_hour:02d}:{start_minute:02d}-{end_hour:02d}:{end_minute:02d}"
-                    timetable_dict[time_slot].append((day, lecture))
-
-            row = 1
-            for time_slot, lectures in sorted(timetable_dict.items()):
-                label = tk.Label(table_frame, text=time_slot, borderwidth=1, relief="solid", width=22)
-                label.grid(row=row, column=0)
-                for day in headers[1:]:
-                    lecture_info = "\n".join([f"{lec.subject} ({lec.section})" for d, lec in lectures if d == day])
-                    label = tk.Label(table_frame, text=lecture_info, borderwidth=1, relief="solid", width=22)
-                    label.grid(row=row, column=headers.index(day))
-                row += 1
-
-            canvas.create_window(0, 0, anchor='nw', window=table_frame)
-            canvas.update_idletasks()
-            canvas.configure(scrollregion=canvas.bbox('all'), yscrollcommand=scroll_y.set)
-
-            canvas.pack(fill='both', expand=True, side='left')
-            scroll_y.pack(fill='y', side='right')
-
-            back_button = tk.Button(self.main_frame, text="뒤로가기", command=self.create_elective_subject_screen, font=("Arial", 14))
-            back_button.pack(pady=20)
-
-    # 프레임을 초기화하는 함수
-    def clear_frame(self, frame):
-        for widget in frame.winfo_children():
-            widget.destroy()
+        grid = WeekGrid(self.main_frame)
+        grid.pack(fill="both", expand=True, padx=10)
+        grid.show(final_timetable)
 
 # 메인 함수
 if __name__ == "__main__":
     root = tk.Tk()
     app = TimetableApp(root)
+    if STARTUP_CHECK_OPTION in sys.argv[1:]:
+        root.after_idle(root.destroy)
     root.mainloop()
 